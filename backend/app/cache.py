@@ -0,0 +1,265 @@
+"""
+Cachés en memoria del proceso
+Principio: Single Responsibility - Solo mantiene datos de lectura frecuente en memoria
+
+PrincipalCache guarda los campos de autorización del usuario autenticado
+para que get_current_user no consulte PostgreSQL en cada petición.
+TokenClaimsCache guarda los claims de tokens JWT ya verificados para no
+repetir la verificación de firma y el parseo en cada petición.
+"""
+import hashlib
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Iterable, Optional, Tuple
+from uuid import UUID
+
+from app.config import settings
+from app.models.user import User
+
+
+@dataclass(frozen=True)
+class UserPrincipal:
+    """
+    Instantánea inmutable de los campos del usuario relevantes para autorización
+    Expone los mismos atributos que User usados por los endpoints y UserResponse
+    """
+    id: UUID
+    email: str
+    name: str
+    phone_number: Optional[str]
+    role: str
+    totp_verified: bool
+    created_at: datetime
+    updated_at: Optional[datetime]
+
+    @classmethod
+    def from_user(cls, user: User) -> "UserPrincipal":
+        """
+        Crea la instantánea a partir del modelo ORM
+
+        Args:
+            user: Usuario cargado de la base de datos
+
+        Returns:
+            Instantánea del usuario
+        """
+        return cls(
+            id=user.id,
+            email=user.email,
+            name=user.name,
+            phone_number=user.phone_number,
+            role=user.role,
+            totp_verified=user.totp_verified,
+            created_at=user.created_at,
+            updated_at=user.updated_at
+        )
+
+
+class PrincipalCache:
+    """
+    Caché LRU con TTL de UserPrincipal indexada por id de usuario
+
+    - Dentro del TTL la entrada se usa sin consultar la base de datos.
+    - Pasado el TTL la entrada se conserva para revalidación: basta comparar
+      su updated_at (sello de versión) con el de la fila para saber si otro
+      worker la modificó, sin volver a leer la fila completa.
+    - Las mutaciones en este proceso la invalidan de inmediato.
+    """
+
+    def __init__(self, max_size: int, ttl_seconds: float):
+        """
+        Constructor
+
+        Args:
+            max_size: Número máximo de entradas (se descarta la menos usada)
+            ttl_seconds: Segundos que una entrada se considera fresca
+        """
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[UUID, Tuple[UserPrincipal, float]]" = OrderedDict()
+
+    def _lookup(self, user_id: UUID) -> Optional[Tuple[UserPrincipal, float]]:
+        entry = self._entries.get(user_id)
+        if entry is not None:
+            self._entries.move_to_end(user_id)
+        return entry
+
+    def get(self, user_id: UUID) -> Optional[UserPrincipal]:
+        """
+        Obtiene una entrada fresca (dentro del TTL)
+
+        Args:
+            user_id: UUID del usuario
+
+        Returns:
+            Instantánea del usuario o None si no existe o expiró
+        """
+        entry = self._lookup(user_id)
+        if entry is None or entry[1] <= time.monotonic():
+            return None
+        return entry[0]
+
+    def get_for_revalidation(self, user_id: UUID) -> Optional[UserPrincipal]:
+        """
+        Obtiene una entrada aunque su TTL haya expirado
+
+        Args:
+            user_id: UUID del usuario
+
+        Returns:
+            Instantánea del usuario (posiblemente obsoleta) o None
+        """
+        entry = self._lookup(user_id)
+        return entry[0] if entry is not None else None
+
+    def put(self, principal: UserPrincipal) -> None:
+        """
+        Guarda o reemplaza una entrada
+
+        Nunca reemplaza una entrada por otra con un sello de versión más antiguo
+        (lecturas concurrentes que terminan fuera de orden).
+
+        Args:
+            principal: Instantánea del usuario
+        """
+        current = self._entries.get(principal.id)
+        if (
+            current is not None
+            and current[0].updated_at is not None
+            and principal.updated_at is not None
+            and principal.updated_at < current[0].updated_at
+        ):
+            return
+
+        self._entries[principal.id] = (principal, time.monotonic() + self.ttl_seconds)
+        self._entries.move_to_end(principal.id)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def touch(self, user_id: UUID) -> None:
+        """
+        Renueva el TTL de una entrada revalidada (versión sin cambios)
+
+        Args:
+            user_id: UUID del usuario
+        """
+        entry = self._entries.get(user_id)
+        if entry is not None:
+            self._entries[user_id] = (entry[0], time.monotonic() + self.ttl_seconds)
+
+    def invalidate(self, user_id: UUID) -> None:
+        """
+        Elimina la entrada de un usuario
+
+        Args:
+            user_id: UUID del usuario
+        """
+        self._entries.pop(user_id, None)
+
+    def invalidate_many(self, user_ids: Iterable[UUID]) -> None:
+        """
+        Elimina las entradas de varios usuarios
+
+        Args:
+            user_ids: UUIDs de los usuarios
+        """
+        for user_id in user_ids:
+            self._entries.pop(user_id, None)
+
+    def clear(self) -> None:
+        """
+        Vacía la caché
+        """
+        self._entries.clear()
+
+
+class TokenClaimsCache:
+    """
+    Caché LRU acotada de claims de JWT verificados, indexada por el digest del token
+
+    Cada entrada expira exactamente en el claim "exp" del token, por lo que
+    la caché nunca acepta un token que jwt.decode rechazaría por expirado.
+    Se indexa por SHA-256 para no mantener los tokens en memoria.
+    """
+
+    def __init__(self, max_size: int):
+        """
+        Constructor
+
+        Args:
+            max_size: Número máximo de entradas (se descarta la menos usada)
+        """
+        self.max_size = max_size
+        self._entries: "OrderedDict[bytes, Tuple[dict, float]]" = OrderedDict()
+
+    @staticmethod
+    def digest(token: str) -> bytes:
+        """
+        Calcula la clave de la caché para un token
+
+        Args:
+            token: Token JWT
+
+        Returns:
+            Digest SHA-256 del token
+        """
+        return hashlib.sha256(token.encode("utf-8")).digest()
+
+    def get(self, key: bytes) -> Optional[dict]:
+        """
+        Obtiene los claims de un token verificado si aún no expiró
+
+        Args:
+            key: Digest del token
+
+        Returns:
+            Claims del token o None
+        """
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+
+        claims, expires_at = entry
+        if expires_at <= time.time():
+            del self._entries[key]
+            return None
+
+        self._entries.move_to_end(key)
+        return claims
+
+    def put(self, key: bytes, claims: dict) -> None:
+        """
+        Guarda los claims de un token verificado
+
+        Los tokens sin "exp" no se cachean.
+
+        Args:
+            key: Digest del token
+            claims: Claims decodificados y validados
+        """
+        expires_at = claims.get("exp")
+        if not isinstance(expires_at, (int, float)):
+            return
+
+        self._entries[key] = (claims, float(expires_at))
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        """
+        Vacía la caché
+        """
+        self._entries.clear()
+
+
+# Instancia global de la caché de usuarios autenticados (Singleton pattern)
+principal_cache = PrincipalCache(
+    max_size=settings.principal_cache_max_size,
+    ttl_seconds=settings.principal_cache_ttl_seconds
+)
+
+# Instancia global de la caché de tokens verificados (Singleton pattern)
+token_claims_cache = TokenClaimsCache(max_size=settings.token_cache_max_size)
@@ -0,0 +1,3 @@
+"""
+Comandos de línea de comandos de la aplicación
+"""
@@ -0,0 +1,67 @@
+"""
+Comando de generación de claves de firma JWT
+Principio: Single Responsibility - Solo crea claves nuevas para el anillo de claves
+
+Uso:
+    python -m app.commands.generate_signing_key /etc/secure-login/jwt-keys
+    python -m app.commands.generate_signing_key /etc/secure-login/jwt-keys --algorithm ES256
+
+Escribe <kid>.pem (PKCS#8, permisos 0600) con la huella RFC 7638 de la clave
+pública como kid y muestra el kid en stdout. La clave no firma hasta que se
+indique en JWT_ACTIVE_KID (salvo que sea la única del directorio).
+"""
+import argparse
+import os
+import sys
+from typing import Optional, Sequence
+
+import jwt
+from cryptography.hazmat.primitives import serialization
+
+from app.config import settings
+from app.services.jwt_keys import ASYMMETRIC_ALGORITHMS, KEY_FILE_SUFFIX, generate_private_key, jwk_thumbprint
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    """
+    Punto de entrada del comando
+
+    Returns:
+        Código de salida
+    """
+    parser = argparse.ArgumentParser(description="Genera una clave de firma JWT para el anillo de claves")
+    parser.add_argument("directory", nargs="?", default=settings.jwt_signing_keys_dir, help="Directorio de claves (por defecto JWT_SIGNING_KEYS_DIR)")
+    parser.add_argument(
+        "--algorithm",
+        choices=ASYMMETRIC_ALGORITHMS,
+        default=settings.jwt_algorithm if settings.jwt_algorithm in ASYMMETRIC_ALGORITHMS else "EdDSA"
+    )
+    args = parser.parse_args(argv)
+
+    if not args.directory:
+        print("❌ Indique el directorio de claves o JWT_SIGNING_KEYS_DIR", file=sys.stderr)
+        return 1
+
+    private_key = generate_private_key(args.algorithm)
+    jwk = jwt.get_algorithm_by_name(args.algorithm).to_jwk(private_key.public_key(), as_dict=True)
+    kid = jwk_thumbprint(jwk)
+    pem = private_key.private_bytes(
+        encoding=serialization.Encoding.PEM,
+        format=serialization.PrivateFormat.PKCS8,
+        encryption_algorithm=serialization.NoEncryption()
+    )
+
+    os.makedirs(args.directory, mode=0o700, exist_ok=True)
+    path = os.path.join(args.directory, kid + KEY_FILE_SUFFIX)
+    # O_EXCL: nunca sobrescribir una clave existente
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+    with os.fdopen(fd, "wb") as key_file:
+        key_file.write(pem)
+
+    print(f"✅ Clave {args.algorithm} creada en {path}", file=sys.stderr)
+    print(kid)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,81 @@
+"""
+Comando de importación masiva de usuarios
+Principio: Single Responsibility - Solo expone UserImportService en la línea de comandos
+
+Uso:
+    python -m app.commands.import_users usuarios.csv
+    python -m app.commands.import_users - --format ndjson < usuarios.ndjson
+
+Escribe en stdout el resultado de cada fila (NDJSON) y en stderr el resumen.
+"""
+import argparse
+import asyncio
+import sys
+from typing import IO, Optional, Sequence
+
+from app.config import settings
+from app.database import AsyncSessionLocal, async_engine
+from app.repositories.user_repository import get_async_user_repository
+from app.schemas.auth import UserImportSummary
+from app.services.password_hasher import password_hasher
+from app.services.user_import import ImportFormat, get_user_import_service, iter_import_records
+
+
+async def run_import(source: IO[bytes], import_format: ImportFormat, batch_size: int, output: IO[str]) -> UserImportSummary:
+    """
+    Ejecuta la importación escribiendo los resultados por fila
+
+    Args:
+        source: Archivo binario con los registros
+        import_format: "ndjson" o "csv"
+        batch_size: Filas por lote
+        output: Destino de los resultados por fila
+
+    Returns:
+        Resumen de la importación
+    """
+    summary = UserImportSummary()
+    try:
+        async with AsyncSessionLocal() as db:
+            service = get_user_import_service(get_async_user_repository(db), batch_size)
+            async for results in service.import_records(iter_import_records(source, import_format), summary):
+                output.write("".join(result.model_dump_json() + "\n" for result in results))
+                print(
+                    f"… {summary.created} creados, {summary.duplicate} duplicados, {summary.invalid} inválidos",
+                    file=sys.stderr
+                )
+    finally:
+        password_hasher.shutdown()
+        await async_engine.dispose()
+    return summary
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    """
+    Punto de entrada del comando
+
+    Returns:
+        Código de salida (0 si no hubo filas inválidas)
+    """
+    parser = argparse.ArgumentParser(description="Importación masiva de usuarios (NDJSON o CSV)")
+    parser.add_argument("path", help="Archivo a importar ('-' para stdin)")
+    parser.add_argument("--format", choices=["ndjson", "csv"], help="Formato (por defecto según la extensión)")
+    parser.add_argument("--batch-size", type=int, default=settings.user_import_batch_size, help="Filas por lote")
+    args = parser.parse_args(argv)
+
+    import_format = args.format or ("csv" if args.path.lower().endswith(".csv") else "ndjson")
+    source = sys.stdin.buffer if args.path == "-" else open(args.path, "rb")
+
+    with source:
+        summary = asyncio.run(run_import(source, import_format, args.batch_size, sys.stdout))
+
+    print(
+        f"✅ Importación terminada: {summary.created} creados, "
+        f"{summary.duplicate} duplicados, {summary.invalid} inválidos",
+        file=sys.stderr
+    )
+    return 1 if summary.invalid else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,55 @@
+"""
+Comando de migraciones del esquema
+Principio: Single Responsibility - Solo expone el ejecutor de migraciones en la línea de comandos
+
+Uso:
+    python -m app.commands.migrate            # aplica las migraciones pendientes
+    python -m app.commands.migrate --status   # muestra la versión actual
+
+Se ejecuta una vez por despliegue (antes de arrancar los workers), no en cada worker.
+"""
+import argparse
+import sys
+from typing import Optional, Sequence
+
+from app.database import engine
+from app.migrations import LATEST_VERSION, MIGRATIONS, upgrade
+from app.migrations.runner import current_version
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    """
+    Punto de entrada del comando
+
+    Returns:
+        Código de salida
+    """
+    parser = argparse.ArgumentParser(description="Migraciones versionadas del esquema")
+    parser.add_argument("--status", action="store_true", help="Mostrar la versión actual sin migrar")
+    parser.add_argument("--target", type=int, help="Versión final (por defecto la última)")
+    args = parser.parse_args(argv)
+
+    try:
+        if args.status:
+            version = current_version(engine)
+            print(f"Esquema en versión {version} (última: {LATEST_VERSION})")
+            for migration in MIGRATIONS:
+                mark = "✅" if migration.version <= version else "⏳"
+                print(f"  {mark} {migration.name}: {migration.description}")
+            return 0 if version >= LATEST_VERSION else 1
+
+        applied = upgrade(engine, target=args.target)
+        if applied:
+            print(f"✅ {len(applied)} migraciones aplicadas")
+        else:
+            print("✅ Esquema al día")
+        return 0
+    except Exception as e:
+        print(f"❌ Error en la migración: {e}", file=sys.stderr)
+        return 1
+    finally:
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,144 @@
+"""
+Contenedor de servicios de la aplicación
+Principio: Single Responsibility - Solo gestiona el ciclo de vida de los servicios compartidos
+Principio: Dependency Inversion - Los factories obtienen aquí sus dependencias sin estado
+
+Los servicios sin estado (TOTP, hashing) se crean una sola vez por worker en
+lugar de en cada petición. El arranque incluye una fase de calentamiento
+(pool de BD, procesos Argon2, validadores Pydantic) para que las primeras
+peticiones tras un despliegue no paguen el coste de inicialización.
+"""
+import asyncio
+import time
+
+from pydantic import BaseModel
+from sqlalchemy import text
+
+from app.database import async_engine
+from app.schemas import auth as auth_schemas
+from app.services.attempt_tracker import AttemptTracker, attempt_tracker
+from app.services.totp_replay_cache import TOTPReplayCache, totp_replay_cache
+from app.services.lock_sweeper import LockSweeper, lock_sweeper
+from app.services.password_hasher import PasswordHasher, password_hasher
+from app.services.totp_service import TOTPService
+
+
+class ServiceContainer:
+    """
+    Servicios singleton con alcance de aplicación
+    """
+
+    def __init__(
+        self,
+        totp_service: TOTPService,
+        password_hasher: PasswordHasher,
+        lock_sweeper: LockSweeper,
+        attempt_tracker: AttemptTracker,
+        totp_replay_cache: TOTPReplayCache
+    ):
+        """
+        Constructor con inyección de dependencias
+
+        Args:
+            totp_service: Servicio TOTP
+            password_hasher: Ejecutor de hashing de contraseñas
+            lock_sweeper: Barrido periódico de bloqueos expirados
+            attempt_tracker: Almacén de intentos fallidos de login
+            totp_replay_cache: Último contador TOTP aceptado por usuario
+        """
+        self.totp_service = totp_service
+        self.password_hasher = password_hasher
+        self.lock_sweeper = lock_sweeper
+        self.attempt_tracker = attempt_tracker
+        self.totp_replay_cache = totp_replay_cache
+        self.ready = False
+
+    async def _warm_up_database(self) -> None:
+        """
+        Abre de antemano las conexiones del pool async
+        """
+        async def ping() -> None:
+            async with async_engine.connect() as conn:
+                await conn.execute(text("SELECT 1"))
+
+        # Conexiones simultáneas: cada una queda en el pool al devolverse
+        await asyncio.gather(*(ping() for _ in range(async_engine.pool.size())))
+
+    async def _warm_up_password_hasher(self) -> None:
+        """
+        Arranca todos los procesos del pool de hashing y ejecuta un hash Argon2
+        en cada uno (reserva la memoria de Argon2 antes de la primera petición)
+        """
+        await asyncio.gather(*(
+            self.password_hasher.hash("warm-up-password")
+            for _ in range(self.password_hasher.max_workers)
+        ))
+
+    def _warm_up_validators(self) -> None:
+        """
+        Ejecuta una validación de cada schema usando su ejemplo documentado
+        """
+        for schema in vars(auth_schemas).values():
+            if not (isinstance(schema, type) and issubclass(schema, BaseModel)):
+                continue
+
+            example = (schema.model_config.get("json_schema_extra") or {}).get("example")
+            if example is not None:
+                schema.model_validate(example)
+
+        # TOTP: primer HMAC del proceso
+        self.totp_service.generate_totp(self.totp_service.generate_secret())
+
+    async def startup(self) -> None:
+        """
+        Fase de arranque: calentamiento y tareas en segundo plano
+        """
+        started = time.perf_counter()
+
+        await self._warm_up_database()
+        await self._warm_up_password_hasher()
+        self._warm_up_validators()
+
+        self.lock_sweeper.start()
+        self.ready = True
+
+        print(f"🔥 Calentamiento completado en {time.perf_counter() - started:.2f}s")
+
+    async def shutdown(self) -> None:
+        """
+        Fase de cierre: detiene tareas y libera recursos
+        """
+        self.ready = False
+
+        # Detener barrido de bloqueos expirados
+        await self.lock_sweeper.stop()
+
+        # Cerrar pool de procesos de hashing
+        self.password_hasher.shutdown()
+        
+        # Cerrar almacén de intentos fallidos (conexión Redis / mmap)
+        await self.attempt_tracker.close()
+        self.totp_replay_cache.close()
+
+        # Cerrar conexiones del pool async
+        await async_engine.dispose()
+
+
+# Instancia global del contenedor (Singleton pattern)
+container = ServiceContainer(
+    totp_service=TOTPService(),
+    password_hasher=password_hasher,
+    lock_sweeper=lock_sweeper,
+    attempt_tracker=attempt_tracker,
+    totp_replay_cache=totp_replay_cache
+)
+
+
+def get_container() -> ServiceContainer:
+    """
+    Factory function para obtener el contenedor de servicios
+
+    Returns:
+        Instancia de ServiceContainer
+    """
+    return container
@@ -3,41 +3,153 @@ Configuración de base de datos
 Principio: Single Responsibility - Solo maneja conexión a BD
 Principio: Dependency Inversion - Provee abstracción para acceso a BD
 """
-from typing import Generator
-from sqlalchemy import create_engine
+import time
+from typing import AsyncGenerator, Callable, Coroutine, Dict, Tuple
+from fastapi import Depends
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.engine import Connection, make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker, Session
+from sqlalchemy.orm import Session, SessionTransaction
 
 from app.config import settings
+from app.metrics import metrics
 
-# Crear engine de SQLAlchemy
+
+def get_async_database_url() -> str:
+    """
+    Obtiene la URL de conexión para el driver async (asyncpg)
+    
+    Usa ASYNC_DATABASE_URL si está configurada; en caso contrario deriva
+    la URL a partir de DATABASE_URL cambiando el driver a asyncpg.
+    
+    Returns:
+        URL de conexión async
+    """
+    if settings.async_database_url:
+        return settings.async_database_url
+    
+    url = make_url(settings.database_url)
+    return url.set(drivername="postgresql+asyncpg").render_as_string(hide_password=False)
+
+
+# Opciones de pool compartidas por ambos engines
+_pool_options = {
+    "pool_pre_ping": True,
+    "pool_size": settings.db_pool_size,
+    "max_overflow": settings.db_max_overflow,
+    "pool_timeout": settings.db_pool_timeout,
+    "pool_recycle": settings.db_pool_recycle,
+}
+
+# Timeouts de PostgreSQL por tipo de endpoint: (statement_timeout, lock_timeout) en ms
+STATEMENT_TIMEOUTS: Dict[str, Tuple[int, int]] = {
+    "login": (settings.db_statement_timeout_login_ms, settings.db_lock_timeout_login_ms),
+    "profile": (settings.db_statement_timeout_profile_ms, settings.db_lock_timeout_profile_ms),
+    "admin": (settings.db_statement_timeout_admin_ms, settings.db_lock_timeout_admin_ms),
+}
+
+# Crear engine de SQLAlchemy (sync: comando de migraciones y benchmarks)
 engine = create_engine(
     settings.database_url,
-    pool_pre_ping=True,
-    echo=settings.debug
+    echo=settings.debug,
+    **_pool_options
+)
+
+# Crear engine async (usado por los endpoints para no bloquear el event loop)
+async_engine = create_async_engine(
+    get_async_database_url(),
+    echo=settings.debug,
+    **_pool_options
 )
 
-# Crear session factory
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# Crear session factory async
+# expire_on_commit=False: en async no se puede hacer lazy-load implícito
+# de atributos expirados después de un commit
+AsyncSessionLocal = async_sessionmaker(
+    bind=async_engine,
+    autoflush=False,
+    expire_on_commit=False
+)
 
 # Base para modelos
 Base = declarative_base()
 
 
-def get_db() -> Generator[Session, None, None]:
+# ============= Timeouts y métricas de pool =============
+
+_checkout_wait = metrics.histogram(
+    "db_pool_checkout_wait_seconds",
+    "Tiempo desde que una transacción pide conexión hasta obtenerla",
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+)
+metrics.gauge("db_pool_size", "Conexiones persistentes configuradas en el pool async", lambda: async_engine.pool.size())
+metrics.gauge("db_pool_checked_out", "Conexiones del pool async en uso", lambda: async_engine.pool.checkedout())
+metrics.gauge("db_pool_checked_in", "Conexiones del pool async libres", lambda: async_engine.pool.checkedin())
+metrics.gauge("db_pool_overflow", "Conexiones de overflow abiertas en el pool async", lambda: max(0, async_engine.pool.overflow()))
+
+
+@event.listens_for(Session, "after_transaction_create")
+def _mark_checkout_start(session: Session, transaction: SessionTransaction) -> None:
+    """
+    Marca el inicio de una transacción raíz (antes de pedir conexión al pool)
+    """
+    if transaction.parent is None:
+        session.info["_checkout_started"] = time.perf_counter()
+
+
+@event.listens_for(Session, "after_begin")
+def _on_connection_acquired(session: Session, transaction: SessionTransaction, connection: Connection) -> None:
     """
-    Dependency para obtener sesión de base de datos
-    Implementa el patrón de inyección de dependencias
+    Registra la espera de conexión y aplica los timeouts del tipo de endpoint
+    
+    set_config(..., true) equivale a SET LOCAL: solo dura la transacción
+    actual, por lo que es seguro con PgBouncer en modo transacción.
     """
-    db = SessionLocal()
-    try:
+    started = session.info.pop("_checkout_started", None)
+    if started is not None:
+        _checkout_wait.observe(time.perf_counter() - started)
+    
+    timeout_class = session.info.get("timeout_class")
+    if timeout_class is None:
+        return
+    
+    statement_timeout, lock_timeout = STATEMENT_TIMEOUTS[timeout_class]
+    connection.execute(
+        text("SELECT set_config('statement_timeout', :statement_timeout, true), "
+             "set_config('lock_timeout', :lock_timeout, true)"),
+        {"statement_timeout": str(statement_timeout), "lock_timeout": str(lock_timeout)}
+    )
+
+
+async def get_async_db() -> AsyncGenerator[AsyncSession, None]:
+    """
+    Dependency para obtener sesión async de base de datos
+    Las consultas no bloquean el event loop mientras esperan a PostgreSQL
+    """
+    async with AsyncSessionLocal() as db:
         yield db
-    finally:
-        db.close()
 
 
-def init_db() -> None:
+def db_timeouts(timeout_class: str) -> Callable[..., Coroutine]:
     """
-    Inicializa la base de datos creando todas las tablas
+    Crea una dependency que asigna los timeouts de PostgreSQL de un tipo de endpoint
+    
+    Se declara en el decorador de la ruta (dependencies=[...]). Como FastAPI
+    reutiliza la misma sesión para toda la petición, los timeouts aplican
+    también a las consultas de get_current_user.
+    
+    Args:
+        timeout_class: Tipo de endpoint ("login", "profile" o "admin")
+        
+    Returns:
+        Dependency de FastAPI
     """
-    Base.metadata.create_all(bind=engine)
+    if timeout_class not in STATEMENT_TIMEOUTS:
+        raise ValueError(f"Tipo de endpoint desconocido: {timeout_class}")
+    
+    async def apply_timeouts(db: AsyncSession = Depends(get_async_db)) -> None:
+        db.info["timeout_class"] = timeout_class
+    
+    return apply_timeouts
+
@@ -1,36 +1,139 @@
 """
 Dependencies para autenticación
-Principio: Single Responsibility - Solo maneja verificación de tokens JWT
+Principio: Single Responsibility - Solo maneja verificación de tokens JWT y cuotas de autenticación
 """
-from typing import Optional
+import math
+from typing import Any, Optional
 from uuid import UUID
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Request, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.database import get_db
-from app.models.user import User
-from app.repositories.user_repository import get_user_repository
-from app.services.auth_service import get_auth_service
+from app.cache import UserPrincipal, principal_cache
+from app.config import settings
+from app.database import get_async_db
+from app.models.user import normalize_email
+from app.rate_limit import auth_rate_limiter
+from app.repositories.user_repository import AsyncUserRepository, get_async_user_repository
+from app.services.auth_service import decode_access_token
 
 
 # Security scheme para JWT
 security = HTTPBearer()
 
+# Token de enrolamiento de 2FA (opcional: setup-2fa y verify-2fa aceptan también email y contraseña)
+enrollment_security = HTTPBearer(
+    auto_error=False,
+    scheme_name="EnrollmentToken",
+    description="Token de enrolamiento devuelto por /auth/setup-2fa (alcance 2fa_enrollment)"
+)
+
+
+def _client_ip(request: Request) -> str:
+    """
+    IP del cliente (primer salto de X-Forwarded-For solo si está habilitado)
+    """
+    if settings.rate_limit_trust_forwarded_for:
+        forwarded = request.headers.get("x-forwarded-for")
+        if forwarded:
+            return forwarded.split(",", 1)[0].strip()
+    return request.client.host if request.client else "unknown"
+
+
+def _find_email(body: Any) -> Optional[str]:
+    """
+    Busca el campo email en el cuerpo JSON (también en cuerpos con varios
+    modelos embebidos, ej. {"request": {"email": ...}, "totp_request": {...}})
+    """
+    if not isinstance(body, dict):
+        return None
+    email = body.get("email")
+    if isinstance(email, str):
+        return normalize_email(email)
+    for value in body.values():
+        if isinstance(value, dict) and isinstance(value.get("email"), str):
+            return normalize_email(value["email"])
+    return None
+
+
+async def enforce_auth_rate_limit(request: Request) -> None:
+    """
+    Dependency que aplica los límites por IP, por email y global
+    
+    Debe declararse antes que cualquier dependency de base de datos: la
+    petición se rechaza sin consultas ni hashing. El cuerpo JSON ya fue
+    leído por FastAPI, por lo que request.json() no vuelve a leer el socket.
+    
+    Raises:
+        HTTPException: 429 con Retry-After si se supera algún límite
+    """
+    if not settings.rate_limit_enabled:
+        return
+    
+    try:
+        email = _find_email(await request.json())
+    except ValueError:
+        email = None
+    
+    retry_after = auth_rate_limiter.check(_client_ip(request), email)
+    if retry_after > 0:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Demasiadas solicitudes. Intente nuevamente más tarde",
+            headers={"Retry-After": str(math.ceil(retry_after))}
+        )
+
+
+async def _load_principal(user_repository: AsyncUserRepository, user_id: UUID) -> Optional[UserPrincipal]:
+    """
+    Carga el usuario autenticado usando PrincipalCache
+    
+    - Entrada fresca: no consulta la base de datos.
+    - Entrada expirada: compara su updated_at con el de la fila (consulta
+      mínima); si coincide, la reutiliza y renueva su TTL.
+    - Sin entrada o versión distinta: carga la fila y actualiza la caché.
+    
+    Args:
+        user_repository: Repositorio async de usuarios
+        user_id: UUID del usuario
+        
+    Returns:
+        Instantánea del usuario o None si no existe
+    """
+    principal = principal_cache.get(user_id)
+    if principal is not None:
+        return principal
+    
+    cached = principal_cache.get_for_revalidation(user_id)
+    if cached is not None and cached.updated_at is not None:
+        version = await user_repository.get_version(user_id)
+        if version == cached.updated_at:
+            principal_cache.touch(user_id)
+            return cached
+    
+    user = await user_repository.get_by_id(user_id)
+    if not user:
+        principal_cache.invalidate(user_id)
+        return None
+    
+    principal = UserPrincipal.from_user(user)
+    principal_cache.put(principal)
+    return principal
+
 
 async def get_current_user(
     credentials: HTTPAuthorizationCredentials = Depends(security),
-    db: Session = Depends(get_db)
-) -> User:
+    db: AsyncSession = Depends(get_async_db)
+) -> UserPrincipal:
     """
     Dependency para obtener el usuario actual desde el token JWT
     
     Args:
         credentials: Credenciales HTTP Bearer (token JWT)
-        db: Sesión de base de datos
+        db: Sesión async de base de datos
         
     Returns:
-        Usuario autenticado
+        Usuario autenticado (instantánea cacheada de sus campos de autorización)
         
     Raises:
         HTTPException: Si el token es inválido o el usuario no existe
@@ -38,12 +141,8 @@ async def get_current_user(
     # Extraer token
     token = credentials.credentials
     
-    # Crear servicios
-    user_repository = get_user_repository(db)
-    auth_service = get_auth_service(user_repository)
-    
-    # Decodificar token
-    payload = auth_service.decode_access_token(token)
+    # Decodificar token (caché de tokens verificados, sin construir servicios)
+    payload = decode_access_token(token)
     
     if not payload:
         raise HTTPException(
@@ -71,7 +170,8 @@ async def get_current_user(
             headers={"WWW-Authenticate": "Bearer"}
         )
     
-    user = user_repository.get_by_id(user_uuid)
+    user_repository = get_async_user_repository(db)
+    user = await _load_principal(user_repository, user_uuid)
     
     if not user:
         raise HTTPException(
@@ -84,8 +184,8 @@ async def get_current_user(
 
 
 async def get_current_active_user(
-    current_user: User = Depends(get_current_user)
-) -> User:
+    current_user: UserPrincipal = Depends(get_current_user)
+) -> UserPrincipal:
     """
     Dependency para obtener usuario activo (con 2FA verificado)
     
@@ -108,8 +208,8 @@ async def get_current_active_user(
 
 
 async def require_admin(
-    current_user: User = Depends(get_current_active_user)
-) -> User:
+    current_user: UserPrincipal = Depends(get_current_active_user)
+) -> UserPrincipal:
     """
     Dependency para requerir rol ADMIN
     
@@ -9,15 +9,59 @@ Principios SOLID aplicados:
 - Interface Segregation: Schemas específicos para cada operación
 - Dependency Injection: FastAPI Depends para inyección de dependencias
 """
+import hashlib
+import json
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI, Request, status
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, PlainTextResponse, Response
 from fastapi.exceptions import RequestValidationError
 from fastapi.middleware.cors import CORSMiddleware
 from sqlalchemy.exc import IntegrityError
 
 from app.config import settings
-from app.database import init_db
+from app.container import container
+from app.database import async_engine
+from app.migrations import check_schema_version
+from app.metrics import metrics
 from app.routers import auth
+from app.services.jwt_keys import get_key_ring
+from app.services.password_hasher import PasswordHasherOverloadedError
+
+
+# ============= Lifespan =============
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Ciclo de vida de la aplicación
+    
+    Arranque: verifica la versión del esquema y calienta los servicios del
+    contenedor antes de que el worker empiece a aceptar peticiones.
+    Cierre: libera pools y tareas en segundo plano.
+    """
+    print("🚀 Iniciando aplicación...")
+    print(f"📋 Configuración: {settings.app_name}")
+    print(f"🔒 JWT Algorithm: {settings.jwt_algorithm}")
+    print(f"⏱️  TOTP Interval: {settings.totp_interval}s")
+    
+    # Verificar versión del esquema (una consulta; las migraciones se aplican
+    # aparte con `python -m app.commands.migrate`)
+    try:
+        version = await check_schema_version(async_engine)
+        print(f"✅ Esquema de base de datos en versión {version}")
+    except Exception as e:
+        print(f"❌ Error al verificar la base de datos: {e}")
+        raise
+    
+    # Calentamiento (pool de BD, Argon2, validadores) y tareas en segundo plano
+    await container.startup()
+    
+    yield
+    
+    print("🛑 Cerrando aplicación...")
+    await container.shutdown()
+
 
 # Crear instancia de FastAPI
 app = FastAPI(
@@ -25,7 +69,8 @@ app = FastAPI(
     description="API de autenticación segura con 2FA obligatorio usando Microsoft Authenticator",
     version="1.0.0",
     docs_url="/docs",
-    redoc_url="/redoc"
+    redoc_url="/redoc",
+    lifespan=lifespan
 )
 
 # ============= Middleware =============
@@ -81,6 +126,22 @@ async def integrity_exception_handler(request: Request, exc: IntegrityError):
     )
 
 
+@app.exception_handler(PasswordHasherOverloadedError)
+async def hasher_overloaded_exception_handler(request: Request, exc: PasswordHasherOverloadedError):
+    """
+    Manejo global de saturación del pool de hashing (backpressure)
+    """
+    return JSONResponse(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        content={
+            "error": "Service Unavailable",
+            "detail": str(exc),
+            "status_code": 503
+        },
+        headers={"Retry-After": str(exc.retry_after)}
+    )
+
+
 @app.exception_handler(Exception)
 async def general_exception_handler(request: Request, exc: Exception):
     """
@@ -99,39 +160,40 @@ async def general_exception_handler(request: Request, exc: Exception):
     )
 
 
-# ============= Events =============
+# ============= Routers =============
 
-@app.on_event("startup")
-async def startup_event():
-    """
-    Evento de inicio de la aplicación
-    Inicializa la base de datos
-    """
-    print("🚀 Iniciando aplicación...")
-    print(f"📋 Configuración: {settings.app_name}")
-    print(f"🔒 JWT Algorithm: {settings.jwt_algorithm}")
-    print(f"⏱️  TOTP Interval: {settings.totp_interval}s")
-    
-    # Inicializar base de datos
-    try:
-        init_db()
-        print("✅ Base de datos inicializada correctamente")
-    except Exception as e:
-        print(f"❌ Error al inicializar base de datos: {e}")
-        raise
+app.include_router(auth.router)
 
 
-@app.on_event("shutdown")
-async def shutdown_event():
-    """
-    Evento de cierre de la aplicación
-    """
-    print("🛑 Cerrando aplicación...")
+# ============= Claves públicas (JWKS) =============
 
+# El anillo de claves no cambia durante la vida del worker: el documento y su
+# ETag se serializan una vez (al importar, así una clave mal configurada
+# impide arrancar) y cada petición solo compara el If-None-Match.
+_key_ring = get_key_ring()
+_JWKS_BODY = json.dumps(_key_ring.jwks if _key_ring else {"keys": []}, separators=(",", ":")).encode("utf-8")
+_JWKS_HEADERS = {
+    "Cache-Control": f"public, max-age={settings.jwks_cache_max_age_seconds}",
+    "ETag": '"' + hashlib.sha256(_JWKS_BODY).hexdigest()[:32] + '"'
+}
 
-# ============= Routers =============
 
-app.include_router(auth.router)
+@app.get(
+    "/.well-known/jwks.json",
+    tags=["Keys"],
+    summary="Claves públicas de firma (JWKS)",
+    description="Claves públicas para validar localmente los tokens firmados con EdDSA/ES256, indexadas por kid",
+    response_class=Response
+)
+async def get_jwks(request: Request):
+    """
+    Endpoint JWKS (RFC 7517) cacheable por clientes y proxies
+    
+    Con HS256 devuelve un conjunto vacío: el secreto compartido no se publica.
+    """
+    if request.headers.get("if-none-match") == _JWKS_HEADERS["ETag"]:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=_JWKS_HEADERS)
+    return Response(content=_JWKS_BODY, media_type="application/jwk-set+json", headers=_JWKS_HEADERS)
 
 
 # ============= Health Check =============
@@ -165,7 +227,7 @@ async def health_check():
     Endpoint de health check detallado
     """
     return {
-        "status": "healthy",
+        "status": "healthy" if container.ready else "starting",
         "components": {
             "api": "ok",
             "database": "ok",  # En producción, verificar conexión real
@@ -179,6 +241,20 @@ async def health_check():
     }
 
 
+@app.get(
+    "/metrics",
+    tags=["Health"],
+    summary="Métricas operativas",
+    description="Métricas del worker en formato Prometheus (pool de conexiones, espera de checkout, cola de hashing)",
+    response_class=PlainTextResponse
+)
+async def get_metrics():
+    """
+    Endpoint de métricas en formato de texto de Prometheus
+    """
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
+
+
 # ============= Documentación adicional =============
 
 @app.get(
@@ -0,0 +1,115 @@
+"""
+Métricas de la aplicación
+Principio: Single Responsibility - Solo registra y expone métricas operativas
+
+Métricas por worker en formato de texto de Prometheus. Los gauges se
+calculan al momento de la lectura a partir de callbacks registrados.
+"""
+from typing import Callable, Dict, List, Sequence, Tuple
+
+
+class Histogram:
+    """
+    Histograma acumulativo (compatible con el tipo histogram de Prometheus)
+    """
+
+    def __init__(self, name: str, description: str, buckets: Sequence[float]):
+        """
+        Constructor
+
+        Args:
+            name: Nombre de la métrica
+            description: Descripción (HELP)
+            buckets: Límites superiores de los buckets, en orden ascendente
+        """
+        self.name = name
+        self.description = description
+        self.buckets = tuple(buckets)
+        self._counts = [0] * len(self.buckets)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        """
+        Registra una observación
+
+        Args:
+            value: Valor observado
+        """
+        self.count += 1
+        self.sum += value
+        for i, upper in enumerate(self.buckets):
+            if value <= upper:
+                self._counts[i] += 1
+
+    def render(self) -> List[str]:
+        """
+        Renderiza el histograma en formato Prometheus
+
+        Returns:
+            Líneas de texto
+        """
+        lines = [f"# HELP {self.name} {self.description}", f"# TYPE {self.name} histogram"]
+        for upper, count in zip(self.buckets, self._counts):
+            lines.append(f'{self.name}_bucket{{le="{upper}"}} {count}')
+        lines.append(f'{self.name}_bucket{{le="+Inf"}} {self.count}')
+        lines.append(f"{self.name}_sum {self.sum}")
+        lines.append(f"{self.name}_count {self.count}")
+        return lines
+
+
+class MetricsRegistry:
+    """
+    Registro de histogramas y gauges calculados
+    """
+
+    def __init__(self):
+        self._histograms: Dict[str, Histogram] = {}
+        self._gauges: Dict[str, Tuple[str, Callable[[], float]]] = {}
+
+    def histogram(self, name: str, description: str, buckets: Sequence[float]) -> Histogram:
+        """
+        Obtiene (o crea) un histograma
+
+        Args:
+            name: Nombre de la métrica
+            description: Descripción (HELP)
+            buckets: Límites superiores de los buckets
+
+        Returns:
+            Histograma registrado
+        """
+        if name not in self._histograms:
+            self._histograms[name] = Histogram(name, description, buckets)
+        return self._histograms[name]
+
+    def gauge(self, name: str, description: str, callback: Callable[[], float]) -> None:
+        """
+        Registra un gauge cuyo valor se obtiene al leer las métricas
+
+        Args:
+            name: Nombre de la métrica
+            description: Descripción (HELP)
+            callback: Función que retorna el valor actual
+        """
+        self._gauges[name] = (description, callback)
+
+    def render(self) -> str:
+        """
+        Renderiza todas las métricas en formato de texto de Prometheus
+
+        Returns:
+            Texto de exposición
+        """
+        lines: List[str] = []
+        for name, (description, callback) in self._gauges.items():
+            lines.append(f"# HELP {name} {description}")
+            lines.append(f"# TYPE {name} gauge")
+            lines.append(f"{name} {callback()}")
+        for histogram in self._histograms.values():
+            lines.extend(histogram.render())
+        return "\n".join(lines) + "\n"
+
+
+# Instancia global del registro de métricas (Singleton pattern)
+metrics = MetricsRegistry()
@@ -0,0 +1,23 @@
+"""
+Migraciones versionadas del esquema de base de datos
+
+Las migraciones se aplican una sola vez con `python -m app.commands.migrate`;
+el arranque de la aplicación solo comprueba la versión del esquema.
+"""
+from app.migrations.runner import (
+    LATEST_VERSION,
+    MIGRATIONS,
+    Migration,
+    SchemaVersionError,
+    check_schema_version,
+    upgrade,
+)
+
+__all__ = [
+    "LATEST_VERSION",
+    "MIGRATIONS",
+    "Migration",
+    "SchemaVersionError",
+    "check_schema_version",
+    "upgrade",
+]
@@ -0,0 +1,52 @@
+"""
+Operaciones reutilizables por las migraciones
+Principio: Single Responsibility - Solo encapsula DDL sin bloqueo de escrituras
+"""
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+
+
+def _is_invalid_index(conn: Connection, name: str) -> bool:
+    """
+    True si existe un índice con ese nombre marcado como inválido
+    (restos de un CREATE INDEX CONCURRENTLY interrumpido)
+    """
+    return bool(conn.execute(
+        text(
+            "SELECT NOT i.indisvalid FROM pg_index i "
+            "JOIN pg_class c ON c.oid = i.indexrelid WHERE c.relname = :name"
+        ),
+        {"name": name}
+    ).scalar())
+
+
+def create_index_concurrently(conn: Connection, name: str, definition: str, unique: bool = False) -> None:
+    """
+    Crea un índice sin bloquear escrituras sobre la tabla
+
+    Debe ejecutarse en una conexión en autocommit (migración no transaccional).
+    Si un intento anterior dejó el índice inválido, lo elimina y lo vuelve a crear.
+
+    Args:
+        conn: Conexión en autocommit
+        name: Nombre del índice
+        definition: Resto de la sentencia tras el nombre (ej. "ON users (created_at, id)")
+        unique: Crear un índice único
+    """
+    if _is_invalid_index(conn, name):
+        drop_index_concurrently(conn, name)
+
+    conn.execute(text(
+        f"CREATE {'UNIQUE ' if unique else ''}INDEX CONCURRENTLY IF NOT EXISTS {name} {definition}"
+    ))
+
+
+def drop_index_concurrently(conn: Connection, name: str) -> None:
+    """
+    Elimina un índice sin bloquear escrituras sobre la tabla
+
+    Args:
+        conn: Conexión en autocommit
+        name: Nombre del índice
+    """
+    conn.execute(text(f"DROP INDEX CONCURRENTLY IF EXISTS {name}"))
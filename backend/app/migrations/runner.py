@@ -0,0 +1,186 @@
+"""
+Ejecutor de migraciones
+Principio: Single Responsibility - Solo aplica y verifica versiones del esquema
+
+Cada migración es un módulo app/migrations/versions/vNNNN_<nombre>.py con:
+    DESCRIPTION: str
+    TRANSACTIONAL: bool  (False para CREATE/DROP INDEX CONCURRENTLY)
+    upgrade(conn): aplica el cambio
+
+Las versiones aplicadas se registran en la tabla schema_version. Un
+advisory lock de PostgreSQL serializa ejecuciones concurrentes del comando
+(ej. varios despliegues a la vez); las migraciones ya aplicadas se omiten.
+"""
+import importlib
+import pkgutil
+from dataclasses import dataclass
+from typing import Callable, List, Optional
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app.migrations import versions
+
+
+# Clave del advisory lock de migraciones (arbitraria, fija para la aplicación)
+MIGRATION_LOCK_KEY = 72_450_017
+
+
+@dataclass(frozen=True)
+class Migration:
+    """
+    Migración versionada
+    """
+    version: int
+    name: str
+    description: str
+    transactional: bool
+    upgrade: Callable[[Connection], None]
+
+
+class SchemaVersionError(RuntimeError):
+    """
+    Se lanza cuando el esquema de la BD no está al día con el código
+    """
+
+
+def _load_migrations() -> List[Migration]:
+    """
+    Carga los módulos de app/migrations/versions en orden de versión
+    """
+    migrations = []
+    for module_info in pkgutil.iter_modules(versions.__path__):
+        if not module_info.name.startswith("v"):
+            continue
+        module = importlib.import_module(f"{versions.__name__}.{module_info.name}")
+        version = int(module_info.name[1:].split("_", 1)[0])
+        migrations.append(Migration(
+            version=version,
+            name=module_info.name,
+            description=module.DESCRIPTION,
+            transactional=module.TRANSACTIONAL,
+            upgrade=module.upgrade
+        ))
+
+    migrations.sort(key=lambda migration: migration.version)
+    numbers = [migration.version for migration in migrations]
+    if numbers != list(range(1, len(numbers) + 1)):
+        raise RuntimeError(f"Versiones de migración no consecutivas: {numbers}")
+    return migrations
+
+
+MIGRATIONS = _load_migrations()
+LATEST_VERSION = MIGRATIONS[-1].version if MIGRATIONS else 0
+
+
+_CREATE_SCHEMA_VERSION_TABLE = text("""
+    CREATE TABLE IF NOT EXISTS schema_version (
+        version INTEGER PRIMARY KEY,
+        name VARCHAR NOT NULL,
+        applied_at TIMESTAMP NOT NULL DEFAULT (now() AT TIME ZONE 'utc')
+    )
+""")
+
+_CURRENT_VERSION = text("SELECT coalesce(max(version), 0) FROM schema_version")
+
+_RECORD_VERSION = text("INSERT INTO schema_version (version, name) VALUES (:version, :name)")
+
+
+def _applied_versions(conn: Connection) -> set:
+    """
+    Versiones ya registradas en schema_version
+    """
+    return set(conn.execute(text("SELECT version FROM schema_version")).scalars())
+
+
+def upgrade(engine: Engine, target: Optional[int] = None, log: Callable[[str], None] = print) -> List[Migration]:
+    """
+    Aplica las migraciones pendientes hasta target (por defecto la última)
+
+    Args:
+        engine: Engine síncrono
+        target: Versión final (None = LATEST_VERSION)
+        log: Función de salida de progreso
+
+    Returns:
+        Migraciones aplicadas en esta ejecución
+    """
+    target = LATEST_VERSION if target is None else target
+    applied: List[Migration] = []
+
+    # Conexión en autocommit: mantiene el advisory lock (a nivel de sesión)
+    # y ejecuta las migraciones no transaccionales (CONCURRENTLY)
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as lock_conn:
+        lock_conn.execute(text("SELECT pg_advisory_lock(:key)"), {"key": MIGRATION_LOCK_KEY})
+        try:
+            lock_conn.execute(_CREATE_SCHEMA_VERSION_TABLE)
+            done = _applied_versions(lock_conn)
+
+            for migration in MIGRATIONS:
+                if migration.version > target or migration.version in done:
+                    continue
+
+                log(f"→ {migration.name}: {migration.description}")
+                if migration.transactional:
+                    with engine.begin() as conn:
+                        migration.upgrade(conn)
+                        conn.execute(_RECORD_VERSION, {"version": migration.version, "name": migration.name})
+                else:
+                    migration.upgrade(lock_conn)
+                    lock_conn.execute(_RECORD_VERSION, {"version": migration.version, "name": migration.name})
+                applied.append(migration)
+        finally:
+            lock_conn.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": MIGRATION_LOCK_KEY})
+
+    return applied
+
+
+def current_version(engine: Engine) -> int:
+    """
+    Versión actual del esquema (0 si nunca se migró)
+
+    Args:
+        engine: Engine síncrono
+
+    Returns:
+        Última versión aplicada
+    """
+    with engine.connect() as conn:
+        conn.execute(_CREATE_SCHEMA_VERSION_TABLE)
+        version = conn.execute(_CURRENT_VERSION).scalar_one()
+        conn.commit()
+        return version
+
+
+async def check_schema_version(async_engine: AsyncEngine) -> int:
+    """
+    Comprobación de arranque: una consulta, sin reflexión del esquema
+
+    Un esquema más nuevo que el código se acepta (despliegues graduales con
+    migraciones compatibles hacia atrás); uno más antiguo no.
+
+    Args:
+        async_engine: Engine async de la aplicación
+
+    Returns:
+        Versión actual del esquema
+
+    Raises:
+        SchemaVersionError: Si faltan migraciones por aplicar
+    """
+    try:
+        async with async_engine.connect() as conn:
+            version = (await conn.execute(_CURRENT_VERSION)).scalar_one()
+    except DBAPIError as e:
+        raise SchemaVersionError(
+            "La tabla schema_version no existe. Ejecute: python -m app.commands.migrate"
+        ) from e
+
+    if version < LATEST_VERSION:
+        raise SchemaVersionError(
+            f"Esquema en versión {version}, se requiere {LATEST_VERSION}. "
+            "Ejecute: python -m app.commands.migrate"
+        )
+    return version
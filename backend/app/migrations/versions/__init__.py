@@ -0,0 +1,3 @@
+"""
+Módulos de migración (vNNNN_<nombre>.py, en orden de versión)
+"""
@@ -0,0 +1,33 @@
+"""
+Migración 0001: esquema inicial
+
+Equivale a lo que creaba Base.metadata.create_all en el arranque. Es
+idempotente (IF NOT EXISTS) para adoptar bases de datos creadas así.
+"""
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+
+
+DESCRIPTION = "Tabla users (esquema creado antes por create_all)"
+TRANSACTIONAL = True
+
+
+def upgrade(conn: Connection) -> None:
+    conn.execute(text("""
+        CREATE TABLE IF NOT EXISTS users (
+            id UUID NOT NULL PRIMARY KEY,
+            email VARCHAR NOT NULL,
+            hashed_password VARCHAR NOT NULL,
+            role VARCHAR NOT NULL,
+            name VARCHAR NOT NULL,
+            phone_number VARCHAR,
+            totp_secret VARCHAR,
+            totp_verified BOOLEAN,
+            failed_login_attempts INTEGER NOT NULL,
+            locked_until TIMESTAMP WITHOUT TIME ZONE,
+            created_at TIMESTAMP WITHOUT TIME ZONE,
+            updated_at TIMESTAMP WITHOUT TIME ZONE
+        )
+    """))
+    conn.execute(text("CREATE INDEX IF NOT EXISTS ix_users_id ON users (id)"))
+    conn.execute(text("CREATE UNIQUE INDEX IF NOT EXISTS ix_users_email ON users (email)"))
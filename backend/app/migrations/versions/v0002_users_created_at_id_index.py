@@ -0,0 +1,14 @@
+"""
+Migración 0002: índice de paginación keyset del listado administrativo
+"""
+from sqlalchemy.engine import Connection
+
+from app.migrations.operations import create_index_concurrently
+
+
+DESCRIPTION = "Índice (created_at, id) para GET /auth/admin/users"
+TRANSACTIONAL = False
+
+
+def upgrade(conn: Connection) -> None:
+    create_index_concurrently(conn, "ix_users_created_at_id", "ON users (created_at, id)")
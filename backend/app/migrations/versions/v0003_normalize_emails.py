@@ -0,0 +1,30 @@
+"""
+Migración 0003: emails normalizados (sin espacios, en minúsculas)
+
+Requisito del índice único sobre lower(email) (0004). Si existen cuentas
+que solo difieren en mayúsculas se aborta sin cambios: deben fusionarse
+o renombrarse manualmente.
+"""
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+
+
+DESCRIPTION = "Normalizar emails existentes a minúsculas"
+TRANSACTIONAL = True
+
+
+def upgrade(conn: Connection) -> None:
+    duplicates = conn.execute(text("""
+        SELECT lower(btrim(email)) FROM users
+        GROUP BY lower(btrim(email)) HAVING count(*) > 1
+        LIMIT 20
+    """)).scalars().all()
+    if duplicates:
+        raise RuntimeError(
+            "Existen cuentas con el mismo email salvo mayúsculas; resuélvalas antes de migrar: "
+            + ", ".join(duplicates)
+        )
+
+    conn.execute(text(
+        "UPDATE users SET email = lower(btrim(email)) WHERE email <> lower(btrim(email))"
+    ))
@@ -0,0 +1,23 @@
+"""
+Migración 0004: índice único sobre lower(email)
+
+Reemplaza el índice único sobre email (sensible a mayúsculas) sin bloquear
+escrituras: primero se crea el nuevo y después se elimina el anterior.
+"""
+from sqlalchemy.engine import Connection
+
+from app.migrations.operations import create_index_concurrently, drop_index_concurrently
+
+
+DESCRIPTION = "Índice único lower(email)"
+TRANSACTIONAL = False
+
+
+def upgrade(conn: Connection) -> None:
+    create_index_concurrently(
+        conn,
+        "uq_users_email_lower",
+        "ON users (lower(email))",
+        unique=True
+    )
+    drop_index_concurrently(conn, "ix_users_email")
@@ -0,0 +1,29 @@
+"""
+Migración 0005: tabla de refresh tokens
+"""
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+
+
+DESCRIPTION = "Tabla refresh_tokens (hash SHA-256, familia por sesión) para /auth/refresh"
+TRANSACTIONAL = True
+
+
+def upgrade(conn: Connection) -> None:
+    # Tabla nueva y vacía: los índices se crean en la misma transacción sin bloquear a nadie
+    conn.execute(text("""
+        CREATE TABLE refresh_tokens (
+            id UUID NOT NULL PRIMARY KEY,
+            user_id UUID NOT NULL REFERENCES users (id) ON DELETE CASCADE,
+            family_id UUID NOT NULL,
+            token_hash BYTEA NOT NULL,
+            expires_at TIMESTAMP WITHOUT TIME ZONE NOT NULL,
+            created_at TIMESTAMP WITHOUT TIME ZONE NOT NULL,
+            rotated_at TIMESTAMP WITHOUT TIME ZONE,
+            revoked_at TIMESTAMP WITHOUT TIME ZONE
+        )
+    """))
+    conn.execute(text("CREATE UNIQUE INDEX uq_refresh_tokens_token_hash ON refresh_tokens (token_hash)"))
+    conn.execute(text("CREATE INDEX ix_refresh_tokens_family_id ON refresh_tokens (family_id)"))
+    conn.execute(text("CREATE INDEX ix_refresh_tokens_user_id ON refresh_tokens (user_id)"))
+    conn.execute(text("CREATE INDEX ix_refresh_tokens_expires_at ON refresh_tokens (expires_at)"))
@@ -0,0 +1,60 @@
+"""
+Generación de identificadores
+Principio: Single Responsibility - Solo genera claves primarias
+
+UUIDv7 (RFC 9562): los 48 bits altos son el instante Unix en milisegundos,
+por lo que los ids nuevos se insertan siempre al final del índice de la
+clave primaria (sin divisiones de página aleatorias como con uuid4). Sigue
+siendo un UUID de 128 bits: convive con los ids uuid4 existentes en la misma
+columna y en los claims del JWT.
+"""
+import os
+import threading
+import time
+import uuid
+
+
+_lock = threading.Lock()
+_last_timestamp_ms = 0
+_last_counter = 0
+
+# rand_a (12 bits) se usa como contador dentro del mismo milisegundo
+_COUNTER_MAX = 0xFFF
+
+
+def uuid7() -> uuid.UUID:
+    """
+    Genera un UUIDv7 monótono dentro del proceso
+
+    Dentro de un mismo milisegundo el campo rand_a actúa como contador
+    (método 1 de RFC 9562 §6.2); si se agota, se avanza al siguiente milisegundo.
+
+    Returns:
+        UUID versión 7
+    """
+    global _last_timestamp_ms, _last_counter
+
+    with _lock:
+        timestamp_ms = time.time_ns() // 1_000_000
+        if timestamp_ms > _last_timestamp_ms:
+            # Nuevo milisegundo: contador aleatorio en la mitad inferior (deja margen para incrementar)
+            counter = int.from_bytes(os.urandom(2), "big") & 0x7FF
+        else:
+            # Mismo milisegundo (o reloj hacia atrás): continuar la secuencia anterior
+            timestamp_ms = _last_timestamp_ms
+            counter = _last_counter + 1
+            if counter > _COUNTER_MAX:
+                timestamp_ms += 1
+                counter = 0
+        _last_timestamp_ms = timestamp_ms
+        _last_counter = counter
+
+    rand_b = int.from_bytes(os.urandom(8), "big") & ((1 << 62) - 1)
+    value = (
+        (timestamp_ms & ((1 << 48) - 1)) << 80
+        | 0x7 << 76
+        | counter << 64
+        | 0b10 << 62
+        | rand_b
+    )
+    return uuid.UUID(int=value)
@@ -0,0 +1,47 @@
+"""
+Modelo de Refresh Token
+Principio: Single Responsibility - Solo representa la entidad RefreshToken en BD
+
+Solo se guarda el SHA-256 del token (el token es aleatorio de 256 bits, no
+necesita un hash lento): una fuga de la tabla no permite usar los tokens.
+Cada rotación crea un token nuevo en la misma familia (la sesión iniciada
+con un login); presentar un token ya rotado revoca la familia completa.
+"""
+from datetime import datetime
+from sqlalchemy import Column, DateTime, ForeignKey, Index, LargeBinary
+from sqlalchemy.dialects.postgresql import UUID
+from app.database import Base
+from app.models.ids import uuid7
+
+
+class RefreshToken(Base):
+    """
+    Refresh token (hasheado) de una sesión
+    """
+    __tablename__ = "refresh_tokens"
+    __table_args__ = (
+        # Búsqueda del token presentado en /auth/refresh (única lectura del endpoint)
+        Index("uq_refresh_tokens_token_hash", "token_hash", unique=True),
+        # Revocación de una sesión completa (reutilización detectada, logout)
+        Index("ix_refresh_tokens_family_id", "family_id"),
+        # Borrado en cascada de los tokens del usuario
+        Index("ix_refresh_tokens_user_id", "user_id"),
+        # Purga de tokens expirados
+        Index("ix_refresh_tokens_expires_at", "expires_at"),
+    )
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid7)
+    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    # Todos los tokens de una misma sesión (login) comparten familia
+    family_id = Column(UUID(as_uuid=True), nullable=False)
+    # SHA-256 del token (32 bytes)
+    token_hash = Column(LargeBinary, nullable=False)
+
+    expires_at = Column(DateTime, nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    # Momento en que se canjeó por uno nuevo (un token solo se canjea una vez)
+    rotated_at = Column(DateTime, nullable=True)
+    revoked_at = Column(DateTime, nullable=True)
+
+    def __repr__(self) -> str:
+        return f"<RefreshToken(id={self.id}, user_id={self.user_id}, family_id={self.family_id})>"
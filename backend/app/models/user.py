@@ -3,11 +3,25 @@ Modelo de Usuario
 Principio: Single Responsibility - Solo representa entidad User en BD
 """
 from datetime import datetime
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, Enum
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, Enum, Index, func
 from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.orm import validates
 import enum
-import uuid
 from app.database import Base
+from app.models.ids import uuid7
+
+
+def normalize_email(email: str) -> str:
+    """
+    Forma canónica de un email (sin espacios, en minúsculas)
+    
+    Args:
+        email: Email tal como lo envió el cliente
+        
+    Returns:
+        Email normalizado
+    """
+    return email.strip().lower()
 
 
 class UserRole(str, enum.Enum):
@@ -21,9 +35,15 @@ class User(Base):
     Modelo de usuario con soporte para 2FA y control de seguridad
     """
     __tablename__ = "users"
+    __table_args__ = (
+        # Paginación keyset del listado administrativo (ORDER BY created_at, id)
+        Index("ix_users_created_at_id", "created_at", "id"),
+    )
     
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4, index=True)
-    email = Column(String, unique=True, index=True, nullable=False)
+    # UUIDv7: ordenado por tiempo (inserciones al final del índice); compatible con ids uuid4 existentes
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid7, index=True)
+    # Unicidad sin distinguir mayúsculas: índice uq_users_email_lower (ver abajo)
+    email = Column(String, nullable=False)
     hashed_password = Column(String, nullable=False)
     role = Column(String, default=UserRole.CLIENT.value, nullable=False)
     
@@ -43,5 +63,16 @@ class User(Base):
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
+    @validates("email")
+    def _normalize_email(self, key: str, email: str) -> str:
+        """Normaliza el email en cada escritura desde el ORM"""
+        return normalize_email(email)
+    
     def __repr__(self) -> str:
         return f"<User(id={self.id}, email={self.email}, totp_verified={self.totp_verified})>"
+
+
+# Único sobre lower(email) (búsquedas sin distinguir mayúsculas). Sin INCLUDE:
+# el login lee la fila completa de todos modos, y cubrir failed_login_attempts
+# o locked_until impediría que sus escrituras fueran actualizaciones HOT
+Index("uq_users_email_lower", func.lower(User.email), unique=True)
@@ -0,0 +1,147 @@
+"""
+Limitación de tasa en memoria del proceso
+Principio: Single Responsibility - Solo decide si una petición supera su cuota
+
+Usa GCRA (Generic Cell Rate Algorithm): equivalente a una ventana deslizante
+de `limit` peticiones por `period` segundos, pero guardando un único número
+por clave (el "theoretical arrival time") en lugar de la lista de instantes.
+Las decisiones se toman antes de tocar la base de datos o Argon2.
+"""
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+from app.config import settings
+from app.metrics import metrics
+
+
+class GCRARateLimiter:
+    """
+    Limitador GCRA por clave con memoria acotada (LRU)
+    """
+
+    def __init__(self, name: str, limit: int, period: float, max_keys: int):
+        """
+        Constructor
+
+        Args:
+            name: Nombre del límite (para métricas)
+            limit: Peticiones permitidas por periodo (también la ráfaga máxima)
+            period: Duración del periodo en segundos
+            max_keys: Claves máximas en memoria (se descartan las menos usadas)
+        """
+        self.name = name
+        self.limit = limit
+        self.period = period
+        self.max_keys = max_keys
+        self.rejected = 0
+        # Intervalo entre peticiones a ritmo sostenido y tolerancia de ráfaga
+        self._interval = period / limit
+        self._tolerance = period - self._interval
+        self._tat: "OrderedDict[str, float]" = OrderedDict()
+
+    def peek(self, key: str, now: float) -> Tuple[float, float]:
+        """
+        Evalúa una petición sin registrarla
+
+        Args:
+            key: Clave limitada (IP, email...)
+            now: Instante actual (reloj monótono)
+
+        Returns:
+            Tupla (nuevo TAT si se acepta, segundos de espera; 0 = permitida)
+        """
+        tat = max(self._tat.get(key, now), now)
+        retry_after = tat - now - self._tolerance
+        return tat + self._interval, max(0.0, retry_after)
+
+    def commit(self, key: str, tat: float) -> None:
+        """
+        Registra una petición aceptada
+
+        Args:
+            key: Clave limitada
+            tat: Nuevo TAT devuelto por peek
+        """
+        self._tat[key] = tat
+        self._tat.move_to_end(key)
+        while len(self._tat) > self.max_keys:
+            self._tat.popitem(last=False)
+
+    def clear(self) -> None:
+        """
+        Olvida todas las claves
+        """
+        self._tat.clear()
+
+
+class AuthRateLimiter:
+    """
+    Límites combinados de los endpoints de autenticación: por IP, por email y global
+
+    Una petición se registra en los tres límites solo si ninguno la rechaza,
+    para que las peticiones rechazadas no consuman cuota de otros límites.
+    """
+
+    def __init__(self, per_ip: GCRARateLimiter, per_email: GCRARateLimiter, global_: GCRARateLimiter):
+        """
+        Constructor
+
+        Args:
+            per_ip: Límite por dirección IP del cliente
+            per_email: Límite por email objetivo
+            global_: Límite para todos los clientes
+        """
+        self.per_ip = per_ip
+        self.per_email = per_email
+        self.global_ = global_
+
+    def check(self, ip: str, email: Optional[str]) -> float:
+        """
+        Evalúa y, si procede, registra una petición
+
+        Args:
+            ip: IP del cliente
+            email: Email objetivo (None si la petición no lo incluye)
+
+        Returns:
+            Segundos que el cliente debe esperar (0 = permitida)
+        """
+        now = time.monotonic()
+        checks: List[Tuple[GCRARateLimiter, str]] = [(self.per_ip, ip), (self.global_, "*")]
+        if email:
+            checks.append((self.per_email, email))
+
+        pending: Dict[GCRARateLimiter, Tuple[str, float]] = {}
+        for limiter, key in checks:
+            tat, retry_after = limiter.peek(key, now)
+            if retry_after > 0:
+                limiter.rejected += 1
+                return retry_after
+            pending[limiter] = (key, tat)
+
+        for limiter, (key, tat) in pending.items():
+            limiter.commit(key, tat)
+        return 0.0
+
+    def clear(self) -> None:
+        """
+        Olvida el estado de todos los límites
+        """
+        for limiter in (self.per_ip, self.per_email, self.global_):
+            limiter.clear()
+
+
+# Instancia global del limitador de autenticación (Singleton pattern)
+auth_rate_limiter = AuthRateLimiter(
+    per_ip=GCRARateLimiter("ip", settings.rate_limit_ip_per_minute, 60, settings.rate_limit_max_keys),
+    per_email=GCRARateLimiter("email", settings.rate_limit_email_per_minute, 60, settings.rate_limit_max_keys),
+    global_=GCRARateLimiter("global", settings.rate_limit_global_per_second, 1, 1)
+)
+
+for _limiter in (auth_rate_limiter.per_ip, auth_rate_limiter.per_email, auth_rate_limiter.global_):
+    metrics.gauge(
+        f"auth_rate_limit_rejected_{_limiter.name}",
+        f"Peticiones de autenticación rechazadas por el límite {_limiter.name}",
+        lambda limiter=_limiter: limiter.rejected
+    )
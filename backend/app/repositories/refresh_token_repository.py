@@ -0,0 +1,207 @@
+"""
+Repositorio de Refresh Tokens
+Principio: Single Responsibility - Solo maneja la persistencia de refresh tokens
+Principio: Dependency Inversion - Trabaja con abstracciones (AsyncSession)
+"""
+from datetime import datetime
+from typing import Optional
+from uuid import UUID
+from sqlalchemy import delete, insert, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql import Delete, Insert, Select, Update
+
+from app.models.refresh_token import RefreshToken
+from app.models.user import User
+
+
+def _rotate_statement(token_hash: bytes, now: datetime) -> Update:
+    """
+    Construye el UPDATE que canjea un refresh token vigente y devuelve su usuario
+
+    Una sola sentencia sobre el índice único de token_hash: marca el token
+    como rotado solo si no estaba rotado, revocado ni expirado y si su
+    usuario sigue teniendo el 2FA verificado (UPDATE ... FROM users). Dos
+    canjes concurrentes del mismo token no pueden ganar ambos.
+
+    Args:
+        token_hash: SHA-256 del token presentado
+        now: Instante actual (UTC)
+
+    Returns:
+        Sentencia UPDATE ... RETURNING users.*, refresh_tokens.family_id
+    """
+    return (
+        update(RefreshToken)
+        .where(
+            RefreshToken.token_hash == token_hash,
+            RefreshToken.rotated_at.is_(None),
+            RefreshToken.revoked_at.is_(None),
+            RefreshToken.expires_at > now,
+            RefreshToken.user_id == User.id,
+            User.totp_verified.is_(True)
+        )
+        .values(rotated_at=now)
+        .returning(User, RefreshToken.family_id)
+        .execution_options(synchronize_session=False)
+    )
+
+
+def _insert_statement(user_id: UUID, family_id: UUID, token_hash: bytes, expires_at: datetime) -> Insert:
+    """
+    Construye el INSERT de un refresh token
+
+    Returns:
+        Sentencia INSERT
+    """
+    return insert(RefreshToken).values(
+        user_id=user_id,
+        family_id=family_id,
+        token_hash=token_hash,
+        expires_at=expires_at
+    )
+
+
+def _get_by_hash_statement(token_hash: bytes) -> Select:
+    """
+    Construye la consulta de un token por su hash (índice único)
+    """
+    return select(RefreshToken).where(RefreshToken.token_hash == token_hash)
+
+
+def _revoke_family_statement(family_id: UUID, now: datetime, user_id: Optional[UUID] = None) -> Update:
+    """
+    Construye el UPDATE que revoca todos los tokens de una familia
+
+    Args:
+        family_id: Familia (sesión) a revocar
+        now: Instante actual (UTC)
+        user_id: Si se indica, solo revoca si la familia es de ese usuario
+
+    Returns:
+        Sentencia UPDATE
+    """
+    statement = (
+        update(RefreshToken)
+        .where(RefreshToken.family_id == family_id, RefreshToken.revoked_at.is_(None))
+        .values(revoked_at=now)
+        .execution_options(synchronize_session=False)
+    )
+    if user_id is not None:
+        statement = statement.where(RefreshToken.user_id == user_id)
+    return statement
+
+
+def _delete_expired_statement(now: datetime) -> Delete:
+    """
+    Construye el DELETE de los tokens expirados
+
+    Un token rotado se conserva hasta su expiración para poder detectar su
+    reutilización; después ya no sería aceptado de todos modos.
+    """
+    return (
+        delete(RefreshToken)
+        .where(RefreshToken.expires_at <= now)
+        .execution_options(synchronize_session=False)
+    )
+
+
+class AsyncRefreshTokenRepository:
+    """
+    Repositorio async de refresh tokens
+    """
+
+    def __init__(self, db: AsyncSession):
+        """
+        Constructor con inyección de dependencias
+
+        Args:
+            db: Sesión async de SQLAlchemy
+        """
+        self.db = db
+
+    async def create(self, user_id: UUID, family_id: UUID, token_hash: bytes, expires_at: datetime) -> None:
+        """
+        Guarda un refresh token nuevo
+
+        Args:
+            user_id: UUID del usuario
+            family_id: Familia (sesión) del token
+            token_hash: SHA-256 del token
+            expires_at: Expiración (UTC)
+        """
+        await self.db.execute(_insert_statement(user_id, family_id, token_hash, expires_at))
+        await self.db.commit()
+
+    async def rotate(self, token_hash: bytes, new_token_hash: bytes, expires_at: datetime) -> Optional[User]:
+        """
+        Canjea un token vigente por uno nuevo de la misma familia (una transacción)
+
+        Args:
+            token_hash: SHA-256 del token presentado
+            new_token_hash: SHA-256 del token nuevo
+            expires_at: Expiración del token nuevo (UTC)
+
+        Returns:
+            Usuario del token o None si el token no es canjeable
+        """
+        result = await self.db.execute(_rotate_statement(token_hash, datetime.utcnow()))
+        row = result.first()
+        if row is None:
+            return None
+
+        user, family_id = row
+        await self.db.execute(_insert_statement(user.id, family_id, new_token_hash, expires_at))
+        await self.db.commit()
+        return user
+
+    async def get_by_hash(self, token_hash: bytes) -> Optional[RefreshToken]:
+        """
+        Obtiene un token por su hash
+
+        Args:
+            token_hash: SHA-256 del token
+
+        Returns:
+            Token o None si no existe
+        """
+        result = await self.db.execute(_get_by_hash_statement(token_hash))
+        return result.scalars().first()
+
+    async def revoke_family(self, family_id: UUID, user_id: Optional[UUID] = None) -> int:
+        """
+        Revoca todos los tokens vigentes de una familia
+
+        Args:
+            family_id: Familia (sesión) a revocar
+            user_id: Si se indica, solo revoca si la familia es de ese usuario
+
+        Returns:
+            Número de tokens revocados
+        """
+        result = await self.db.execute(_revoke_family_statement(family_id, datetime.utcnow(), user_id))
+        await self.db.commit()
+        return result.rowcount
+
+    async def delete_expired(self) -> int:
+        """
+        Elimina en lote los tokens expirados
+
+        Returns:
+            Número de tokens eliminados
+        """
+        result = await self.db.execute(_delete_expired_statement(datetime.utcnow()))
+        await self.db.commit()
+        return result.rowcount
+
+
+def get_async_refresh_token_repository(db: AsyncSession) -> AsyncRefreshTokenRepository:
+    """
+    Factory function para obtener instancia de AsyncRefreshTokenRepository
+
+    Args:
+        db: Sesión async de base de datos
+
+    Returns:
+        Instancia de AsyncRefreshTokenRepository
+    """
+    return AsyncRefreshTokenRepository(db)
@@ -1,35 +1,410 @@
 """
 Repositorio de Usuarios
 Principio: Single Responsibility - Solo maneja operaciones CRUD de usuarios
-Principio: Dependency Inversion - Trabaja con abstracciones (Session)
+Principio: Dependency Inversion - Trabaja con abstracciones (AsyncSession)
 """
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import AsyncIterator, Optional, Sequence, Tuple
 from uuid import UUID
-from sqlalchemy.orm import Session
-from sqlalchemy.exc import IntegrityError
+from sqlalchemy import and_, case, delete, func, not_, select, text, tuple_, update
+from sqlalchemy.dialects.postgresql import Insert, insert as pg_insert
+from sqlalchemy.engine import Row
+from sqlalchemy.sql import ColumnElement, Delete, Select, Update
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.models.user import User
+from app.cache import principal_cache
+from app.models.user import User, normalize_email
 
 
-class UserRepository:
+def _is_locked_expression(now: datetime) -> ColumnElement[bool]:
+    """
+    Expresión SQL equivalente a AsyncUserRepository.is_account_locked
+    
+    Args:
+        now: Instante de referencia (UTC)
+        
+    Returns:
+        Expresión booleana evaluada por PostgreSQL
+    """
+    return and_(User.locked_until.is_not(None), User.locked_until > now)
+
+
+# Columnas que expone UserResponse (proyección para listados)
+USER_RESPONSE_COLUMNS = (
+    User.id,
+    User.email,
+    User.name,
+    User.phone_number,
+    User.role,
+    User.totp_verified,
+    User.created_at,
+)
+
+
+def _user_filter_conditions(
+    role: Optional[str] = None,
+    totp_verified: Optional[bool] = None,
+    locked: Optional[bool] = None
+) -> list:
+    """
+    Construye las condiciones WHERE de los filtros administrativos
+    
+    Args:
+        role: Filtrar por rol (None = sin filtro)
+        totp_verified: Filtrar por 2FA verificado (None = sin filtro)
+        locked: Filtrar por cuentas bloqueadas actualmente (None = sin filtro)
+        
+    Returns:
+        Lista de condiciones (vacía si no hay filtros)
+    """
+    conditions = []
+    if role is not None:
+        conditions.append(User.role == role)
+    if totp_verified is not None:
+        conditions.append(User.totp_verified == totp_verified)
+    if locked is not None:
+        is_locked = _is_locked_expression(datetime.utcnow())
+        conditions.append(is_locked if locked else not_(is_locked))
+    return conditions
+
+
+def _list_page_statement(
+    limit: int,
+    after: Optional[Tuple[datetime, UUID]],
+    conditions: Sequence[ColumnElement[bool]]
+) -> Select:
+    """
+    Construye el SELECT paginado por keyset sobre (created_at, id), más recientes primero
+    
+    La comparación de filas (created_at, id) < (:created_at, :id) usa el índice
+    ix_users_created_at_id, por lo que el coste no depende de la página.
+    
+    Args:
+        limit: Filas a obtener
+        after: Clave (created_at, id) de la última fila de la página anterior
+        conditions: Condiciones de filtrado
+        
+    Returns:
+        Sentencia SELECT con la proyección de USER_RESPONSE_COLUMNS
+    """
+    statement = select(*USER_RESPONSE_COLUMNS).where(*conditions)
+    if after is not None:
+        statement = statement.where(tuple_(User.created_at, User.id) < tuple_(*after))
+    return statement.order_by(User.created_at.desc(), User.id.desc()).limit(limit)
+
+
+def _export_statement(conditions: Sequence[ColumnElement[bool]], batch_size: int) -> Select:
+    """
+    Construye el SELECT de exportación leído con cursor de servidor
+    
+    Args:
+        conditions: Condiciones de filtrado
+        batch_size: Filas por lote (yield_per)
+        
+    Returns:
+        Sentencia SELECT con la proyección de USER_RESPONSE_COLUMNS en orden de creación
+    """
+    return (
+        select(*USER_RESPONSE_COLUMNS)
+        .where(*conditions)
+        .order_by(User.created_at, User.id)
+        .execution_options(yield_per=batch_size)
+    )
+
+
+def _capped_count_statement(conditions: Sequence[ColumnElement[bool]], cap: int) -> Select:
+    """
+    Construye un COUNT que deja de contar al superar el límite
+    
+    Args:
+        conditions: Condiciones de filtrado
+        cap: Máximo de filas a contar
+        
+    Returns:
+        Sentencia SELECT count(*) FROM (SELECT 1 ... LIMIT cap + 1)
+    """
+    limited = select(User.id).where(*conditions).limit(cap + 1).subquery()
+    return select(func.count()).select_from(limited)
+
+
+# Estimación del planner (pg_class.reltuples): -1 si la tabla nunca se analizó
+_ESTIMATED_COUNT_STATEMENT = text(
+    "SELECT reltuples::bigint FROM pg_class WHERE oid = 'users'::regclass"
+)
+
+
+def _insert_user_statement(values: dict) -> Insert:
+    """
+    Construye el INSERT de un usuario que no falla si el email ya existe
+    
+    Sustituye el patrón SELECT (existe) + INSERT + refresh por una única
+    sentencia: si otro registro ganó la carrera, RETURNING no devuelve filas
+    en lugar de lanzar IntegrityError.
+    
+    Args:
+        values: Valores del usuario (email, hashed_password, name, phone_number, role)
+        
+    Returns:
+        Sentencia INSERT ... ON CONFLICT (lower(email)) DO NOTHING RETURNING users.*
+    """
+    return (
+        pg_insert(User)
+        .values(**values)
+        .on_conflict_do_nothing(index_elements=[func.lower(User.email)])
+        .returning(User)
+    )
+
+
+def _bulk_insert_statement(rows: Sequence[dict]) -> Insert:
+    """
+    Construye un INSERT multi-fila que omite emails ya registrados
+    
+    Una sola sentencia por lote (un viaje a la BD). Los emails que ya existen
+    (incluidos los insertados concurrentemente) no generan error: simplemente
+    no aparecen en el RETURNING.
+    
+    Args:
+        rows: Valores de cada usuario (email, hashed_password, name, phone_number, role)
+        
+    Returns:
+        Sentencia INSERT ... ON CONFLICT (lower(email)) DO NOTHING RETURNING id, email
+    """
+    return (
+        pg_insert(User)
+        .values([{**row, "email": normalize_email(row["email"])} for row in rows])
+        .on_conflict_do_nothing(index_elements=[func.lower(User.email)])
+        .returning(User.id, User.email)
+    )
+
+
+def _id_chunk_statement(
+    conditions: Sequence[ColumnElement[bool]],
+    after: Optional[UUID],
+    limit: int
+) -> Select:
+    """
+    Construye el SELECT del siguiente bloque de ids (keyset sobre la clave primaria)
+    
+    Args:
+        conditions: Condiciones de filtrado
+        after: Último id del bloque anterior (None = desde el principio)
+        limit: Ids por bloque
+        
+    Returns:
+        Sentencia SELECT id ... ORDER BY id LIMIT limit
+    """
+    statement = select(User.id).where(*conditions)
+    if after is not None:
+        statement = statement.where(User.id > after)
+    return statement.order_by(User.id).limit(limit)
+
+
+def _bulk_update_statement(user_ids: Sequence[UUID], values: dict) -> Update:
+    """
+    Construye un UPDATE set-based sobre un bloque de usuarios
+    
+    Args:
+        user_ids: UUIDs del bloque
+        values: Columnas a actualizar
+        
+    Returns:
+        Sentencia UPDATE ... WHERE id IN (...) RETURNING id
+    """
+    return (
+        update(User)
+        .where(User.id.in_(user_ids))
+        .values(**values)
+        .returning(User.id)
+        .execution_options(synchronize_session=False)
+    )
+
+
+def _bulk_delete_statement(user_ids: Sequence[UUID]) -> Delete:
+    """
+    Construye un DELETE set-based sobre un bloque de usuarios
+    
+    Args:
+        user_ids: UUIDs del bloque
+        
+    Returns:
+        Sentencia DELETE ... WHERE id IN (...) RETURNING id
+    """
+    return (
+        delete(User)
+        .where(User.id.in_(user_ids))
+        .returning(User.id)
+        .execution_options(synchronize_session=False)
+    )
+
+
+def _get_by_email_with_lock_state_statement(email: str) -> Select:
+    """
+    Construye el SELECT del usuario junto con su estado de bloqueo
+    
+    Args:
+        email: Email del usuario
+        
+    Returns:
+        Sentencia SELECT (User, is_locked)
+    """
+    return select(
+        User,
+        _is_locked_expression(datetime.utcnow()).label("is_locked")
+    ).where(func.lower(User.email) == normalize_email(email))
+
+
+def _clear_expired_locks_statement() -> Update:
+    """
+    Construye el UPDATE que limpia en lote todos los bloqueos expirados
+    
+    Returns:
+        Sentencia UPDATE sobre todas las filas con locked_until vencido
+    """
+    return (
+        update(User)
+        .where(User.locked_until.is_not(None), User.locked_until <= datetime.utcnow())
+        .values(failed_login_attempts=0, locked_until=None)
+        .execution_options(synchronize_session=False)
+    )
+
+
+def _update_user_statement(user_id: UUID, values: dict) -> Update:
+    """
+    Construye un UPDATE ... RETURNING que hidrata el usuario actualizado
+    
+    Reemplaza el patrón get + commit + refresh (tres viajes a la BD) por una
+    única sentencia. populate_existing actualiza la instancia si ya estaba
+    cargada en la sesión.
+    
+    Args:
+        user_id: UUID del usuario
+        values: Columnas a actualizar
+        
+    Returns:
+        Sentencia UPDATE ... RETURNING users.*
+    """
+    return (
+        update(User)
+        .where(User.id == user_id)
+        .values(**values)
+        .returning(User)
+        .execution_options(synchronize_session=False, populate_existing=True)
+    )
+
+
+def _delete_user_statement(user_id: UUID) -> Delete:
+    """
+    Construye un DELETE ... RETURNING del usuario eliminado
+    
+    Args:
+        user_id: UUID del usuario
+        
+    Returns:
+        Sentencia DELETE ... RETURNING users.*
+    """
+    return (
+        delete(User)
+        .where(User.id == user_id)
+        .returning(User)
+        .execution_options(synchronize_session=False)
+    )
+
+
+def _record_failed_attempt_statement(user_id: UUID, max_attempts: int, lock_minutes: int) -> Update:
+    """
+    Construye el UPDATE atómico que registra un intento fallido
+    
+    El incremento y la decisión de bloqueo se evalúan en PostgreSQL sobre el
+    valor actual de la fila, por lo que peticiones concurrentes no pierden
+    actualizaciones (no hay lectura-modificación-escritura en Python).
+    
+    Args:
+        user_id: UUID del usuario
+        max_attempts: Intentos fallidos que provocan el bloqueo
+        lock_minutes: Minutos de bloqueo
+        
+    Returns:
+        Sentencia UPDATE ... RETURNING users.*
+    """
+    now = datetime.utcnow()
+    
+    # Un bloqueo expirado que el barrido aún no limpió reinicia el contador
+    lock_expired = and_(User.locked_until.is_not(None), User.locked_until <= now)
+    attempts = case(
+        (lock_expired, 1),
+        else_=User.failed_login_attempts + 1
+    )
+    
+    return (
+        update(User)
+        .where(User.id == user_id)
+        .values(
+            failed_login_attempts=attempts,
+            locked_until=case(
+                (attempts >= max_attempts, now + timedelta(minutes=lock_minutes)),
+                (lock_expired, None),
+                else_=User.locked_until
+            )
+        )
+        .returning(User)
+        .execution_options(synchronize_session=False, populate_existing=True)
+    )
+
+
+class AsyncUserRepository:
     """
     Repositorio para operaciones de base de datos con usuarios
-    Implementa el patrón Repository
+    Implementa el patrón Repository sobre una AsyncSession (asyncpg), para
+    que los endpoints no bloqueen el event loop mientras esperan a PostgreSQL
     """
     
-    def __init__(self, db: Session):
+    def __init__(self, db: AsyncSession):
         """
         Constructor con inyección de dependencias
         
         Args:
-            db: Sesión de SQLAlchemy
+            db: Sesión async de SQLAlchemy
         """
         self.db = db
     
-    def create(self, email: str, hashed_password: str, name: str, phone_number: Optional[str] = None, role: str = "CLIENT") -> User:
+    async def _update(self, user_id: UUID, **values) -> Optional[User]:
+        """
+        Ejecuta un UPDATE ... RETURNING y confirma la transacción
+        
+        Args:
+            user_id: UUID del usuario
+            **values: Columnas a actualizar
+            
+        Returns:
+            Usuario actualizado (hidratado desde RETURNING) o None si no existe
+        """
+        result = await self.db.execute(_update_user_statement(user_id, values))
+        user = result.scalars().first()
+        await self.db.commit()
+        principal_cache.invalidate(user_id)
+        
+        return user
+    
+    async def _delete(self, user_id: UUID) -> Optional[User]:
+        """
+        Ejecuta un DELETE ... RETURNING y confirma la transacción
+        
+        Args:
+            user_id: UUID del usuario
+            
+        Returns:
+            Usuario eliminado o None si no existe
+        """
+        result = await self.db.execute(_delete_user_statement(user_id))
+        user = result.scalars().first()
+        await self.db.commit()
+        principal_cache.invalidate(user_id)
+        
+        return user
+    
+    async def create_if_absent(self, email: str, hashed_password: str, name: str, phone_number: Optional[str] = None, role: str = "CLIENT") -> Optional[User]:
         """
-        Crea un nuevo usuario
+        Crea un nuevo usuario en un solo viaje a la BD si el email no existe
         
         Args:
             email: Email del usuario
@@ -39,29 +414,20 @@ class UserRepository:
             role: Rol del usuario (ADMIN o CLIENT)
             
         Returns:
-            Usuario creado
-            
-        Raises:
-            IntegrityError: Si el email ya existe
-        """
-        user = User(
-            email=email,
-            hashed_password=hashed_password,
-            name=name,
-            phone_number=phone_number,
-            role=role,
-            totp_verified=False,
-            failed_login_attempts=0,
-            locked_until=None
-        )
-        
-        self.db.add(user)
-        self.db.commit()
-        self.db.refresh(user)
-        
+            Usuario creado o None si el email ya estaba registrado
+        """
+        result = await self.db.execute(_insert_user_statement({
+            "email": normalize_email(email),
+            "hashed_password": hashed_password,
+            "name": name,
+            "phone_number": phone_number,
+            "role": role
+        }))
+        user = result.scalar_one_or_none()
+        await self.db.commit()
         return user
     
-    def get_by_id(self, user_id: UUID) -> Optional[User]:
+    async def get_by_id(self, user_id: UUID) -> Optional[User]:
         """
         Obtiene un usuario por ID (UUID)
         
@@ -71,9 +437,24 @@ class UserRepository:
         Returns:
             Usuario o None si no existe
         """
-        return self.db.query(User).filter(User.id == user_id).first()
+        result = await self.db.execute(select(User).where(User.id == user_id))
+        return result.scalars().first()
+    
+    async def get_version(self, user_id: UUID) -> Optional[datetime]:
+        """
+        Obtiene el sello de versión (updated_at) de un usuario
+        Consulta mínima usada para revalidar entradas de PrincipalCache
+        
+        Args:
+            user_id: UUID del usuario
+            
+        Returns:
+            updated_at del usuario o None si no existe
+        """
+        result = await self.db.execute(select(User.updated_at).where(User.id == user_id))
+        return result.scalar_one_or_none()
     
-    def get_by_email(self, email: str) -> Optional[User]:
+    async def get_by_email(self, email: str) -> Optional[User]:
         """
         Obtiene un usuario por email
         
@@ -83,9 +464,25 @@ class UserRepository:
         Returns:
             Usuario o None si no existe
         """
-        return self.db.query(User).filter(User.email == email).first()
+        result = await self.db.execute(select(User).where(func.lower(User.email) == normalize_email(email)))
+        return result.scalars().first()
+    
+    async def get_by_email_with_lock_state(self, email: str) -> Optional[Tuple[User, bool]]:
+        """
+        Obtiene un usuario por email junto con su estado de bloqueo
+        El bloqueo se evalúa en la misma consulta (solo lectura)
+        
+        Args:
+            email: Email del usuario
+            
+        Returns:
+            Tupla (usuario, is_locked) o None si no existe
+        """
+        result = await self.db.execute(_get_by_email_with_lock_state_statement(email))
+        row = result.first()
+        return (row.User, row.is_locked) if row else None
     
-    def update_totp_secret(self, user_id: UUID, totp_secret: str) -> Optional[User]:
+    async def update_totp_secret(self, user_id: UUID, totp_secret: str) -> Optional[User]:
         """
         Actualiza el secret TOTP del usuario
         
@@ -96,15 +493,9 @@ class UserRepository:
         Returns:
             Usuario actualizado o None si no existe
         """
-        user = self.get_by_id(user_id)
-        if user:
-            user.totp_secret = totp_secret
-            self.db.commit()
-            self.db.refresh(user)
-        
-        return user
+        return await self._update(user_id, totp_secret=totp_secret)
     
-    def verify_totp(self, user_id: UUID) -> Optional[User]:
+    async def verify_totp(self, user_id: UUID) -> Optional[User]:
         """
         Marca el TOTP del usuario como verificado
         
@@ -114,15 +505,9 @@ class UserRepository:
         Returns:
             Usuario actualizado o None si no existe
         """
-        user = self.get_by_id(user_id)
-        if user:
-            user.totp_verified = True
-            self.db.commit()
-            self.db.refresh(user)
-        
-        return user
+        return await self._update(user_id, totp_verified=True)
     
-    def increment_failed_attempts(self, user_id: UUID) -> Optional[User]:
+    async def increment_failed_attempts(self, user_id: UUID) -> Optional[User]:
         """
         Incrementa el contador de intentos fallidos de login
         
@@ -132,15 +517,30 @@ class UserRepository:
         Returns:
             Usuario actualizado o None si no existe
         """
-        user = self.get_by_id(user_id)
-        if user:
-            user.failed_login_attempts += 1
-            self.db.commit()
-            self.db.refresh(user)
+        return await self._update(user_id, failed_login_attempts=User.failed_login_attempts + 1)
+    
+    async def record_failed_attempt(self, user_id: UUID, max_attempts: int, lock_minutes: int) -> Optional[User]:
+        """
+        Registra un intento fallido y aplica el bloqueo en una sola sentencia
+        
+        Args:
+            user_id: UUID del usuario
+            max_attempts: Intentos fallidos que provocan el bloqueo
+            lock_minutes: Minutos de bloqueo
+            
+        Returns:
+            Usuario actualizado (failed_login_attempts, locked_until) o None si no existe
+        """
+        result = await self.db.execute(
+            _record_failed_attempt_statement(user_id, max_attempts, lock_minutes)
+        )
+        user = result.scalars().first()
+        await self.db.commit()
+        principal_cache.invalidate(user_id)
         
         return user
     
-    def reset_failed_attempts(self, user_id: UUID) -> Optional[User]:
+    async def reset_failed_attempts(self, user_id: UUID) -> Optional[User]:
         """
         Resetea el contador de intentos fallidos y desbloquea la cuenta
         
@@ -150,16 +550,21 @@ class UserRepository:
         Returns:
             Usuario actualizado o None si no existe
         """
-        user = self.get_by_id(user_id)
-        if user:
-            user.failed_login_attempts = 0
-            user.locked_until = None
-            self.db.commit()
-            self.db.refresh(user)
+        return await self._update(user_id, failed_login_attempts=0, locked_until=None)
+    
+    async def clear_expired_locks(self) -> int:
+        """
+        Limpia en una sola sentencia todos los bloqueos ya expirados
         
-        return user
+        Returns:
+            Número de cuentas desbloqueadas
+        """
+        result = await self.db.execute(_clear_expired_locks_statement())
+        await self.db.commit()
+        
+        return result.rowcount
     
-    def lock_account(self, user_id: UUID, minutes: int = 15) -> Optional[User]:
+    async def lock_account(self, user_id: UUID, minutes: int = 15) -> Optional[User]:
         """
         Bloquea la cuenta del usuario por un tiempo determinado
         
@@ -170,13 +575,7 @@ class UserRepository:
         Returns:
             Usuario actualizado o None si no existe
         """
-        user = self.get_by_id(user_id)
-        if user:
-            user.locked_until = datetime.utcnow() + timedelta(minutes=minutes)
-            self.db.commit()
-            self.db.refresh(user)
-        
-        return user
+        return await self._update(user_id, locked_until=datetime.utcnow() + timedelta(minutes=minutes))
     
     def is_account_locked(self, user: User) -> bool:
         """
@@ -188,15 +587,10 @@ class UserRepository:
         Returns:
             True si la cuenta está bloqueada, False en caso contrario
         """
-        if user.locked_until is None:
-            return False
-        
-        # Si el tiempo de bloqueo ya pasó, desbloquear automáticamente
-        if datetime.utcnow() >= user.locked_until:
-            self.reset_failed_attempts(user.id)
-            return False
-        
-        return True
+        # Predicado puro: un bloqueo expirado simplemente deja de aplicar.
+        # La limpieza de bloqueos expirados la realiza clear_expired_locks
+        # en lote (LockSweeper), sin escrituras en el camino del login.
+        return user.locked_until is not None and datetime.utcnow() < user.locked_until
     
     def get_lock_remaining_time(self, user: User) -> Optional[int]:
         """
@@ -214,7 +608,7 @@ class UserRepository:
         remaining = (user.locked_until - datetime.utcnow()).total_seconds()
         return int(remaining) if remaining > 0 else None
     
-    def exists_by_email(self, email: str) -> bool:
+    async def exists_by_email(self, email: str) -> bool:
         """
         Verifica si existe un usuario con el email dado
         
@@ -224,18 +618,204 @@ class UserRepository:
         Returns:
             True si existe, False en caso contrario
         """
-        return self.db.query(User).filter(User.email == email).first() is not None
+        result = await self.db.execute(select(User.id).where(func.lower(User.email) == normalize_email(email)).limit(1))
+        return result.first() is not None
+    
+    async def get_existing_emails(self, emails: Sequence[str]) -> set[str]:
+        """
+        Obtiene, en una sola consulta, cuáles de los emails ya están registrados
+        
+        Args:
+            emails: Emails a verificar
+            
+        Returns:
+            Conjunto de emails existentes
+        """
+        if not emails:
+            return set()
+        normalized = [normalize_email(email) for email in emails]
+        result = await self.db.execute(select(User.email).where(func.lower(User.email).in_(normalized)))
+        return set(result.scalars())
+    
+    async def bulk_create(self, rows: Sequence[dict]) -> dict[str, UUID]:
+        """
+        Crea varios usuarios con un único INSERT multi-fila
+        
+        Args:
+            rows: Valores de cada usuario (email, hashed_password, name, phone_number, role)
+            
+        Returns:
+            Diccionario email -> UUID de los usuarios creados (los emails ya
+            existentes se omiten)
+        """
+        if not rows:
+            return {}
+        result = await self.db.execute(_bulk_insert_statement(rows))
+        created = {row.email: row.id for row in result}
+        await self.db.commit()
+        return created
     
-    def get_all(self) -> list[User]:
+    async def get_all(self) -> list[User]:
         """
         Obtiene todos los usuarios
         
         Returns:
             Lista de todos los usuarios
         """
-        return self.db.query(User).all()
+        result = await self.db.execute(select(User))
+        return list(result.scalars().all())
+    
+    async def list_page(
+        self,
+        limit: int,
+        after: Optional[Tuple[datetime, UUID]] = None,
+        role: Optional[str] = None,
+        totp_verified: Optional[bool] = None,
+        locked: Optional[bool] = None
+    ) -> list[Row]:
+        """
+        Obtiene una página de usuarios (keyset) con solo las columnas de UserResponse
+        
+        Args:
+            limit: Filas a obtener
+            after: Clave (created_at, id) de la última fila de la página anterior
+            role: Filtrar por rol
+            totp_verified: Filtrar por 2FA verificado
+            locked: Filtrar por cuentas bloqueadas actualmente
+            
+        Returns:
+            Filas con los atributos de UserResponse
+        """
+        conditions = _user_filter_conditions(role, totp_verified, locked)
+        result = await self.db.execute(_list_page_statement(limit, after, conditions))
+        return list(result.all())
     
-    def update_user_info(self, user_id: UUID, name: Optional[str] = None, phone_number: Optional[str] = None) -> Optional[User]:
+    async def list_ids(
+        self,
+        limit: int,
+        after: Optional[UUID] = None,
+        role: Optional[str] = None,
+        totp_verified: Optional[bool] = None,
+        locked: Optional[bool] = None,
+        exclude_id: Optional[UUID] = None
+    ) -> list[UUID]:
+        """
+        Obtiene el siguiente bloque de ids que cumplen los filtros (orden por id)
+        
+        Args:
+            limit: Ids por bloque
+            after: Último id del bloque anterior
+            role: Filtrar por rol
+            totp_verified: Filtrar por 2FA verificado
+            locked: Filtrar por cuentas bloqueadas actualmente
+            exclude_id: Id a excluir (ej. el administrador que ejecuta la acción)
+            
+        Returns:
+            Lista de UUIDs
+        """
+        conditions = _user_filter_conditions(role, totp_verified, locked)
+        if exclude_id is not None:
+            conditions.append(User.id != exclude_id)
+        result = await self.db.execute(_id_chunk_statement(conditions, after, limit))
+        return list(result.scalars())
+    
+    async def bulk_update(self, user_ids: Sequence[UUID], values: dict) -> list[UUID]:
+        """
+        Actualiza un bloque de usuarios con una sola sentencia
+        
+        Args:
+            user_ids: UUIDs del bloque
+            values: Columnas a actualizar
+            
+        Returns:
+            UUIDs de los usuarios actualizados
+        """
+        if not user_ids:
+            return []
+        result = await self.db.execute(_bulk_update_statement(user_ids, values))
+        updated = list(result.scalars())
+        await self.db.commit()
+        principal_cache.invalidate_many(updated)
+        return updated
+    
+    async def bulk_delete(self, user_ids: Sequence[UUID]) -> list[UUID]:
+        """
+        Elimina un bloque de usuarios con una sola sentencia
+        
+        Args:
+            user_ids: UUIDs del bloque
+            
+        Returns:
+            UUIDs de los usuarios eliminados
+        """
+        if not user_ids:
+            return []
+        result = await self.db.execute(_bulk_delete_statement(user_ids))
+        deleted = list(result.scalars())
+        await self.db.commit()
+        principal_cache.invalidate_many(deleted)
+        return deleted
+    
+    async def stream_users(
+        self,
+        batch_size: int,
+        role: Optional[str] = None,
+        totp_verified: Optional[bool] = None,
+        locked: Optional[bool] = None
+    ) -> AsyncIterator[list[Row]]:
+        """
+        Recorre los usuarios en lotes usando un cursor de servidor
+        
+        Solo hay un lote en memoria a la vez, independientemente del total de filas.
+        
+        Args:
+            batch_size: Filas por lote
+            role: Filtrar por rol
+            totp_verified: Filtrar por 2FA verificado
+            locked: Filtrar por cuentas bloqueadas actualmente
+            
+        Yields:
+            Lotes de filas con los atributos de UserResponse
+        """
+        conditions = _user_filter_conditions(role, totp_verified, locked)
+        result = await self.db.stream(_export_statement(conditions, batch_size))
+        async for partition in result.partitions():
+            yield list(partition)
+    
+    async def count_users(
+        self,
+        cap: int,
+        role: Optional[str] = None,
+        totp_verified: Optional[bool] = None,
+        locked: Optional[bool] = None
+    ) -> Tuple[int, bool]:
+        """
+        Cuenta usuarios de forma económica
+        
+        Sin filtros usa la estimación del planner de PostgreSQL (O(1)).
+        Con filtros cuenta como máximo cap filas.
+        
+        Args:
+            cap: Máximo de filas a contar con filtros
+            role: Filtrar por rol
+            totp_verified: Filtrar por 2FA verificado
+            locked: Filtrar por cuentas bloqueadas actualmente
+            
+        Returns:
+            Tupla (total, es_estimado)
+        """
+        conditions = _user_filter_conditions(role, totp_verified, locked)
+        if not conditions:
+            result = await self.db.execute(_ESTIMATED_COUNT_STATEMENT)
+            estimate = result.scalar()
+            if estimate is not None and estimate >= 0:
+                return int(estimate), True
+        
+        result = await self.db.execute(_capped_count_statement(conditions, cap))
+        total = result.scalar_one()
+        return min(total, cap), total > cap
+    
+    async def update_user_info(self, user_id: UUID, name: Optional[str] = None, phone_number: Optional[str] = None) -> Optional[User]:
         """
         Actualiza la información del usuario (nombre y/o teléfono)
         
@@ -247,44 +827,39 @@ class UserRepository:
         Returns:
             Usuario actualizado o None si no existe
         """
-        user = self.get_by_id(user_id)
-        if user:
-            if name is not None:
-                user.name = name
-            if phone_number is not None:
-                user.phone_number = phone_number
-            self.db.commit()
-            self.db.refresh(user)
+        values = {}
+        if name is not None:
+            values["name"] = name
+        if phone_number is not None:
+            values["phone_number"] = phone_number
         
-        return user
+        if not values:
+            return await self.get_by_id(user_id)
+        
+        return await self._update(user_id, **values)
     
-    def delete(self, user_id: UUID) -> bool:
+    async def delete(self, user_id: UUID) -> Optional[User]:
         """
-        Elimina un usuario
+        Elimina un usuario (una sola sentencia DELETE ... RETURNING)
         
         Args:
             user_id: UUID del usuario
             
         Returns:
-            True si se eliminó correctamente, False si no existe
+            Datos del usuario eliminado o None si no existe
         """
-        user = self.get_by_id(user_id)
-        if user:
-            self.db.delete(user)
-            self.db.commit()
-            return True
-        return False
+        return await self._delete(user_id)
 
 
-def get_user_repository(db: Session) -> UserRepository:
+def get_async_user_repository(db: AsyncSession) -> AsyncUserRepository:
     """
-    Factory function para obtener instancia de UserRepository
+    Factory function para obtener instancia de AsyncUserRepository
     Implementa inyección de dependencias para FastAPI
     
     Args:
-        db: Sesión de base de datos
+        db: Sesión async de base de datos
         
     Returns:
-        Instancia de UserRepository
+        Instancia de AsyncUserRepository
     """
-    return UserRepository(db)
+    return AsyncUserRepository(db)
@@ -3,26 +3,45 @@ Router de Autenticación
 Principio: Single Responsibility - Solo maneja endpoints de autenticación
 Principio: Dependency Injection - Usa Depends de FastAPI
 """
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+import base64
+import json
+import tempfile
+from datetime import datetime
+from typing import Literal, Optional, Tuple
+from uuid import UUID
 
-from app.database import get_db
-from app.dependencies import get_current_user, get_current_active_user, require_admin
+from fastapi import APIRouter, Body, Depends, HTTPException, Query, Request, status
+from fastapi.responses import StreamingResponse
+from fastapi.security import HTTPAuthorizationCredentials
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.database import db_timeouts, get_async_db
+from app.cache import UserPrincipal
+from app.container import container
+from app.dependencies import enforce_auth_rate_limit, enrollment_security, get_current_user, get_current_active_user, require_admin
 from app.models.user import User
-from app.repositories.user_repository import get_user_repository, UserRepository
+from app.repositories.refresh_token_repository import get_async_refresh_token_repository
+from app.repositories.user_repository import get_async_user_repository
 from app.services.auth_service import get_auth_service, AuthService
-from app.services.totp_service import TOTPService
+from app.services.refresh_token_service import get_refresh_token_service
+from app.services.password_hasher import PasswordHasherOverloadedError
+from app.services.user_bulk import BulkAction, UserBulkService, stream_user_bulk_action
+from app.services.user_import import ImportFormat, stream_user_import
+from app.services.user_export import MEDIA_TYPES, ExportFormat, export_filename, stream_user_export
 from app.schemas.auth import (
     UserRegisterRequest,
     UserLoginRequest,
     TOTPVerifyRequest,
+    RefreshTokenRequest,
     UserResponse,
     TOTPSetupResponse,
     TokenResponse,
     MessageResponse,
     ErrorResponse,
     UserUpdateRequest,
-    UserListResponse
+    UserListResponse,
+    UserBulkRequest
 )
 
 router = APIRouter(
@@ -31,16 +50,75 @@ router = APIRouter(
 )
 
 
+def _encode_cursor(created_at: datetime, user_id: UUID) -> str:
+    """
+    Codifica la clave keyset (created_at, id) como cursor opaco
+    """
+    raw = json.dumps([created_at.isoformat(), str(user_id)]).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii")
+
+
+def _decode_cursor(cursor: str) -> Tuple[datetime, UUID]:
+    """
+    Decodifica un cursor generado por _encode_cursor
+    
+    Raises:
+        ValueError: Si el cursor no es válido
+    """
+    try:
+        created_at, user_id = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+        return datetime.fromisoformat(created_at), UUID(user_id)
+    except (TypeError, ValueError) as e:
+        raise ValueError("Cursor de paginación inválido") from e
+
+
+async def _authenticate_enrollment(
+    auth_service: AuthService,
+    request: Optional[UserLoginRequest],
+    credentials: Optional[HTTPAuthorizationCredentials]
+) -> Tuple[User, bool]:
+    """
+    Autentica un paso del enrolamiento de 2FA con el token de enrolamiento
+    (sin Argon2) o, si no se envía, con email y contraseña
+    
+    Returns:
+        Tupla (usuario, autenticado con contraseña)
+        
+    Raises:
+        HTTPException: 401 si la credencial no es válida
+    """
+    if credentials is not None:
+        user = await auth_service.authenticate_enrollment_token(credentials.credentials)
+        if not user:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Token de enrolamiento inválido o expirado",
+                headers={"WWW-Authenticate": "Bearer"}
+            )
+        return user, False
+    
+    user = None
+    if request is not None:
+        user = await auth_service.authenticate_user(request.email, request.password)
+    if not user:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Credenciales inválidas"
+        )
+    return user, True
+
+
 @router.post(
     "/register",
     response_model=MessageResponse,
     status_code=status.HTTP_201_CREATED,
     summary="Registrar nuevo usuario",
-    description="Registra un nuevo usuario con nombre y teléfono. Después del registro, el usuario DEBE configurar 2FA antes de poder hacer login."
+    description="Registra un nuevo usuario con nombre y teléfono. Después del registro, el usuario DEBE configurar 2FA antes de poder hacer login.",
+    dependencies=[Depends(enforce_auth_rate_limit), Depends(db_timeouts("login"))]
 )
 async def register(
     request: UserRegisterRequest,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Endpoint de registro de usuario
@@ -51,11 +129,11 @@ async def register(
     3. Usuario debe llamar a /auth/verify-2fa para verificar 2FA
     4. Solo entonces puede hacer login exitoso
     """
-    user_repository = get_user_repository(db)
+    user_repository = get_async_user_repository(db)
     auth_service = get_auth_service(user_repository)
     
     try:
-        user = auth_service.register_user(
+        user = await auth_service.register_user(
             request.email, 
             request.password, 
             request.name,
@@ -73,6 +151,8 @@ async def register(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=str(e)
         )
+    except (HTTPException, PasswordHasherOverloadedError):
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -84,39 +164,45 @@ async def register(
     "/setup-2fa",
     response_model=TOTPSetupResponse,
     summary="Configurar autenticación de dos factores",
-    description="Genera un secret TOTP y URI para configurar Microsoft Authenticator. El usuario debe escanear el código QR o ingresar el secret manualmente."
+    description="Genera un secret TOTP y URI para configurar Microsoft Authenticator. El usuario debe escanear el código QR o ingresar el secret manualmente. Autenticación con email y contraseña, o con el token de enrolamiento (Authorization: Bearer) para regenerar el secret.",
+    dependencies=[Depends(enforce_auth_rate_limit), Depends(db_timeouts("login"))]
 )
 async def setup_2fa(
-    request: UserLoginRequest,
-    db: Session = Depends(get_db)
+    request: Optional[UserLoginRequest] = None,
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(enrollment_security),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Endpoint para configurar 2FA
     
     El usuario debe proporcionar email y contraseña.
-    Retorna el secret y URI para configurar en Microsoft Authenticator.
-    Después debe llamar a /auth/verify-2fa para verificar la configuración.
+    Retorna el secret y URI para configurar en Microsoft Authenticator, y un
+    token de enrolamiento de corta duración.
+    Después debe llamar a /auth/verify-2fa con ese token (o con la contraseña)
+    para verificar la configuración.
     """
-    user_repository = get_user_repository(db)
+    user_repository = get_async_user_repository(db)
     auth_service = get_auth_service(user_repository)
-    totp_service = TOTPService()
+    totp_service = container.totp_service
     
     try:
-        # Autenticar usuario
-        user = auth_service.authenticate_user(request.email, request.password)
-        if not user:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Credenciales inválidas"
-            )
+        # Autenticar usuario (token de enrolamiento o contraseña)
+        user, via_password = await _authenticate_enrollment(auth_service, request, credentials)
         
         # Generar secret y URI
-        secret, provisioning_uri = auth_service.setup_totp(user.id)
+        secret, provisioning_uri = await auth_service.setup_totp(user.id)
+        
+        # Solo se emite token al verificar la contraseña: un token no se renueva a sí mismo
+        enrollment_token = auth_service.create_enrollment_token(user) if via_password else None
         
         return TOTPSetupResponse(
             secret=secret,
             qr_uri=provisioning_uri,
-            manual_entry_key=totp_service.format_secret_for_manual_entry(secret)
+            manual_entry_key=totp_service.format_secret_for_manual_entry(secret),
+            enrollment_token=enrollment_token,
+            enrollment_token_expires_in=(
+                settings.jwt_enrollment_token_expire_minutes * 60 if enrollment_token else None
+            )
         )
     
     except ValueError as e:
@@ -124,6 +210,8 @@ async def setup_2fa(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=str(e)
         )
+    except (HTTPException, PasswordHasherOverloadedError):
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -135,34 +223,32 @@ async def setup_2fa(
     "/verify-2fa",
     response_model=MessageResponse,
     summary="Verificar configuración de 2FA",
-    description="Verifica el código TOTP generado por Microsoft Authenticator. Marca el 2FA como verificado si el código es correcto."
+    description="Verifica el código TOTP generado por Microsoft Authenticator. Marca el 2FA como verificado si el código es correcto. Autenticación con el token de enrolamiento de /auth/setup-2fa (Authorization: Bearer) o con email y contraseña.",
+    dependencies=[Depends(enforce_auth_rate_limit), Depends(db_timeouts("login"))]
 )
 async def verify_2fa(
-    request: UserLoginRequest,
     totp_request: TOTPVerifyRequest,
-    db: Session = Depends(get_db)
+    request: Optional[UserLoginRequest] = Body(None),
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(enrollment_security),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Endpoint para verificar la configuración de 2FA
     
-    El usuario proporciona email, contraseña y el código de 6 dígitos
-    generado por Microsoft Authenticator.
+    El usuario proporciona el código de 6 dígitos generado por Microsoft
+    Authenticator y el token de enrolamiento (o su email y contraseña).
     Si es correcto, marca el 2FA como verificado y el usuario puede hacer login.
+    Con el token, reintentar un código mal escrito no vuelve a ejecutar Argon2.
     """
-    user_repository = get_user_repository(db)
+    user_repository = get_async_user_repository(db)
     auth_service = get_auth_service(user_repository)
     
     try:
-        # Autenticar usuario
-        user = auth_service.authenticate_user(request.email, request.password)
-        if not user:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Credenciales inválidas"
-            )
+        # Autenticar usuario (token de enrolamiento o contraseña)
+        user, _ = await _authenticate_enrollment(auth_service, request, credentials)
         
         # Verificar código TOTP
-        is_valid = auth_service.verify_totp_code(user.id, totp_request.totp_code)
+        is_valid = await auth_service.verify_totp_code(user.id, totp_request.totp_code)
         
         if not is_valid:
             raise HTTPException(
@@ -180,7 +266,7 @@ async def verify_2fa(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=str(e)
         )
-    except HTTPException:
+    except (HTTPException, PasswordHasherOverloadedError):
         raise
     except Exception as e:
         raise HTTPException(
@@ -193,11 +279,12 @@ async def verify_2fa(
     "/login",
     response_model=TokenResponse,
     summary="Iniciar sesión",
-    description="Inicia sesión con email, contraseña y código TOTP. CRÍTICO: Solo permite login si el usuario ha verificado su 2FA. Implementa bloqueo de cuenta después de 3 intentos fallidos."
+    description="Inicia sesión con email, contraseña y código TOTP. CRÍTICO: Solo permite login si el usuario ha verificado su 2FA. Implementa bloqueo de cuenta después de 3 intentos fallidos.",
+    dependencies=[Depends(enforce_auth_rate_limit), Depends(db_timeouts("login"))]
 )
 async def login(
     request: UserLoginRequest,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Endpoint de login con 2FA obligatorio y control de seguridad
@@ -220,11 +307,11 @@ async def login(
     6. Sistema resetea intentos fallidos
     7. Sistema retorna token de acceso JWT con role y uuid
     """
-    user_repository = get_user_repository(db)
+    user_repository = get_async_user_repository(db)
     auth_service = get_auth_service(user_repository)
     
     try:
-        token, user, message = auth_service.login(
+        token, user, message = await auth_service.login(
             request.email,
             request.password,
             request.totp_code
@@ -244,10 +331,16 @@ async def login(
             )
         
         if message == "LOGIN_SUCCESS" and token:
+            # Inicio de una sesión nueva: primer refresh token de su familia
+            refresh_service = get_refresh_token_service(get_async_refresh_token_repository(db))
+            refresh_token = await refresh_service.issue(user.id)
+            
             user_response = UserResponse.model_validate(user)
             return TokenResponse(
                 access_token=token,
                 token_type="bearer",
+                refresh_token=refresh_token,
+                refresh_token_expires_in=settings.jwt_refresh_token_expire_days * 86400,
                 role=user.role,
                 uuid=user.id,
                 user=user_response
@@ -274,6 +367,53 @@ async def login(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail=error_message
         )
+    except (HTTPException, PasswordHasherOverloadedError):
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Error interno del servidor"
+        )
+
+
+@router.post(
+    "/refresh",
+    response_model=TokenResponse,
+    summary="Renovar token de acceso",
+    description="Canjea un refresh token por un token de acceso y un refresh token nuevos, sin contraseña ni TOTP. Cada refresh token es de un solo uso: reutilizar uno ya canjeado revoca la sesión completa.",
+    dependencies=[Depends(db_timeouts("login"))]
+)
+async def refresh(
+    request: RefreshTokenRequest,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Endpoint de renovación del token de acceso
+    
+    Una sola sentencia sobre el índice del hash del token: marca el token
+    como canjeado y devuelve el usuario (sin Argon2 ni TOTP).
+    """
+    refresh_service = get_refresh_token_service(get_async_refresh_token_repository(db))
+    auth_service = get_auth_service(get_async_user_repository(db))
+    
+    try:
+        user, refresh_token = await refresh_service.rotate(request.refresh_token)
+        
+        return TokenResponse(
+            access_token=auth_service.create_access_token(user),
+            token_type="bearer",
+            refresh_token=refresh_token,
+            refresh_token_expires_in=settings.jwt_refresh_token_expire_days * 86400,
+            role=user.role,
+            uuid=user.id,
+            user=UserResponse.model_validate(user)
+        )
+    
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail=str(e)
+        )
     except HTTPException:
         raise
     except Exception as e:
@@ -283,16 +423,45 @@ async def login(
         )
 
 
+@router.post(
+    "/logout",
+    response_model=MessageResponse,
+    summary="Cerrar sesión",
+    description="Revoca la sesión del refresh token indicado. El token de acceso sigue siendo válido hasta su expiración: el cliente debe eliminarlo.",
+    dependencies=[Depends(db_timeouts("login"))]
+)
+async def logout(
+    request: Optional[RefreshTokenRequest] = None,
+    current_user: UserPrincipal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Endpoint de cierre de sesión
+    
+    Requiere el token de acceso. Si se envía el refresh token, revoca todos
+    los refresh tokens de esa sesión.
+    """
+    if request is not None:
+        refresh_service = get_refresh_token_service(get_async_refresh_token_repository(db))
+        await refresh_service.revoke(request.refresh_token, current_user.id)
+    
+    return MessageResponse(
+        message="Sesión cerrada exitosamente",
+        detail=f"Usuario {current_user.email} ha cerrado sesión. Elimine el token del cliente."
+    )
+
+
 # ============= User Profile Endpoints =============
 
 @router.get(
     "/me",
     response_model=UserResponse,
     summary="Obtener mi información de perfil",
-    description="Obtiene la información del usuario autenticado actual."
+    description="Obtiene la información del usuario autenticado actual.",
+    dependencies=[Depends(db_timeouts("profile"))]
 )
 async def get_my_profile(
-    current_user: User = Depends(get_current_active_user)
+    current_user: UserPrincipal = Depends(get_current_active_user)
 ):
     """
     Endpoint para obtener la información del usuario actual
@@ -311,12 +480,13 @@ async def get_my_profile(
     "/me",
     response_model=UserResponse,
     summary="Actualizar mi información de perfil",
-    description="Permite a cualquier usuario autenticado actualizar su propio nombre y/o teléfono."
+    description="Permite a cualquier usuario autenticado actualizar su propio nombre y/o teléfono.",
+    dependencies=[Depends(db_timeouts("profile"))]
 )
 async def update_my_profile(
     request: UserUpdateRequest,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    db: AsyncSession = Depends(get_async_db),
+    current_user: UserPrincipal = Depends(get_current_active_user)
 ):
     """
     Endpoint para que el usuario actualice su propia información
@@ -335,7 +505,7 @@ async def update_my_profile(
     - Rol
     - Configuración 2FA
     """
-    user_repository = get_user_repository(db)
+    user_repository = get_async_user_repository(db)
     
     try:
         # Validar que al menos un campo esté presente
@@ -346,7 +516,7 @@ async def update_my_profile(
             )
         
         # Actualizar usuario
-        updated_user = user_repository.update_user_info(
+        updated_user = await user_repository.update_user_info(
             current_user.id,
             name=request.name,
             phone_number=request.phone_number
@@ -368,34 +538,66 @@ async def update_my_profile(
 @router.get(
     "/admin/users",
     response_model=UserListResponse,
-    summary="Obtener todos los usuarios (Admin)",
-    description="Obtiene la lista de todos los usuarios registrados. Requiere rol ADMIN."
+    summary="Obtener usuarios paginados (Admin)",
+    description="Obtiene una página de usuarios (más recientes primero) con filtros opcionales. Usar next_cursor para la página siguiente. Requiere rol ADMIN.",
+    dependencies=[Depends(db_timeouts("admin"))]
 )
 async def get_all_users(
-    db: Session = Depends(get_db),
-    admin_user: User = Depends(require_admin)
+    limit: int = Query(settings.admin_users_page_size, ge=1, le=settings.admin_users_max_page_size, description="Usuarios por página"),
+    cursor: Optional[str] = Query(None, description="Cursor devuelto en next_cursor"),
+    role: Optional[Literal["ADMIN", "CLIENT"]] = Query(None, description="Filtrar por rol"),
+    totp_verified: Optional[bool] = Query(None, description="Filtrar por 2FA verificado"),
+    locked: Optional[bool] = Query(None, description="Filtrar por cuentas bloqueadas"),
+    db: AsyncSession = Depends(get_async_db),
+    admin_user: UserPrincipal = Depends(require_admin)
 ):
     """
-    Endpoint administrativo para obtener todos los usuarios
+    Endpoint administrativo para listar usuarios
     
     Requiere:
     - Token JWT válido
     - Rol ADMIN
     
+    Rendimiento:
+    - Paginación keyset sobre (created_at, id): coste constante por página
+    - Solo se leen las columnas de UserResponse
+    - Total estimado (sin filtros) o contado hasta un máximo (con filtros)
+    
     Retorna:
-    - Lista completa de usuarios con su información
+    - Página de usuarios, total y cursor de la página siguiente
     """
-    user_repository = get_user_repository(db)
+    user_repository = get_async_user_repository(db)
     
     try:
-        users = user_repository.get_all()
-        users_response = [UserResponse.model_validate(user) for user in users]
+        try:
+            after = _decode_cursor(cursor) if cursor else None
+        except ValueError as e:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=str(e)
+            )
+        
+        filters = {"role": role, "totp_verified": totp_verified, "locked": locked}
+        
+        # Se pide una fila extra para saber si hay página siguiente
+        rows = await user_repository.list_page(limit + 1, after=after, **filters)
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+        
+        total, total_is_estimate = await user_repository.count_users(
+            settings.admin_users_count_cap,
+            **filters
+        )
         
         return UserListResponse(
-            users=users_response,
-            total=len(users_response)
+            users=[UserResponse.model_validate(row) for row in rows],
+            total=total,
+            total_is_estimate=total_is_estimate,
+            next_cursor=_encode_cursor(rows[-1].created_at, rows[-1].id) if has_more else None
         )
     
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -403,17 +605,158 @@ async def get_all_users(
         )
 
 
+@router.get(
+    "/admin/users/export",
+    summary="Exportar usuarios (Admin)",
+    description="Exporta todos los usuarios (con filtros opcionales) como NDJSON o CSV en streaming, opcionalmente comprimido con gzip. Requiere rol ADMIN.",
+    response_class=StreamingResponse,
+    dependencies=[Depends(db_timeouts("admin"))]
+)
+async def export_users(
+    export_format: ExportFormat = Query("ndjson", alias="format", description="Formato de exportación"),
+    gzip: bool = Query(False, description="Comprimir la salida con gzip"),
+    role: Optional[Literal["ADMIN", "CLIENT"]] = Query(None, description="Filtrar por rol"),
+    totp_verified: Optional[bool] = Query(None, description="Filtrar por 2FA verificado"),
+    locked: Optional[bool] = Query(None, description="Filtrar por cuentas bloqueadas"),
+    admin_user: UserPrincipal = Depends(require_admin)
+):
+    """
+    Endpoint administrativo para exportar usuarios
+    
+    Requiere:
+    - Token JWT válido
+    - Rol ADMIN
+    
+    Rendimiento:
+    - Cursor de servidor: solo un lote de filas en memoria a la vez
+    - La respuesta se envía mientras se leen las filas
+    
+    Retorna:
+    - Archivo NDJSON o CSV (.gz si se solicita compresión)
+    """
+    filename = export_filename(export_format, gzip)
+    
+    return StreamingResponse(
+        stream_user_export(
+            export_format,
+            gzip,
+            settings.admin_export_batch_size,
+            role=role,
+            totp_verified=totp_verified,
+            locked=locked
+        ),
+        media_type="application/gzip" if gzip else MEDIA_TYPES[export_format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
+
+
+@router.post(
+    "/admin/users/import",
+    summary="Importar usuarios en lote (Admin)",
+    description="Importa usuarios desde un cuerpo NDJSON o CSV (campos: email, name, phone_number, role y password o hashed_password Argon2). Responde en streaming con el resultado de cada fila en NDJSON y un resumen final. Requiere rol ADMIN.",
+    response_class=StreamingResponse,
+    dependencies=[Depends(db_timeouts("admin"))],
+    openapi_extra={
+        "requestBody": {
+            "required": True,
+            "content": {
+                "application/x-ndjson": {"schema": {"type": "string", "format": "binary"}},
+                "text/csv": {"schema": {"type": "string", "format": "binary"}}
+            }
+        }
+    }
+)
+async def import_users(
+    request: Request,
+    import_format: ImportFormat = Query("ndjson", alias="format", description="Formato del cuerpo"),
+    admin_user: UserPrincipal = Depends(require_admin)
+):
+    """
+    Endpoint administrativo para importar usuarios en lote
+    
+    Requiere:
+    - Token JWT válido
+    - Rol ADMIN
+    
+    Rendimiento:
+    - El cuerpo se vuelca a un archivo temporal (memoria acotada)
+    - Por lote: una consulta de emails existentes y un INSERT multi-fila
+    - Contraseñas hasheadas en paralelo en el pool de procesos
+      (o aceptadas ya hasheadas con Argon2)
+    
+    Retorna:
+    - NDJSON con el resultado de cada fila y {"summary": {...}} al final
+    """
+    # Se lee el cuerpo completo antes de responder: en memoria hasta 1 MB, luego en disco
+    spool = tempfile.SpooledTemporaryFile(max_size=1024 * 1024)
+    try:
+        async for chunk in request.stream():
+            spool.write(chunk)
+        spool.seek(0)
+    except Exception:
+        spool.close()
+        raise
+    
+    return StreamingResponse(
+        stream_user_import(spool, import_format, settings.user_import_batch_size),
+        media_type="application/x-ndjson"
+    )
+
+
+@router.post(
+    "/admin/users/bulk/{action}",
+    summary="Acción masiva sobre usuarios (Admin)",
+    description="Ejecuta unlock, reset-2fa, delete o update sobre una lista de ids o un filtro, en bloques con una sentencia UPDATE/DELETE cada uno. Responde en streaming con el progreso (NDJSON) y un resumen final. delete nunca incluye al administrador que la ejecuta. Requiere rol ADMIN.",
+    response_class=StreamingResponse,
+    dependencies=[Depends(db_timeouts("admin"))]
+)
+async def bulk_user_action(
+    action: BulkAction,
+    request: UserBulkRequest,
+    admin_user: UserPrincipal = Depends(require_admin)
+):
+    """
+    Endpoint administrativo para acciones masivas
+    
+    Requiere:
+    - Token JWT válido
+    - Rol ADMIN
+    
+    Acciones:
+    - unlock: resetea intentos fallidos y bloqueo
+    - reset-2fa: obliga a configurar 2FA de nuevo
+    - delete: elimina usuarios (excepto el propio administrador)
+    - update: actualiza name y/o phone_number (campo values)
+    
+    Retorna:
+    - NDJSON con el progreso de cada bloque y {"summary": {...}} al final
+    """
+    try:
+        values = UserBulkService.action_values(action, request)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    
+    return StreamingResponse(
+        stream_user_bulk_action(action, values, request, admin_user.id, settings.admin_bulk_chunk_size),
+        media_type="application/x-ndjson"
+    )
+
+
 @router.patch(
     "/admin/users/{user_id}",
     response_model=UserResponse,
     summary="Actualizar información de usuario (Admin)",
-    description="Permite a un administrador actualizar el nombre y/o teléfono de cualquier usuario. Requiere rol ADMIN."
+    description="Permite a un administrador actualizar el nombre y/o teléfono de cualquier usuario. Requiere rol ADMIN.",
+    dependencies=[Depends(db_timeouts("admin"))]
 )
 async def update_user(
     user_id: str,
     request: UserUpdateRequest,
-    db: Session = Depends(get_db),
-    admin_user: User = Depends(require_admin)
+    db: AsyncSession = Depends(get_async_db),
+    admin_user: UserPrincipal = Depends(require_admin)
 ):
     """
     Endpoint administrativo para actualizar información de usuario
@@ -432,9 +775,7 @@ async def update_user(
     - Rol
     - Configuración 2FA
     """
-    from uuid import UUID
-    
-    user_repository = get_user_repository(db)
+    user_repository = get_async_user_repository(db)
     
     try:
         # Convertir string a UUID
@@ -446,14 +787,6 @@ async def update_user(
                 detail="ID de usuario inválido"
             )
         
-        # Verificar que el usuario existe
-        user = user_repository.get_by_id(uuid_obj)
-        if not user:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="Usuario no encontrado"
-            )
-        
         # Validar que al menos un campo esté presente
         if request.name is None and request.phone_number is None:
             raise HTTPException(
@@ -461,12 +794,17 @@ async def update_user(
                 detail="Debe proporcionar al menos un campo para actualizar"
             )
         
-        # Actualizar usuario
-        updated_user = user_repository.update_user_info(
+        # Actualizar usuario (UPDATE ... RETURNING: None si no existe)
+        updated_user = await user_repository.update_user_info(
             uuid_obj,
             name=request.name,
             phone_number=request.phone_number
         )
+        if not updated_user:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Usuario no encontrado"
+            )
         
         return UserResponse.model_validate(updated_user)
     
@@ -483,12 +821,13 @@ async def update_user(
     "/admin/users/{user_id}",
     response_model=MessageResponse,
     summary="Eliminar usuario (Admin)",
-    description="Permite a un administrador eliminar cualquier usuario. Requiere rol ADMIN."
+    description="Permite a un administrador eliminar cualquier usuario. Requiere rol ADMIN.",
+    dependencies=[Depends(db_timeouts("admin"))]
 )
 async def delete_user(
     user_id: str,
-    db: Session = Depends(get_db),
-    admin_user: User = Depends(require_admin)
+    db: AsyncSession = Depends(get_async_db),
+    admin_user: UserPrincipal = Depends(require_admin)
 ):
     """
     Endpoint administrativo para eliminar un usuario
@@ -501,9 +840,7 @@ async def delete_user(
     - El administrador no puede eliminarse a sí mismo
     - La eliminación es permanente
     """
-    from uuid import UUID
-    
-    user_repository = get_user_repository(db)
+    user_repository = get_async_user_repository(db)
     
     try:
         # Convertir string a UUID
@@ -515,34 +852,25 @@ async def delete_user(
                 detail="ID de usuario inválido"
             )
         
-        # Verificar que el usuario existe
-        user = user_repository.get_by_id(uuid_obj)
-        if not user:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="Usuario no encontrado"
-            )
-        
         # Prevenir que el admin se elimine a sí mismo
-        if user.id == admin_user.id:
+        if uuid_obj == admin_user.id:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="No puede eliminar su propia cuenta de administrador"
             )
         
-        # Eliminar usuario
-        deleted = user_repository.delete(uuid_obj)
-        
-        if deleted:
-            return MessageResponse(
-                message="Usuario eliminado exitosamente",
-                detail=f"El usuario {user.email} ha sido eliminado"
-            )
-        else:
+        # Eliminar usuario (DELETE ... RETURNING: None si no existe)
+        deleted_user = await user_repository.delete(uuid_obj)
+        if not deleted_user:
             raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail="Error al eliminar el usuario"
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Usuario no encontrado"
             )
+        
+        return MessageResponse(
+            message="Usuario eliminado exitosamente",
+            detail=f"El usuario {deleted_user.email} ha sido eliminado"
+        )
     
     except HTTPException:
         raise
@@ -3,10 +3,19 @@ Schemas de autenticación
 Principio: Single Responsibility - Solo maneja validación de datos
 Principio: Interface Segregation - Schemas específicos para cada operación
 """
+import re
 from datetime import datetime
 from typing import Optional, Literal
 from uuid import UUID
-from pydantic import BaseModel, EmailStr, Field, computed_field
+from pydantic import BaseModel, EmailStr, Field, computed_field, field_validator, model_validator
+
+from app.models.user import normalize_email
+
+
+# Hash Argon2 en formato PHC (ej. $argon2id$v=19$m=65536,t=3,p=4$<salt>$<hash>)
+ARGON2_HASH_PATTERN = re.compile(
+    r"^\$argon2(id|i|d)\$v=\d+\$m=\d+,t=\d+,p=\d+\$[A-Za-z0-9+/]+\$[A-Za-z0-9+/]+$"
+)
 
 
 # ============= Request Schemas =============
@@ -19,6 +28,12 @@ class UserRegisterRequest(BaseModel):
     phone_number: Optional[str] = Field(None, description="Número de teléfono (opcional)")
     role: Literal["ADMIN", "CLIENT"] = Field(default="CLIENT", description="Rol del usuario")
     
+    @field_validator("email")
+    @classmethod
+    def normalize_email_field(cls, email: str) -> str:
+        """Normaliza el email (sin espacios, en minúsculas)"""
+        return normalize_email(email)
+    
     class Config:
         json_schema_extra = {
             "example": {
@@ -37,6 +52,12 @@ class UserLoginRequest(BaseModel):
     password: str = Field(..., description="Contraseña")
     totp_code: Optional[str] = Field(None, min_length=6, max_length=6, description="Código TOTP de 6 dígitos")
     
+    @field_validator("email")
+    @classmethod
+    def normalize_email_field(cls, email: str) -> str:
+        """Normaliza el email (sin espacios, en minúsculas)"""
+        return normalize_email(email)
+    
     class Config:
         json_schema_extra = {
             "example": {
@@ -47,6 +68,18 @@ class UserLoginRequest(BaseModel):
         }
 
 
+class RefreshTokenRequest(BaseModel):
+    """Schema para renovar el token de acceso o cerrar la sesión"""
+    refresh_token: str = Field(..., min_length=1, max_length=256, description="Refresh token recibido en el login o en el último /auth/refresh")
+    
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "refresh_token": "kq1Zb0Vx3m9QjH5yWcT2rLpN8sA4uE7fGhJdKiO6XYz"
+            }
+        }
+
+
 class TOTPVerifyRequest(BaseModel):
     """Schema para verificar código TOTP"""
     totp_code: str = Field(..., min_length=6, max_length=6, description="Código TOTP de 6 dígitos")
@@ -86,13 +119,20 @@ class TOTPSetupResponse(BaseModel):
     secret: str = Field(..., description="Secret TOTP en formato base32")
     qr_uri: str = Field(..., description="URI para generar código QR")
     manual_entry_key: str = Field(..., description="Clave para entrada manual")
+    enrollment_token: Optional[str] = Field(
+        None,
+        description="Token de enrolamiento para /auth/verify-2fa (Authorization: Bearer) en lugar de la contraseña; solo si se autenticó con contraseña"
+    )
+    enrollment_token_expires_in: Optional[int] = Field(None, description="Segundos de validez del token de enrolamiento")
     
     class Config:
         json_schema_extra = {
             "example": {
                 "secret": "JBSWY3DPEHPK3PXP",
                 "qr_uri": "otpauth://totp/SecureLoginApp:user@example.com?secret=JBSWY3DPEHPK3PXP&issuer=SecureLoginApp",
-                "manual_entry_key": "JBSW Y3DP EHPK 3PXP"
+                "manual_entry_key": "JBSW Y3DP EHPK 3PXP",
+                "enrollment_token": "eyJhbGciOiJIUzI1NiIsInR5cCI6IkpXVCJ9...",
+                "enrollment_token_expires_in": 600
             }
         }
 
@@ -101,6 +141,8 @@ class TokenResponse(BaseModel):
     """Schema de respuesta con token JWT"""
     access_token: str
     token_type: str = "bearer"
+    refresh_token: Optional[str] = Field(None, description="Refresh token de un solo uso para /auth/refresh")
+    refresh_token_expires_in: Optional[int] = Field(None, description="Segundos de validez del refresh token")
     role: str
     uuid: UUID
     user: UserResponse
@@ -110,6 +152,8 @@ class TokenResponse(BaseModel):
             "example": {
                 "access_token": "eyJhbGciOiJIUzI1NiIsInR5cCI6IkpXVCJ9...",
                 "token_type": "bearer",
+                "refresh_token": "kq1Zb0Vx3m9QjH5yWcT2rLpN8sA4uE7fGhJdKiO6XYz",
+                "refresh_token_expires_in": 1209600,
                 "role": "CLIENT",
                 "uuid": "123e4567-e89b-12d3-a456-426614174000",
                 "user": {
@@ -173,9 +217,11 @@ class UserUpdateRequest(BaseModel):
 
 
 class UserListResponse(BaseModel):
-    """Schema para lista de usuarios"""
+    """Schema para lista paginada de usuarios"""
     users: list[UserResponse]
-    total: int
+    total: int = Field(..., description="Total de usuarios que cumplen los filtros")
+    total_is_estimate: bool = Field(False, description="True si total es una estimación o un mínimo")
+    next_cursor: Optional[str] = Field(None, description="Cursor de la página siguiente (None si es la última)")
     
     class Config:
         json_schema_extra = {
@@ -192,6 +238,144 @@ class UserListResponse(BaseModel):
                         "created_at": "2026-02-05T10:00:00"
                     }
                 ],
-                "total": 1
+                "total": 1,
+                "total_is_estimate": False,
+                "next_cursor": None
+            }
+        }
+
+
+class UserImportRow(BaseModel):
+    """Schema de una fila de importación masiva (Admin)"""
+    email: EmailStr = Field(..., description="Email del usuario")
+    name: str = Field(..., min_length=1, description="Nombre completo del usuario")
+    phone_number: Optional[str] = Field(None, description="Número de teléfono (opcional)")
+    role: Literal["ADMIN", "CLIENT"] = Field(default="CLIENT", description="Rol del usuario")
+    password: Optional[str] = Field(None, min_length=8, description="Contraseña en texto plano (se hashea al importar)")
+    hashed_password: Optional[str] = Field(None, description="Hash Argon2 ya calculado (alternativa a password)")
+    
+    @field_validator("email")
+    @classmethod
+    def normalize_email_field(cls, email: str) -> str:
+        """Normaliza el email (sin espacios, en minúsculas)"""
+        return normalize_email(email)
+    
+    @model_validator(mode="after")
+    def check_password(self) -> "UserImportRow":
+        """Exige exactamente una de password / hashed_password"""
+        if (self.password is None) == (self.hashed_password is None):
+            raise ValueError("Debe indicar password o hashed_password (solo uno)")
+        if self.hashed_password is not None and not ARGON2_HASH_PATTERN.match(self.hashed_password):
+            raise ValueError("hashed_password debe ser un hash Argon2 en formato PHC")
+        return self
+    
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "email": "user@example.com",
+                "name": "Juan Pérez",
+                "phone_number": "+34600123456",
+                "role": "CLIENT",
+                "password": "SecurePass123!"
+            }
+        }
+
+
+class UserImportResult(BaseModel):
+    """Schema del resultado de importación de una fila"""
+    row: int = Field(..., description="Número de fila en el archivo (1 = primera fila de datos)")
+    email: Optional[str] = None
+    status: Literal["created", "duplicate", "invalid"]
+    id: Optional[UUID] = None
+    detail: Optional[str] = None
+    
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "row": 1,
+                "email": "user@example.com",
+                "status": "created",
+                "id": "123e4567-e89b-12d3-a456-426614174000",
+                "detail": None
+            }
+        }
+
+
+class UserImportSummary(BaseModel):
+    """Schema del resumen de una importación masiva"""
+    created: int = 0
+    duplicate: int = 0
+    invalid: int = 0
+    
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "created": 198500,
+                "duplicate": 1200,
+                "invalid": 300
+            }
+        }
+
+
+# Máximo de ids explícitos por petición de acción masiva
+MAX_BULK_IDS = 100000
+
+
+class UserBulkFilter(BaseModel):
+    """Schema de filtro para acciones masivas (Admin)"""
+    role: Optional[Literal["ADMIN", "CLIENT"]] = Field(None, description="Filtrar por rol")
+    totp_verified: Optional[bool] = Field(None, description="Filtrar por 2FA verificado")
+    locked: Optional[bool] = Field(None, description="Filtrar por cuentas bloqueadas actualmente")
+    
+    @model_validator(mode="after")
+    def check_not_empty(self) -> "UserBulkFilter":
+        """Evita seleccionar todos los usuarios por omisión"""
+        if self.role is None and self.totp_verified is None and self.locked is None:
+            raise ValueError("El filtro debe incluir al menos un criterio")
+        return self
+
+
+class UserBulkRequest(BaseModel):
+    """Schema para acciones masivas sobre usuarios (Admin)"""
+    ids: Optional[list[UUID]] = Field(None, min_length=1, max_length=MAX_BULK_IDS, description="UUIDs de los usuarios")
+    filter: Optional[UserBulkFilter] = Field(None, description="Filtro de usuarios (alternativa a ids)")
+    values: Optional[UserUpdateRequest] = Field(None, description="Campos a actualizar (solo acción update)")
+    
+    @model_validator(mode="after")
+    def check_selection(self) -> "UserBulkRequest":
+        """Exige exactamente uno de ids / filter"""
+        if (self.ids is None) == (self.filter is None):
+            raise ValueError("Debe indicar ids o filter (solo uno)")
+        return self
+    
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "filter": {
+                    "locked": True
+                }
+            }
+        }
+
+
+class UserBulkProgress(BaseModel):
+    """Schema de progreso de una acción masiva (un bloque procesado)"""
+    chunk: int
+    affected: int
+    total_affected: int
+
+
+class UserBulkSummary(BaseModel):
+    """Schema del resumen de una acción masiva"""
+    action: str
+    affected: int = 0
+    skipped_self: bool = False
+    
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "action": "unlock",
+                "affected": 3400,
+                "skipped_self": False
             }
         }
@@ -0,0 +1,455 @@
+"""
+Seguimiento de intentos fallidos de login
+Principio: Single Responsibility - Solo cuenta fallos consecutivos y decide el bloqueo
+Principio: Open/Closed - Nuevos almacenes se añaden implementando AttemptTracker
+Principio: Dependency Inversion - AuthService depende de la abstracción, no del almacén
+
+Implementaciones:
+- DatabaseAttemptTracker: columnas failed_login_attempts / locked_until
+  (cada fallo es una escritura durable en PostgreSQL).
+- SharedMemoryAttemptTracker: tabla hash en un archivo mmap compartido por
+  todos los workers del host (cada fallo cuesta microsegundos).
+- RedisAttemptTracker: contador con expiración en un servidor que hable el
+  protocolo de Redis (RESP), compartido entre hosts.
+
+En los dos últimos solo la transición a bloqueado se persiste (locked_until),
+por lo que la verificación de bloqueo del login sigue leyendo la fila del usuario.
+"""
+import asyncio
+import contextlib
+import mmap
+import struct
+import time
+from abc import ABC, abstractmethod
+from typing import List, Optional, Tuple, Union
+from urllib.parse import unquote, urlparse
+from uuid import UUID
+
+from app.config import settings
+from app.models.user import User
+from app.repositories.user_repository import AsyncUserRepository
+from app.services.shared_memory import SharedMemoryTable
+
+
+class AttemptTracker(ABC):
+    """
+    Contador de intentos fallidos consecutivos por usuario
+    """
+
+    def __init__(self, max_attempts: int, lock_minutes: int):
+        """
+        Constructor
+
+        Args:
+            max_attempts: Fallos consecutivos que provocan el bloqueo
+            lock_minutes: Minutos de bloqueo
+        """
+        self.max_attempts = max_attempts
+        self.lock_minutes = lock_minutes
+
+    @abstractmethod
+    async def register_failure(self, user_repository: AsyncUserRepository, user_id: UUID) -> bool:
+        """
+        Registra un intento fallido y bloquea la cuenta si alcanza el umbral
+
+        Args:
+            user_repository: Repositorio de la petición (para persistir el bloqueo)
+            user_id: UUID del usuario
+
+        Returns:
+            True si este intento dejó la cuenta bloqueada
+        """
+
+    @abstractmethod
+    async def register_success(self, user_repository: AsyncUserRepository, user: User) -> None:
+        """
+        Resetea el contador tras un login exitoso
+
+        Args:
+            user_repository: Repositorio de la petición
+            user: Usuario autenticado (fila leída por el login)
+        """
+
+    async def close(self) -> None:
+        """
+        Libera los recursos del almacén
+        """
+
+
+class DatabaseAttemptTracker(AttemptTracker):
+    """
+    Contador en la tabla users (una sentencia UPDATE atómica por fallo)
+    """
+
+    async def register_failure(self, user_repository: AsyncUserRepository, user_id: UUID) -> bool:
+        user = await user_repository.record_failed_attempt(
+            user_id,
+            max_attempts=self.max_attempts,
+            lock_minutes=self.lock_minutes
+        )
+        return user is not None and user.failed_login_attempts >= self.max_attempts
+
+    async def register_success(self, user_repository: AsyncUserRepository, user: User) -> None:
+        # Solo escribe si hay algo que resetear
+        if user.failed_login_attempts or user.locked_until is not None:
+            await user_repository.reset_failed_attempts(user.id)
+
+
+class CountingAttemptTracker(AttemptTracker):
+    """
+    Base de los almacenes externos a la BD: cuentan fallos con expiración
+    (ventana de lock_minutes desde el último fallo) y solo escriben en la BD
+    al bloquear la cuenta
+    """
+
+    @abstractmethod
+    async def _increment(self, user_id: UUID, window_seconds: int) -> int:
+        """
+        Incrementa el contador y renueva su expiración
+
+        Returns:
+            Fallos consecutivos incluyendo este
+        """
+
+    @abstractmethod
+    async def _clear(self, user_id: UUID) -> None:
+        """
+        Elimina el contador del usuario
+        """
+
+    async def register_failure(self, user_repository: AsyncUserRepository, user_id: UUID) -> bool:
+        attempts = await self._increment(user_id, self.lock_minutes * 60)
+        if attempts < self.max_attempts:
+            return False
+
+        # Única escritura durable: la transición a bloqueado
+        await user_repository.lock_account(user_id, self.lock_minutes)
+        await self._clear(user_id)
+        return True
+
+    async def register_success(self, user_repository: AsyncUserRepository, user: User) -> None:
+        try:
+            await self._clear(user.id)
+        except Exception as e:
+            # No impide el login: el contador expira solo al final de su ventana
+            print(f"⚠️  Error al resetear intentos fallidos: {type(e).__name__}: {e}")
+        # Estado heredado de DatabaseAttemptTracker o bloqueo expirado aún sin barrer
+        if user.failed_login_attempts or user.locked_until is not None:
+            await user_repository.reset_failed_attempts(user.id)
+
+
+class SharedMemoryAttemptTracker(CountingAttemptTracker):
+    """
+    Contador en una tabla hash compartida por todos los workers del host
+    (ver SharedMemoryTable)
+
+    Si la ventana de sondeo está llena se reutiliza la ranura que expira antes.
+    """
+
+    _MAGIC = b"SLATTv1\0"
+    # UUID (16 bytes), fallos (uint32), relleno, expiración (epoch, float64)
+    _SLOT = struct.Struct("<16sI4xd")
+
+    def __init__(self, max_attempts: int, lock_minutes: int, path: str, slots: int):
+        """
+        Constructor
+
+        Args:
+            max_attempts: Fallos consecutivos que provocan el bloqueo
+            lock_minutes: Minutos de bloqueo (y ventana de los contadores)
+            path: Ruta del archivo compartido
+            slots: Número de ranuras de la tabla
+        """
+        super().__init__(max_attempts, lock_minutes)
+        self.table = SharedMemoryTable(path, self._MAGIC, self._SLOT, slots)
+
+    def _find_slot(self, table: mmap.mmap, key: bytes, now: float) -> Tuple[int, int]:
+        """
+        Busca la ranura de una clave dentro de la ventana de sondeo
+
+        Returns:
+            Tupla (índice de ranura, fallos vigentes de la clave; 0 si no tiene)
+        """
+        reusable: Optional[int] = None
+        oldest: Optional[Tuple[float, int]] = None
+
+        for index in self.table.probe(key):
+            slot_key, count, expires_at = self._SLOT.unpack_from(table, self.table.offset(index))
+            if slot_key == key:
+                return index, count if expires_at > now else 0
+            if reusable is None and (count == 0 or expires_at <= now):
+                reusable = index
+            if oldest is None or expires_at < oldest[0]:
+                oldest = (expires_at, index)
+
+        return (reusable if reusable is not None else oldest[1]), 0
+
+    async def _increment(self, user_id: UUID, window_seconds: int) -> int:
+        key = user_id.bytes
+        now = time.time()
+        with self.table.locked() as table:
+            index, count = self._find_slot(table, key, now)
+            count += 1
+            self._SLOT.pack_into(table, self.table.offset(index), key, count, now + window_seconds)
+        return count
+
+    async def _clear(self, user_id: UUID) -> None:
+        key = user_id.bytes
+        with self.table.locked() as table:
+            index, count = self._find_slot(table, key, time.time())
+            if count:
+                # Se conserva la clave (ranura expirada) para no romper la ventana de sondeo
+                self._SLOT.pack_into(table, self.table.offset(index), key, 0, 0.0)
+
+    async def close(self) -> None:
+        self.table.close()
+
+
+class RedisProtocolError(Exception):
+    """
+    Respuesta de error (-ERR ...) del servidor RESP o respuesta inesperada
+    """
+
+
+RespValue = Union[None, int, bytes, str, RedisProtocolError, List["RespValue"]]
+
+
+def _first_error(replies: List[RespValue]) -> Optional[RedisProtocolError]:
+    """
+    Primer error de una lista de respuestas (incluye los anidados en EXEC)
+    """
+    for reply in replies:
+        if isinstance(reply, RedisProtocolError):
+            return reply
+        if isinstance(reply, list):
+            error = _first_error(reply)
+            if error is not None:
+                return error
+    return None
+
+
+class RespConnection:
+    """
+    Cliente mínimo del protocolo de Redis (RESP2) sobre asyncio
+
+    Una sola conexión por worker; las peticiones se serializan con un lock
+    y cada operación del tracker es un único pipeline (un viaje de red).
+    Un pipeline siempre lee sus N respuestas antes de informar un error, y
+    si no puede leerlas (timeout, desconexión, cancelación) la conexión se
+    descarta: la siguiente petición nunca recibe respuestas de otra.
+    """
+
+    def __init__(self, url: str, timeout: float = 1.0):
+        """
+        Constructor
+
+        Args:
+            url: redis://[[usuario]:contraseña@]host[:puerto][/db]
+            timeout: Segundos máximos por operación
+        """
+        parsed = urlparse(url)
+        self.host = parsed.hostname or "localhost"
+        self.port = parsed.port or 6379
+        self.username = unquote(parsed.username) if parsed.username else None
+        self.password = unquote(parsed.password) if parsed.password else None
+        self.db = int(parsed.path.lstrip("/") or 0)
+        self.timeout = timeout
+        self._reader: Optional[asyncio.StreamReader] = None
+        self._writer: Optional[asyncio.StreamWriter] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._lock = asyncio.Lock()
+
+    @staticmethod
+    def _encode(*args: Union[str, bytes, int]) -> bytes:
+        parts = [b"*%d\r\n" % len(args)]
+        for arg in args:
+            if not isinstance(arg, bytes):
+                arg = str(arg).encode("utf-8")
+            parts.append(b"$%d\r\n%s\r\n" % (len(arg), arg))
+        return b"".join(parts)
+
+    async def _read_reply(self) -> RespValue:
+        """
+        Lee una respuesta completa; los errores del servidor se devuelven
+        como valor para no dejar respuestas pendientes en el stream
+
+        Raises:
+            RedisProtocolError: Si la respuesta no es RESP válido (stream desincronizado)
+        """
+        line = await self._reader.readuntil(b"\r\n")
+        kind, payload = line[:1], line[1:-2]
+        if kind == b"+":
+            return payload.decode("utf-8")
+        if kind == b"-":
+            return RedisProtocolError(payload.decode("utf-8"))
+        if kind == b":":
+            return int(payload)
+        if kind == b"$":
+            length = int(payload)
+            if length < 0:
+                return None
+            data = await self._reader.readexactly(length + 2)
+            return data[:-2]
+        if kind == b"*":
+            length = int(payload)
+            if length < 0:
+                return None
+            return [await self._read_reply() for _ in range(length)]
+        raise RedisProtocolError(f"Respuesta RESP desconocida: {line!r}")
+
+    async def _connect(self) -> None:
+        self._reader, self._writer = await asyncio.open_connection(self.host, self.port)
+        setup = []
+        if self.password is not None:
+            setup.append(("AUTH", self.username, self.password) if self.username else ("AUTH", self.password))
+        if self.db:
+            setup.append(("SELECT", self.db))
+        if setup:
+            self._writer.write(b"".join(self._encode(*command) for command in setup))
+            await self._writer.drain()
+            error = _first_error([await self._read_reply() for _ in setup])
+            if error is not None:
+                # Credenciales o base de datos inválidas: la conexión no es utilizable
+                raise error
+
+    async def pipeline(self, *commands: Tuple[Union[str, bytes, int], ...]) -> List[RespValue]:
+        """
+        Envía varios comandos en un solo viaje y lee sus respuestas
+
+        Args:
+            commands: Comandos (tuplas de argumentos)
+
+        Returns:
+            Respuestas, en orden
+
+        Raises:
+            RedisProtocolError: Si el servidor responde con un error a algún comando
+        """
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            # Los streams y el lock pertenecen a un event loop: reabrir en el actual
+            self._discard()
+            self._loop = loop
+            self._lock = asyncio.Lock()
+
+        async with self._lock:
+            try:
+                replies = await asyncio.wait_for(self._roundtrip(commands), self.timeout)
+            except BaseException:
+                # Conexión rota, respuesta a medias o inválida, o petición cancelada:
+                # quedan respuestas sin leer, se descarta y se reabre en el siguiente uso
+                self._discard()
+                raise
+
+        error = _first_error(replies)
+        if error is not None:
+            # Todas las respuestas ya se leyeron: la conexión sigue sincronizada
+            raise error
+        return replies
+
+    async def _roundtrip(self, commands) -> List[RespValue]:
+        if self._writer is None:
+            await self._connect()
+        self._writer.write(b"".join(self._encode(*command) for command in commands))
+        await self._writer.drain()
+        return [await self._read_reply() for _ in commands]
+
+    def _discard(self) -> None:
+        """
+        Aborta la conexión sin esperar (se reabre en el siguiente uso)
+        """
+        if self._writer is not None:
+            with contextlib.suppress(Exception):
+                self._writer.transport.abort()
+        self._reader = None
+        self._writer = None
+
+    async def close(self) -> None:
+        """
+        Cierra la conexión
+        """
+        if self._writer is not None:
+            self._writer.close()
+            with contextlib.suppress(Exception):
+                await self._writer.wait_closed()
+        self._reader = None
+        self._writer = None
+
+
+class RedisAttemptTracker(CountingAttemptTracker):
+    """
+    Contador con expiración en un servidor RESP (Redis, Valkey, KeyDB...)
+
+    Cada fallo es MULTI / INCR / EXPIRE / EXEC en un solo viaje de red:
+    atómico y sin scripts, por lo que funciona con cualquier implementación
+    compatible del protocolo.
+    """
+
+    def __init__(self, max_attempts: int, lock_minutes: int, url: str, prefix: str = "login_failures"):
+        """
+        Constructor
+
+        Args:
+            max_attempts: Fallos consecutivos que provocan el bloqueo
+            lock_minutes: Minutos de bloqueo (y ventana de los contadores)
+            url: URL del servidor (redis://...)
+            prefix: Prefijo de las claves
+        """
+        super().__init__(max_attempts, lock_minutes)
+        self.prefix = prefix
+        self.connection = RespConnection(url)
+
+    def _key(self, user_id: UUID) -> str:
+        return f"{self.prefix}:{user_id}"
+
+    async def _increment(self, user_id: UUID, window_seconds: int) -> int:
+        key = self._key(user_id)
+        replies = await self.connection.pipeline(
+            ("MULTI",),
+            ("INCR", key),
+            ("EXPIRE", key, window_seconds),
+            ("EXEC",)
+        )
+        results = replies[-1]
+        if not isinstance(results, list) or not results:
+            # EXEC nulo: la transacción fue abortada y no se contó el fallo
+            raise RedisProtocolError("Transacción MULTI/EXEC abortada por el servidor")
+        return int(results[0])
+
+    async def _clear(self, user_id: UUID) -> None:
+        await self.connection.pipeline(("DEL", self._key(user_id)))
+
+    async def close(self) -> None:
+        await self.connection.close()
+
+
+def create_attempt_tracker() -> AttemptTracker:
+    """
+    Crea el tracker configurado en settings.attempt_tracker_backend
+
+    Returns:
+        Instancia de AttemptTracker
+
+    Raises:
+        ValueError: Si el backend no existe
+    """
+    backend = settings.attempt_tracker_backend
+    common = {
+        "max_attempts": settings.max_failed_login_attempts,
+        "lock_minutes": settings.account_lock_minutes,
+    }
+    if backend == "database":
+        return DatabaseAttemptTracker(**common)
+    if backend == "shared_memory":
+        return SharedMemoryAttemptTracker(
+            path=settings.attempt_tracker_shm_path,
+            slots=settings.attempt_tracker_shm_slots,
+            **common
+        )
+    if backend == "redis":
+        return RedisAttemptTracker(url=settings.attempt_tracker_redis_url, **common)
+    raise ValueError(f"Backend de intentos fallidos desconocido: {backend}")
+
+
+# Instancia global del tracker de intentos fallidos (Singleton pattern)
+attempt_tracker = create_attempt_tracker()
@@ -8,14 +8,107 @@ from datetime import datetime, timedelta
 from typing import Optional, Tuple
 from uuid import UUID
 import jwt
-from pwdlib import PasswordHash
 
+from app.cache import token_claims_cache
 from app.config import settings
+from app.container import container
 from app.models.user import User
-from app.repositories.user_repository import UserRepository
+from app.repositories.user_repository import AsyncUserRepository
+from app.services.attempt_tracker import AttemptTracker
+from app.services.jwt_keys import get_key_ring
+from app.services.password_hasher import PasswordHasher
+from app.services.totp_replay_cache import TOTPReplayCache
 from app.services.totp_service import TOTPService
 
 
+# Alcance (claim "scope") de cada tipo de token. Los tokens de acceso
+# emitidos antes de existir el claim no lo llevan y se tratan como "access".
+ACCESS_TOKEN_SCOPE = "access"
+ENROLLMENT_TOKEN_SCOPE = "2fa_enrollment"
+
+
+def encode_token(payload: dict) -> str:
+    """
+    Firma un token JWT con la clave activa del anillo o con el secreto compartido
+    
+    Args:
+        payload: Claims del token
+        
+    Returns:
+        Token JWT (con cabecera kid si se firma con el anillo de claves)
+    """
+    key_ring = get_key_ring()
+    if key_ring is None:
+        return jwt.encode(payload, settings.jwt_secret_key, algorithm=settings.jwt_algorithm)
+    
+    signing_key = key_ring.active
+    return jwt.encode(
+        payload,
+        signing_key.private_key,
+        algorithm=signing_key.algorithm,
+        headers={"kid": signing_key.kid}
+    )
+
+
+def _verify_token(token: str) -> Optional[dict]:
+    """
+    Verifica la firma y expiración de un token JWT
+    
+    Con anillo de claves, la clave se elige por el kid de la cabecera (una
+    búsqueda en diccionario); el algoritmo lo fija la clave, no la cabecera.
+    
+    Args:
+        token: Token JWT
+        
+    Returns:
+        Payload del token o None si su kid no está en el anillo
+        
+    Raises:
+        jwt.PyJWTError: Si el token es inválido o expiró
+    """
+    key_ring = get_key_ring()
+    if key_ring is None:
+        return jwt.decode(token, settings.jwt_secret_key, algorithms=[settings.jwt_algorithm])
+    
+    kid = jwt.get_unverified_header(token).get("kid")
+    signing_key = key_ring.get(kid) if isinstance(kid, str) else None
+    if signing_key is None:
+        return None
+    return jwt.decode(token, signing_key.public_key, algorithms=[signing_key.algorithm])
+
+
+def decode_access_token(token: str, scope: str = ACCESS_TOKEN_SCOPE) -> Optional[dict]:
+    """
+    Decodifica y valida un token JWT usando la caché de tokens verificados
+    
+    Función de módulo: no requiere construir AuthService ni sus dependencias,
+    por lo que es la que usa get_current_user en cada petición. Un token ya
+    verificado se resuelve con un hash SHA-256 y una búsqueda en memoria.
+    
+    Args:
+        token: Token JWT
+        scope: Alcance exigido; un token de otro alcance se rechaza
+        
+    Returns:
+        Payload del token o None si es inválido o de otro alcance
+    """
+    key = token_claims_cache.digest(token)
+    payload = token_claims_cache.get(key)
+    if payload is None:
+        try:
+            payload = _verify_token(token)
+        except jwt.PyJWTError:
+            return None
+        if payload is None:
+            return None
+        
+        token_claims_cache.put(key, payload)
+    
+    if payload.get("scope", ACCESS_TOKEN_SCOPE) != scope:
+        return None
+    return payload
+
+
 class AuthService:
     """
     Servicio de autenticación con soporte para 2FA obligatorio
@@ -23,35 +116,46 @@ class AuthService:
     
     def __init__(
         self,
-        user_repository: UserRepository,
-        totp_service: TOTPService
+        user_repository: AsyncUserRepository,
+        totp_service: TOTPService,
+        password_hasher: PasswordHasher,
+        attempt_tracker: AttemptTracker,
+        totp_replay_cache: TOTPReplayCache
     ):
         """
         Constructor con inyección de dependencias
         
         Args:
-            user_repository: Repositorio de usuarios
+            user_repository: Repositorio async de usuarios
             totp_service: Servicio TOTP
+            password_hasher: Ejecutor de hashing de contraseñas (pool de procesos)
+            attempt_tracker: Almacén de intentos fallidos
+            totp_replay_cache: Último contador TOTP aceptado por usuario (anti-replay)
         """
         self.user_repository = user_repository
         self.totp_service = totp_service
-        self.password_hash = PasswordHash.recommended()
+        self.password_hasher = password_hasher
+        self.attempt_tracker = attempt_tracker
+        self.totp_replay_cache = totp_replay_cache
     
-    def hash_password(self, password: str) -> str:
+    async def hash_password(self, password: str) -> str:
         """
-        Hashea una contraseña usando pwdlib
+        Hashea una contraseña usando pwdlib (fuera del event loop)
         
         Args:
             password: Contraseña en texto plano
             
         Returns:
             Contraseña hasheada
+            
+        Raises:
+            PasswordHasherOverloadedError: Si la cola de hashing está llena
         """
-        return self.password_hash.hash(password)
+        return await self.password_hasher.hash(password)
     
-    def verify_password(self, plain_password: str, hashed_password: str) -> bool:
+    async def verify_password(self, plain_password: str, hashed_password: str) -> bool:
         """
-        Verifica una contraseña contra su hash
+        Verifica una contraseña contra su hash (fuera del event loop)
         
         Args:
             plain_password: Contraseña en texto plano
@@ -59,8 +163,11 @@ class AuthService:
             
         Returns:
             True si la contraseña es correcta
+            
+        Raises:
+            PasswordHasherOverloadedError: Si la cola de hashing está llena
         """
-        return self.password_hash.verify(plain_password, hashed_password)
+        return await self.password_hasher.verify(plain_password, hashed_password)
     
     def create_access_token(self, user: User) -> str:
         """
@@ -83,16 +190,64 @@ class AuthService:
             "role": user.role,
             "exp": expire,
             "iat": datetime.utcnow(),
-            "totp_verified": user.totp_verified
+            "totp_verified": user.totp_verified,
+            "scope": ACCESS_TOKEN_SCOPE
         }
         
-        token = jwt.encode(
-            payload,
-            settings.jwt_secret_key,
-            algorithm=settings.jwt_algorithm
-        )
+        return encode_token(payload)
+    
+    def create_enrollment_token(self, user: User) -> str:
+        """
+        Crea un token JWT de corta duración para completar la configuración de 2FA
+        
+        Lo emite setup-2fa tras verificar la contraseña; setup-2fa y verify-2fa
+        lo aceptan en lugar de la contraseña, así el enrolamiento solo ejecuta
+        Argon2 una vez. Su alcance (2fa_enrollment) no sirve como token de acceso.
+        
+        Args:
+            user: Usuario que está configurando 2FA
+            
+        Returns:
+            Token JWT
+        """
+        now = datetime.utcnow()
+        payload = {
+            "sub": str(user.id),
+            "scope": ENROLLMENT_TOKEN_SCOPE,
+            "exp": now + timedelta(minutes=settings.jwt_enrollment_token_expire_minutes),
+            "iat": now
+        }
         
-        return token
+        return encode_token(payload)
+    
+    async def authenticate_enrollment_token(self, token: str) -> Optional[User]:
+        """
+        Autentica un usuario por su token de enrolamiento (sin Argon2)
+        
+        Args:
+            token: Token JWT de alcance 2fa_enrollment
+            
+        Returns:
+            Usuario si el token es válido y su 2FA aún no está verificado,
+            None en caso contrario
+        """
+        payload = decode_access_token(token, scope=ENROLLMENT_TOKEN_SCOPE)
+        if not payload:
+            return None
+        
+        try:
+            user_id = UUID(payload["sub"])
+        except (KeyError, ValueError, TypeError):
+            return None
+        
+        user = await self.user_repository.get_by_id(user_id)
+        
+        # Con el 2FA ya verificado el enrolamiento terminó: el token deja de valer
+        # (reconfigurar un 2FA verificado exige la contraseña)
+        if not user or user.totp_verified:
+            return None
+        
+        return user
     
     def decode_access_token(self, token: str) -> Optional[dict]:
         """
@@ -104,17 +259,9 @@ class AuthService:
         Returns:
             Payload del token o None si es inválido
         """
-        try:
-            payload = jwt.decode(
-                token,
-                settings.jwt_secret_key,
-                algorithms=[settings.jwt_algorithm]
-            )
-            return payload
-        except jwt.PyJWTError:
-            return None
+        return decode_access_token(token)
     
-    def register_user(self, email: str, password: str, name: str, phone_number: Optional[str] = None, role: str = "CLIENT") -> User:
+    async def register_user(self, email: str, password: str, name: str, phone_number: Optional[str] = None, role: str = "CLIENT") -> User:
         """
         Registra un nuevo usuario
         
@@ -131,19 +278,22 @@ class AuthService:
         Raises:
             ValueError: Si el email ya está registrado
         """
-        # Verificar si el email ya existe
-        if self.user_repository.exists_by_email(email):
+        # Pre-verificación por índice: evita el hash Argon2 si el email ya existe
+        if await self.user_repository.exists_by_email(email):
             raise ValueError("El email ya está registrado")
         
         # Hashear contraseña
-        hashed_password = self.hash_password(password)
+        hashed_password = await self.hash_password(password)
         
-        # Crear usuario
-        user = self.user_repository.create(email, hashed_password, name, phone_number, role)
+        # Crear usuario (INSERT ... ON CONFLICT DO NOTHING RETURNING: un solo viaje).
+        # None = otro registro con el mismo email ganó la carrera tras la pre-verificación
+        user = await self.user_repository.create_if_absent(email, hashed_password, name, phone_number, role)
+        if user is None:
+            raise ValueError("El email ya está registrado")
         
         return user
     
-    def setup_totp(self, user_id: UUID) -> Tuple[str, str]:
+    async def setup_totp(self, user_id: UUID) -> Tuple[str, str]:
         """
         Configura 2FA para un usuario (genera secret y URI)
         
@@ -156,7 +306,7 @@ class AuthService:
         Raises:
             ValueError: Si el usuario no existe
         """
-        user = self.user_repository.get_by_id(user_id)
+        user = await self.user_repository.get_by_id(user_id)
         if not user:
             raise ValueError("Usuario no encontrado")
         
@@ -164,14 +314,28 @@ class AuthService:
         secret = self.totp_service.generate_secret()
         
         # Guardar secret en la base de datos
-        self.user_repository.update_totp_secret(user_id, secret)
+        await self.user_repository.update_totp_secret(user_id, secret)
         
         # Generar URI para código QR
         provisioning_uri = self.totp_service.get_provisioning_uri(user.email, secret)
         
         return secret, provisioning_uri
     
-    def verify_totp_code(self, user_id: UUID, totp_code: str) -> bool:
+    def _accept_totp_code(self, user: User, totp_code: str) -> bool:
+        """
+        Verifica un código TOTP y lo marca como usado
+        
+        Args:
+            user: Usuario con secret configurado
+            totp_code: Código TOTP a verificar
+            
+        Returns:
+            True si el código es válido y no se había usado (ni uno posterior)
+        """
+        counter = self.totp_service.match_totp_counter(user.totp_secret, totp_code)
+        return counter is not None and self.totp_replay_cache.claim(user.id, counter)
+    
+    async def verify_totp_code(self, user_id: UUID, totp_code: str) -> bool:
         """
         Verifica un código TOTP y marca el 2FA como verificado si es correcto
         
@@ -185,23 +349,23 @@ class AuthService:
         Raises:
             ValueError: Si el usuario no existe o no tiene secret configurado
         """
-        user = self.user_repository.get_by_id(user_id)
+        user = await self.user_repository.get_by_id(user_id)
         if not user:
             raise ValueError("Usuario no encontrado")
         
         if not user.totp_secret:
             raise ValueError("2FA no configurado para este usuario")
         
-        # Verificar código
-        is_valid = self.totp_service.verify_totp(user.totp_secret, totp_code)
+        # Verificar código (rechaza códigos ya usados)
+        is_valid = self._accept_totp_code(user, totp_code)
         
         # Si es válido y no estaba verificado, marcar como verificado
         if is_valid and not user.totp_verified:
-            self.user_repository.verify_totp(user_id)
+            await self.user_repository.verify_totp(user_id)
         
         return is_valid
     
-    def authenticate_user(self, email: str, password: str) -> Optional[User]:
+    async def authenticate_user(self, email: str, password: str) -> Optional[User]:
         """
         Autentica un usuario por email y contraseña
         
@@ -212,17 +376,33 @@ class AuthService:
         Returns:
             Usuario si las credenciales son correctas, None en caso contrario
         """
-        user = self.user_repository.get_by_email(email)
+        user = await self.user_repository.get_by_email(email)
         
         if not user:
             return None
         
-        if not self.verify_password(password, user.hashed_password):
+        if not await self.verify_password(password, user.hashed_password):
             return None
         
         return user
     
-    def login(self, email: str, password: str, totp_code: Optional[str] = None) -> Tuple[Optional[str], Optional[User], str]:
+    async def _register_failed_attempt(self, user_id: UUID) -> None:
+        """
+        Registra un intento fallido en el almacén configurado (AttemptTracker)
+        
+        Args:
+            user_id: UUID del usuario
+            
+        Raises:
+            ValueError: Si el intento alcanza el umbral y la cuenta queda bloqueada
+        """
+        if await self.attempt_tracker.register_failure(self.user_repository, user_id):
+            raise ValueError(
+                "Cuenta bloqueada por múltiples intentos fallidos. "
+                f"Intente nuevamente en {settings.account_lock_minutes} minutos"
+            )
+    
+    async def login(self, email: str, password: str, totp_code: Optional[str] = None) -> Tuple[Optional[str], Optional[User], str]:
         """
         Maneja el flujo completo de login con 2FA obligatorio y control de intentos fallidos
         
@@ -230,7 +410,9 @@ class AuthService:
         - Verificar si la cuenta está bloqueada ANTES de validar credenciales
         - Si el usuario NO tiene 2FA verificado, NO se retorna token de acceso
         - Incrementar intentos fallidos en caso de error de contraseña o 2FA
-        - Bloquear cuenta después de 3 intentos fallidos (15 minutos)
+        - Bloquear cuenta al alcanzar settings.max_failed_login_attempts intentos
+          fallidos (settings.account_lock_minutes minutos); el conteo lo lleva AttemptTracker
+        - Cada código TOTP se acepta una sola vez (TOTPReplayCache)
         - Resetear intentos en login exitoso
         
         Args:
@@ -247,29 +429,24 @@ class AuthService:
         Raises:
             ValueError: Si las credenciales son incorrectas o cuenta bloqueada
         """
-        # Obtener usuario por email
-        user = self.user_repository.get_by_email(email)
+        # Obtener usuario por email junto con su estado de bloqueo (solo lectura)
+        result = await self.user_repository.get_by_email_with_lock_state(email)
         
-        if not user:
+        if not result:
             raise ValueError("Credenciales inválidas")
         
+        user, is_locked = result
+        
         # PASO 1: Verificar si la cuenta está bloqueada (ANTES de validar credenciales)
-        if self.user_repository.is_account_locked(user):
+        if is_locked:
             remaining_seconds = self.user_repository.get_lock_remaining_time(user)
             remaining_minutes = remaining_seconds // 60 if remaining_seconds else 0
             raise ValueError(f"Cuenta bloqueada por intentos fallidos. Tiempo restante: {remaining_minutes} minutos")
         
         # PASO 2: Verificar contraseña
-        if not self.verify_password(password, user.hashed_password):
-            # Incrementar intentos fallidos
-            self.user_repository.increment_failed_attempts(user.id)
-            
-            # Verificar si debe bloquear la cuenta
-            user = self.user_repository.get_by_id(user.id)  # Refrescar datos
-            if user.failed_login_attempts >= 3:
-                self.user_repository.lock_account(user.id, minutes=15)
-                raise ValueError("Cuenta bloqueada por múltiples intentos fallidos. Intente nuevamente en 15 minutos")
-            
+        if not await self.verify_password(password, user.hashed_password):
+            # Incrementar intentos fallidos (y bloquear si corresponde)
+            await self._register_failed_attempt(user.id)
             raise ValueError("Credenciales inválidas")
         
         # PASO 3: Verificar si tiene 2FA configurado y verificado
@@ -280,21 +457,14 @@ class AuthService:
         if not totp_code:
             return None, user, "TOTP_CODE_REQUIRED"
         
-        # PASO 5: Verificar código TOTP
-        if not self.totp_service.verify_totp(user.totp_secret, totp_code):
-            # Incrementar intentos fallidos por 2FA inválido
-            self.user_repository.increment_failed_attempts(user.id)
-            
-            # Verificar si debe bloquear la cuenta
-            user = self.user_repository.get_by_id(user.id)  # Refrescar datos
-            if user.failed_login_attempts >= 3:
-                self.user_repository.lock_account(user.id, minutes=15)
-                raise ValueError("Cuenta bloqueada por múltiples intentos fallidos. Intente nuevamente en 15 minutos")
-            
+        # PASO 5: Verificar código TOTP (un código ya usado cuenta como inválido)
+        if not self._accept_totp_code(user, totp_code):
+            # Incrementar intentos fallidos por 2FA inválido (y bloquear si corresponde)
+            await self._register_failed_attempt(user.id)
             raise ValueError("Código TOTP inválido")
         
         # PASO 6: Login exitoso - resetear intentos fallidos
-        self.user_repository.reset_failed_attempts(user.id)
+        await self.attempt_tracker.register_success(self.user_repository, user)
         
         # PASO 7: Generar token de acceso
         token = self.create_access_token(user)
@@ -302,16 +472,22 @@ class AuthService:
         return token, user, "LOGIN_SUCCESS"
 
 
-def get_auth_service(user_repository: UserRepository) -> AuthService:
+def get_auth_service(user_repository: AsyncUserRepository) -> AuthService:
     """
     Factory function para obtener instancia de AuthService
     Implementa inyección de dependencias para FastAPI
+    Los servicios sin estado se toman del contenedor de la aplicación
     
     Args:
-        user_repository: Repositorio de usuarios
+        user_repository: Repositorio async de usuarios
         
     Returns:
         Instancia de AuthService
     """
-    totp_service = TOTPService()
-    return AuthService(user_repository, totp_service)
+    return AuthService(
+        user_repository,
+        container.totp_service,
+        container.password_hasher,
+        container.attempt_tracker,
+        container.totp_replay_cache
+    )
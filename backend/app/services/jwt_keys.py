@@ -0,0 +1,225 @@
+"""
+Anillo de claves de firma JWT
+Principio: Single Responsibility - Solo carga las claves de firma y resuelve la clave de cada kid
+
+Con HS256 todo servicio que valide tokens necesita el secreto compartido (o
+llamar a esta API). Con EdDSA/ES256 se firma con una clave privada y los
+demás servicios validan localmente con la clave pública publicada en
+/.well-known/jwks.json.
+
+Las claves se leen de un directorio con un PEM privado por clave; el nombre
+del archivo sin extensión es su kid (<kid>.pem). Todas verifican tokens y
+solo la activa (jwt_active_kid) firma los nuevos. Rotación:
+    1. python -m app.commands.generate_signing_key  (clave nueva, aún inactiva)
+    2. Reiniciar: la clave nueva se publica en el JWKS
+    3. Pasada la caché del JWKS, activarla con JWT_ACTIVE_KID
+    4. Pasada la vida de los tokens de acceso, borrar el PEM anterior
+"""
+import base64
+import hashlib
+import json
+import os
+from dataclasses import dataclass
+from typing import Any, Dict, Optional
+
+import jwt
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import ec, ed25519
+
+from app.config import settings
+
+
+# Algoritmos asimétricos soportados (Ed25519 y P-256)
+ASYMMETRIC_ALGORITHMS = ("EdDSA", "ES256")
+KEY_FILE_SUFFIX = ".pem"
+
+
+def generate_private_key(algorithm: str) -> Any:
+    """
+    Genera una clave privada nueva para el algoritmo
+
+    Args:
+        algorithm: EdDSA (Ed25519) o ES256 (P-256)
+
+    Returns:
+        Clave privada de cryptography
+
+    Raises:
+        ValueError: Si el algoritmo no es asimétrico soportado
+    """
+    if algorithm == "EdDSA":
+        return ed25519.Ed25519PrivateKey.generate()
+    if algorithm == "ES256":
+        return ec.generate_private_key(ec.SECP256R1())
+    raise ValueError(f"Algoritmo JWT asimétrico no soportado: {algorithm}")
+
+
+def _check_key_type(private_key: Any, algorithm: str, source: str) -> None:
+    """
+    Comprueba que la clave corresponde al algoritmo configurado
+
+    Raises:
+        ValueError: Si el tipo de clave no corresponde
+    """
+    if algorithm == "EdDSA" and isinstance(private_key, ed25519.Ed25519PrivateKey):
+        return
+    if (
+        algorithm == "ES256"
+        and isinstance(private_key, ec.EllipticCurvePrivateKey)
+        and isinstance(private_key.curve, ec.SECP256R1)
+    ):
+        return
+    raise ValueError(f"La clave {source} no es válida para {algorithm}")
+
+
+def jwk_thumbprint(jwk: Dict[str, str]) -> str:
+    """
+    Huella RFC 7638 de una clave pública JWK (sirve como kid por defecto)
+
+    Args:
+        jwk: Clave pública en formato JWK
+
+    Returns:
+        SHA-256 base64url (sin relleno) de los miembros obligatorios
+    """
+    required = ("crv", "kty", "x", "y") if jwk["kty"] == "EC" else ("crv", "kty", "x")
+    canonical = json.dumps({name: jwk[name] for name in required}, separators=(",", ":"), sort_keys=True)
+    digest = hashlib.sha256(canonical.encode("utf-8")).digest()
+    return base64.urlsafe_b64encode(digest).rstrip(b"=").decode("ascii")
+
+
+@dataclass(frozen=True)
+class SigningKey:
+    """
+    Clave del anillo: privada para firmar, pública para verificar
+    """
+    kid: str
+    algorithm: str
+    private_key: Any
+    public_key: Any
+    jwk: Dict[str, str]
+
+
+class KeyRing:
+    """
+    Claves de firma indexadas por kid
+
+    Verificar un token es una búsqueda en diccionario con el kid de su
+    cabecera: el coste no crece con el número de claves del anillo.
+    """
+
+    def __init__(self, algorithm: str, keys: Dict[str, SigningKey], active_kid: str):
+        """
+        Constructor
+
+        Args:
+            algorithm: Algoritmo de todas las claves (EdDSA o ES256)
+            keys: Claves por kid
+            active_kid: kid de la clave que firma los tokens nuevos
+
+        Raises:
+            ValueError: Si la clave activa no está en el anillo
+        """
+        if active_kid not in keys:
+            raise ValueError(f"La clave activa {active_kid!r} no está en el anillo de claves JWT")
+        self.algorithm = algorithm
+        self.keys = keys
+        self.active = keys[active_kid]
+        self.jwks = {"keys": [key.jwk for key in keys.values()]}
+
+    def get(self, kid: str) -> Optional[SigningKey]:
+        """
+        Clave de verificación de un kid
+
+        Args:
+            kid: kid de la cabecera del token
+
+        Returns:
+            Clave o None si no está en el anillo (retirada o desconocida)
+        """
+        return self.keys.get(kid)
+
+    @classmethod
+    def from_directory(cls, path: str, algorithm: str, active_kid: Optional[str] = None) -> "KeyRing":
+        """
+        Carga todas las claves <kid>.pem de un directorio
+
+        Args:
+            path: Directorio con las claves privadas PEM (sin contraseña)
+            algorithm: EdDSA o ES256
+            active_kid: kid que firma; None solo si el directorio tiene una única clave
+
+        Returns:
+            Anillo de claves
+
+        Raises:
+            ValueError: Si no hay claves, alguna no corresponde al algorithm
+                        o no se puede determinar la clave activa
+        """
+        jwt_algorithm = jwt.get_algorithm_by_name(algorithm)
+        keys: Dict[str, SigningKey] = {}
+
+        for filename in sorted(os.listdir(path)):
+            if not filename.endswith(KEY_FILE_SUFFIX):
+                continue
+            kid = filename[:-len(KEY_FILE_SUFFIX)]
+            with open(os.path.join(path, filename), "rb") as key_file:
+                private_key = serialization.load_pem_private_key(key_file.read(), password=None)
+            _check_key_type(private_key, algorithm, filename)
+
+            public_key = private_key.public_key()
+            jwk = jwt_algorithm.to_jwk(public_key, as_dict=True)
+            jwk.update({"kid": kid, "alg": algorithm, "use": "sig"})
+            keys[kid] = SigningKey(kid, algorithm, private_key, public_key, jwk)
+
+        if not keys:
+            raise ValueError(f"No hay claves {KEY_FILE_SUFFIX} en {path}")
+        if active_kid is None:
+            if len(keys) > 1:
+                raise ValueError("Hay varias claves JWT: indique la que firma con JWT_ACTIVE_KID")
+            active_kid = next(iter(keys))
+        return cls(algorithm, keys, active_kid)
+
+
+def create_key_ring() -> Optional[KeyRing]:
+    """
+    Crea el anillo de claves según settings.jwt_algorithm
+
+    Returns:
+        Anillo de claves, o None si se firma con secreto compartido (HS*)
+
+    Raises:
+        ValueError: Si el algoritmo es asimétrico y falta el directorio de claves
+    """
+    if settings.jwt_algorithm not in ASYMMETRIC_ALGORITHMS:
+        return None
+    if not settings.jwt_signing_keys_dir:
+        raise ValueError(
+            f"JWT_ALGORITHM={settings.jwt_algorithm} requiere JWT_SIGNING_KEYS_DIR "
+            "(python -m app.commands.generate_signing_key)"
+        )
+    return KeyRing.from_directory(
+        settings.jwt_signing_keys_dir,
+        settings.jwt_algorithm,
+        settings.jwt_active_kid
+    )
+
+
+# Instancia global del anillo de claves JWT (Singleton pattern). Se carga en
+# el primer uso para que generate_signing_key funcione antes de existir claves.
+_key_ring: Optional[KeyRing] = None
+_key_ring_loaded = False
+
+
+def get_key_ring() -> Optional[KeyRing]:
+    """
+    Factory function para obtener el anillo de claves global
+
+    Returns:
+        Anillo de claves, o None si se firma con secreto compartido (HS*)
+    """
+    global _key_ring, _key_ring_loaded
+    if not _key_ring_loaded:
+        _key_ring = create_key_ring()
+        _key_ring_loaded = True
+    return _key_ring
@@ -0,0 +1,83 @@
+"""
+Barrido periódico de bloqueos expirados
+Principio: Single Responsibility - Solo limpia bloqueos de cuenta vencidos
+
+La verificación de bloqueo en el login es de solo lectura: un bloqueo
+expirado deja de aplicar sin escribir en la base de datos. Esta tarea
+en segundo plano resetea en lote (una sola sentencia UPDATE) los contadores
+de todas las cuentas cuyo bloqueo ya venció.
+
+En la misma pasada elimina los refresh tokens expirados (un DELETE en lote):
+ya no serían aceptados y solo se conservaban para detectar su reutilización.
+"""
+import asyncio
+from typing import Optional
+
+from app.config import settings
+from app.database import AsyncSessionLocal
+from app.repositories.refresh_token_repository import get_async_refresh_token_repository
+from app.repositories.user_repository import get_async_user_repository
+
+
+class LockSweeper:
+    """
+    Tarea asyncio que ejecuta clear_expired_locks (y la purga de refresh tokens) a intervalos regulares
+    """
+
+    def __init__(self, interval_seconds: int):
+        """
+        Constructor
+
+        Args:
+            interval_seconds: Segundos entre barridos
+        """
+        self.interval_seconds = interval_seconds
+        self._task: Optional[asyncio.Task] = None
+
+    async def sweep_once(self) -> int:
+        """
+        Ejecuta un barrido
+
+        Returns:
+            Número de cuentas desbloqueadas
+        """
+        async with AsyncSessionLocal() as db:
+            user_repository = get_async_user_repository(db)
+            unlocked = await user_repository.clear_expired_locks()
+            await get_async_refresh_token_repository(db).delete_expired()
+            return unlocked
+
+    async def _run(self) -> None:
+        """
+        Bucle principal del barrido
+        """
+        while True:
+            await asyncio.sleep(self.interval_seconds)
+            try:
+                await self.sweep_once()
+            except Exception as e:
+                # Un fallo puntual (ej. BD no disponible) no detiene la tarea
+                print(f"⚠️  Error en barrido de bloqueos expirados: {type(e).__name__}: {e}")
+
+    def start(self) -> None:
+        """
+        Inicia la tarea en segundo plano (idempotente)
+        """
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """
+        Detiene la tarea en segundo plano
+        """
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+# Instancia global del barrido (Singleton pattern)
+lock_sweeper = LockSweeper(interval_seconds=settings.lock_sweep_interval_seconds)
@@ -0,0 +1,222 @@
+"""
+Servicio de Hashing de Contraseñas
+Principio: Single Responsibility - Solo ejecuta el hashing Argon2 fuera del event loop
+Principio: Dependency Inversion - AuthService depende de esta abstracción, no de pwdlib
+
+Argon2 es CPU-bound: ejecutarlo dentro de un endpoint async bloquea el event loop
+de uvicorn y serializa todas las peticiones del worker. Este servicio lo delega a
+un pool de procesos dimensionado al número de núcleos, con una cola acotada que
+rechaza trabajo nuevo (503 + Retry-After) en lugar de dejar crecer la latencia.
+"""
+import asyncio
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, List, Optional, Sequence
+
+from pwdlib import PasswordHash
+
+from app.config import settings
+from app.metrics import metrics
+
+
+# ============= Funciones ejecutadas en los procesos del pool =============
+
+# Instancia por proceso (se crea una sola vez en el initializer del worker)
+_worker_password_hash: Optional[PasswordHash] = None
+
+
+def _init_worker() -> None:
+    """
+    Inicializa el hasher Argon2 en cada proceso del pool
+    """
+    global _worker_password_hash
+    _worker_password_hash = PasswordHash.recommended()
+
+
+def _hash_password(password: str) -> str:
+    """
+    Hashea una contraseña dentro de un proceso del pool
+    """
+    return _worker_password_hash.hash(password)
+
+
+def _hash_passwords(passwords: List[str]) -> List[str]:
+    """
+    Hashea un lote de contraseñas dentro de un proceso del pool
+    """
+    return [_worker_password_hash.hash(password) for password in passwords]
+
+
+def _verify_password(plain_password: str, hashed_password: str) -> bool:
+    """
+    Verifica una contraseña dentro de un proceso del pool
+    """
+    return _worker_password_hash.verify(plain_password, hashed_password)
+
+
+# ============= Excepciones =============
+
+class PasswordHasherOverloadedError(Exception):
+    """
+    Se lanza cuando la cola de hashing está llena (backpressure)
+    """
+
+    def __init__(self, retry_after: int):
+        super().__init__("Servicio de autenticación saturado. Intente nuevamente más tarde")
+        self.retry_after = retry_after
+
+
+# ============= Servicio =============
+
+class PasswordHasher:
+    """
+    Ejecutor de hashing de contraseñas sobre un pool de procesos acotado
+    """
+
+    def __init__(
+        self,
+        max_workers: Optional[int] = None,
+        max_queue_depth: int = 32,
+        retry_after: int = 1
+    ):
+        """
+        Constructor
+
+        Args:
+            max_workers: Procesos del pool (None = número de núcleos)
+            max_queue_depth: Operaciones que pueden esperar con todos los procesos ocupados
+            retry_after: Segundos sugeridos al cliente cuando la cola está llena
+        """
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.max_queue_depth = max_queue_depth
+        self.retry_after = retry_after
+        self._executor: Optional[ProcessPoolExecutor] = None
+        # Operaciones en curso (ejecutándose + en cola). Solo se modifica desde
+        # el event loop, por lo que no requiere sincronización adicional.
+        self._in_flight = 0
+
+    @property
+    def in_flight(self) -> int:
+        """
+        Operaciones en ejecución o en cola
+        """
+        return self._in_flight
+
+    @property
+    def queue_depth(self) -> int:
+        """
+        Operaciones esperando a que quede libre un proceso del pool
+        """
+        return max(0, self._in_flight - self.max_workers)
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        """
+        Crea el pool de procesos de forma perezosa
+        """
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                initializer=_init_worker
+            )
+        return self._executor
+
+    async def _submit(self, fn: Callable[..., Any], *args: Any) -> Any:
+        """
+        Envía una operación al pool aplicando el límite de la cola
+
+        Raises:
+            PasswordHasherOverloadedError: Si la cola está llena
+        """
+        if self._in_flight >= self.max_workers + self.max_queue_depth:
+            raise PasswordHasherOverloadedError(self.retry_after)
+
+        self._in_flight += 1
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._get_executor(), fn, *args)
+        finally:
+            self._in_flight -= 1
+
+    async def hash(self, password: str) -> str:
+        """
+        Hashea una contraseña usando Argon2 en el pool de procesos
+
+        Args:
+            password: Contraseña en texto plano
+
+        Returns:
+            Contraseña hasheada
+        """
+        return await self._submit(_hash_password, password)
+
+    async def hash_many(self, passwords: Sequence[str], chunk_size: int = 16) -> List[str]:
+        """
+        Hashea muchas contraseñas en paralelo usando todos los procesos del pool
+
+        Pensado para importaciones masivas: envía lotes de chunk_size contraseñas
+        (un solo viaje entre procesos por lote) y nunca ocupa más de max_workers
+        posiciones, dejando la cola libre para el tráfico interactivo. Si la
+        cola está llena espera retry_after segundos y reintenta en lugar de fallar.
+
+        Args:
+            passwords: Contraseñas en texto plano
+            chunk_size: Contraseñas por envío al pool
+
+        Returns:
+            Contraseñas hasheadas, en el mismo orden
+        """
+        semaphore = asyncio.Semaphore(self.max_workers)
+
+        async def hash_chunk(chunk: List[str]) -> List[str]:
+            async with semaphore:
+                while True:
+                    try:
+                        return await self._submit(_hash_passwords, chunk)
+                    except PasswordHasherOverloadedError:
+                        await asyncio.sleep(self.retry_after)
+
+        chunks = [list(passwords[i:i + chunk_size]) for i in range(0, len(passwords), chunk_size)]
+        results = await asyncio.gather(*(hash_chunk(chunk) for chunk in chunks))
+        return [hashed for chunk in results for hashed in chunk]
+
+    async def verify(self, plain_password: str, hashed_password: str) -> bool:
+        """
+        Verifica una contraseña contra su hash en el pool de procesos
+
+        Args:
+            plain_password: Contraseña en texto plano
+            hashed_password: Contraseña hasheada
+
+        Returns:
+            True si la contraseña es correcta
+        """
+        return await self._submit(_verify_password, plain_password, hashed_password)
+
+    def shutdown(self) -> None:
+        """
+        Cierra el pool de procesos
+        """
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
+
+
+# Instancia global del ejecutor (Singleton pattern)
+password_hasher = PasswordHasher(
+    max_workers=settings.password_hash_workers,
+    max_queue_depth=settings.password_hash_max_queue_depth,
+    retry_after=settings.password_hash_retry_after
+)
+
+metrics.gauge("password_hash_in_flight", "Operaciones de hashing en ejecución o en cola", lambda: password_hasher.in_flight)
+metrics.gauge("password_hash_queue_depth", "Operaciones de hashing esperando un proceso libre", lambda: password_hasher.queue_depth)
+
+
+def get_password_hasher() -> PasswordHasher:
+    """
+    Factory function para obtener el ejecutor de hashing compartido
+
+    Returns:
+        Instancia de PasswordHasher
+    """
+    return password_hasher
@@ -0,0 +1,132 @@
+"""
+Servicio de Refresh Tokens
+Principio: Single Responsibility - Solo emite, rota y revoca refresh tokens
+Principio: Dependency Inversion - Depende del repositorio, no de la sesión de BD
+
+Permite renovar el token de acceso sin repetir contraseña (Argon2) y TOTP.
+Cada refresh token se canjea una sola vez: /auth/refresh devuelve uno nuevo
+de la misma familia. Si un token ya canjeado vuelve a presentarse, lo tiene
+también un tercero, así que se revoca la familia (sesión) completa.
+"""
+import hashlib
+import secrets
+from datetime import datetime, timedelta
+from typing import Tuple
+from uuid import UUID
+
+from app.config import settings
+from app.models.ids import uuid7
+from app.models.user import User
+from app.repositories.refresh_token_repository import AsyncRefreshTokenRepository
+
+
+def hash_refresh_token(token: str) -> bytes:
+    """
+    Hash con el que se guarda y busca un refresh token
+
+    Args:
+        token: Refresh token en claro
+
+    Returns:
+        SHA-256 del token (32 bytes)
+    """
+    return hashlib.sha256(token.encode("utf-8")).digest()
+
+
+class RefreshTokenService:
+    """
+    Emisión y rotación de refresh tokens
+    """
+
+    def __init__(self, refresh_token_repository: AsyncRefreshTokenRepository, expire_days: int):
+        """
+        Constructor con inyección de dependencias
+
+        Args:
+            refresh_token_repository: Repositorio de refresh tokens
+            expire_days: Días de validez de cada token
+        """
+        self.refresh_token_repository = refresh_token_repository
+        self.expire_days = expire_days
+
+    def _new_token(self) -> Tuple[str, bytes, datetime]:
+        """
+        Genera un token aleatorio de 256 bits
+
+        Returns:
+            Tupla (token, hash, expiración)
+        """
+        token = secrets.token_urlsafe(32)
+        return token, hash_refresh_token(token), datetime.utcnow() + timedelta(days=self.expire_days)
+
+    async def issue(self, user_id: UUID) -> str:
+        """
+        Emite el primer refresh token de una sesión (familia nueva)
+
+        Args:
+            user_id: UUID del usuario que acaba de iniciar sesión
+
+        Returns:
+            Refresh token en claro (solo se devuelve una vez)
+        """
+        token, token_hash, expires_at = self._new_token()
+        await self.refresh_token_repository.create(user_id, uuid7(), token_hash, expires_at)
+        return token
+
+    async def rotate(self, token: str) -> Tuple[User, str]:
+        """
+        Canjea un refresh token por uno nuevo
+
+        Args:
+            token: Refresh token presentado
+
+        Returns:
+            Tupla (usuario, refresh token nuevo)
+
+        Raises:
+            ValueError: Si el token no es válido, o si ya se había canjeado
+                        (en ese caso se revoca toda su familia)
+        """
+        token_hash = hash_refresh_token(token)
+        new_token, new_token_hash, expires_at = self._new_token()
+
+        user = await self.refresh_token_repository.rotate(token_hash, new_token_hash, expires_at)
+        if user is not None:
+            return user, new_token
+
+        # Camino de error: distinguir reutilización de un token ya canjeado
+        stored = await self.refresh_token_repository.get_by_hash(token_hash)
+        if stored is not None and stored.rotated_at is not None and stored.revoked_at is None:
+            await self.refresh_token_repository.revoke_family(stored.family_id)
+            raise ValueError("Refresh token reutilizado. La sesión fue revocada; inicie sesión nuevamente")
+
+        raise ValueError("Refresh token inválido o expirado")
+
+    async def revoke(self, token: str, user_id: UUID) -> bool:
+        """
+        Revoca la sesión (familia) de un refresh token del usuario
+
+        Args:
+            token: Refresh token de la sesión
+            user_id: UUID del usuario autenticado (dueño del token)
+
+        Returns:
+            True si se revocó algún token
+        """
+        stored = await self.refresh_token_repository.get_by_hash(hash_refresh_token(token))
+        if stored is None or stored.user_id != user_id:
+            return False
+        return await self.refresh_token_repository.revoke_family(stored.family_id, user_id) > 0
+
+
+def get_refresh_token_service(refresh_token_repository: AsyncRefreshTokenRepository) -> RefreshTokenService:
+    """
+    Factory function para crear instancia de RefreshTokenService
+
+    Args:
+        refresh_token_repository: Repositorio de refresh tokens
+
+    Returns:
+        Instancia de RefreshTokenService
+    """
+    return RefreshTokenService(refresh_token_repository, settings.jwt_refresh_token_expire_days)
@@ -0,0 +1,107 @@
+"""
+Tabla hash en memoria compartida entre procesos
+Principio: Single Responsibility - Solo gestiona el archivo mmap, su bloqueo y el sondeo de ranuras
+
+Los workers de un mismo host abren el mismo archivo (ej. en /dev/shm) y lo
+mapean en memoria. Cada operación toma un flock exclusivo sobre el archivo
+durante unos microsegundos. Las ranuras tienen tamaño fijo (struct) y se
+direccionan por una clave de 16 bytes con sondeo lineal acotado; qué ranura
+está libre o caducada lo decide quien usa la tabla.
+"""
+import contextlib
+import mmap
+import os
+import struct
+from typing import Iterator, Optional
+
+
+class SharedMemoryTable:
+    """
+    Archivo mmap con cabecera (magic, número de ranuras) y ranuras de tamaño fijo
+    """
+
+    _HEADER = struct.Struct("<8sQ")
+    PROBES = 16
+
+    def __init__(self, path: str, magic: bytes, slot: struct.Struct, slots: int):
+        """
+        Constructor (el archivo se abre en el primer uso)
+
+        Args:
+            path: Ruta del archivo compartido
+            magic: Identificador de formato (8 bytes); si no coincide se reinicializa
+            slot: Formato de cada ranura; debe empezar por la clave de 16 bytes
+            slots: Número de ranuras de la tabla
+        """
+        self.path = path
+        self.magic = magic
+        self.slot = slot
+        self.slots = slots
+        self._fd: Optional[int] = None
+        self._map: Optional[mmap.mmap] = None
+
+    @contextlib.contextmanager
+    def locked(self) -> Iterator[mmap.mmap]:
+        """
+        Sección crítica entre procesos (abre el archivo la primera vez)
+
+        Yields:
+            Mapa de memoria del archivo
+        """
+        # fcntl solo existe en POSIX: se importa al usar la tabla
+        import fcntl
+
+        if self._map is None:
+            self._open(fcntl)
+        fcntl.flock(self._fd, fcntl.LOCK_EX)
+        try:
+            yield self._map
+        finally:
+            fcntl.flock(self._fd, fcntl.LOCK_UN)
+
+    def _open(self, fcntl) -> None:
+        """
+        Abre (o crea e inicializa) el archivo compartido
+        """
+        size = self._HEADER.size + self.slots * self.slot.size
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o600)
+        fcntl.flock(fd, fcntl.LOCK_EX)
+        try:
+            header = os.pread(fd, self._HEADER.size, 0)
+            if len(header) != self._HEADER.size or self._HEADER.unpack(header) != (self.magic, self.slots):
+                # Archivo nuevo o de otra configuración: reinicializar
+                os.ftruncate(fd, 0)
+                os.ftruncate(fd, size)
+                os.pwrite(fd, self._HEADER.pack(self.magic, self.slots), 0)
+        finally:
+            fcntl.flock(fd, fcntl.LOCK_UN)
+        self._fd = fd
+        self._map = mmap.mmap(fd, size)
+
+    def offset(self, index: int) -> int:
+        """
+        Posición en bytes de una ranura
+        """
+        return self._HEADER.size + index * self.slot.size
+
+    def probe(self, key: bytes) -> Iterator[int]:
+        """
+        Índices de la ventana de sondeo de una clave, en orden
+
+        Args:
+            key: Clave de 16 bytes (ej. UUID.bytes)
+        """
+        start = int.from_bytes(key[8:], "little") % self.slots
+        for probe in range(min(self.PROBES, self.slots)):
+            yield (start + probe) % self.slots
+
+    def close(self) -> None:
+        """
+        Desmapea y cierra el archivo
+        """
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
@@ -0,0 +1,200 @@
+"""
+Prevención de reutilización de códigos TOTP
+Principio: Single Responsibility - Solo recuerda el último contador TOTP aceptado por usuario
+Principio: Open/Closed - Nuevos almacenes se añaden implementando TOTPReplayCache
+
+Un código es válido durante toda la ventana de verificación (±window
+intervalos), así que sin estado podría reutilizarse durante ~90 segundos.
+Se guarda el último contador aceptado por usuario y solo se aceptan
+contadores mayores (RFC 6238 §5.2). Una entrada deja de importar cuando su
+contador sale de la ventana, así que la memoria es O(usuarios con login
+reciente) y no se escribe nada en la BD.
+
+Implementaciones:
+- InMemoryTOTPReplayCache: diccionario por worker.
+- SharedMemoryTOTPReplayCache: tabla mmap compartida por los workers del
+  host (necesaria con varios workers: si no, el código podría repetirse
+  contra otro worker).
+"""
+import struct
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from uuid import UUID
+
+from app.config import settings
+from app.metrics import metrics
+from app.services.shared_memory import SharedMemoryTable
+from app.services.totp_service import DEFAULT_WINDOW
+
+
+class TOTPReplayCache(ABC):
+    """
+    Último contador TOTP aceptado por usuario
+    """
+
+    def __init__(self, interval: int, window: int):
+        """
+        Constructor
+
+        Args:
+            interval: Segundos por contador TOTP
+            window: Ventana de verificación (± contadores aceptados)
+        """
+        self.interval = interval
+        self.window = window
+        self.rejected = 0
+
+    def _oldest_live_counter(self) -> int:
+        """
+        Contador más antiguo que aún puede verificarse; los anteriores caducaron
+        """
+        return int(time.time()) // self.interval - self.window
+
+    def claim(self, user_id: UUID, counter: int) -> bool:
+        """
+        Registra el uso de un contador si es posterior al último aceptado
+
+        Args:
+            user_id: UUID del usuario
+            counter: Contador TOTP del código ya verificado
+
+        Returns:
+            True si se acepta; False si el código (o uno posterior) ya se usó
+        """
+        if self._claim(user_id, counter):
+            return True
+        self.rejected += 1
+        return False
+
+    @abstractmethod
+    def _claim(self, user_id: UUID, counter: int) -> bool:
+        """
+        Comprueba y registra el contador de forma atómica
+        """
+
+    def close(self) -> None:
+        """
+        Libera los recursos del almacén
+        """
+
+
+class InMemoryTOTPReplayCache(TOTPReplayCache):
+    """
+    Último contador por usuario en memoria del worker
+
+    El diccionario se mantiene en orden de última aceptación, que sigue el
+    reloj: las entradas caducadas están al principio y se eliminan al
+    registrar nuevas (coste amortizado O(1)).
+    """
+
+    def __init__(self, interval: int, window: int):
+        super().__init__(interval, window)
+        self._last_counter: "OrderedDict[UUID, int]" = OrderedDict()
+
+    def _claim(self, user_id: UUID, counter: int) -> bool:
+        oldest_live = self._oldest_live_counter()
+        while self._last_counter:
+            first_user, first_counter = next(iter(self._last_counter.items()))
+            if first_counter >= oldest_live:
+                break
+            del self._last_counter[first_user]
+
+        last = self._last_counter.get(user_id)
+        if last is not None and counter <= last:
+            return False
+        self._last_counter[user_id] = counter
+        self._last_counter.move_to_end(user_id)
+        return True
+
+    def __len__(self) -> int:
+        return len(self._last_counter)
+
+
+class SharedMemoryTOTPReplayCache(TOTPReplayCache):
+    """
+    Último contador por usuario en una tabla compartida por los workers del host
+    (ver SharedMemoryTable)
+
+    Una ranura con un contador fuera de la ventana está libre. Si la ventana
+    de sondeo está llena de entradas vigentes se reutiliza la de contador más
+    antiguo (con el tamaño por defecto requiere miles de logins simultáneos
+    sobre las mismas 16 ranuras).
+    """
+
+    _MAGIC = b"SLTOTv1\0"
+    # UUID (16 bytes), último contador aceptado (uint64)
+    _SLOT = struct.Struct("<16sQ")
+
+    def __init__(self, interval: int, window: int, path: str, slots: int):
+        """
+        Constructor
+
+        Args:
+            interval: Segundos por contador TOTP
+            window: Ventana de verificación (± contadores aceptados)
+            path: Ruta del archivo compartido
+            slots: Número de ranuras de la tabla
+        """
+        super().__init__(interval, window)
+        self.table = SharedMemoryTable(path, self._MAGIC, self._SLOT, slots)
+
+    def _claim(self, user_id: UUID, counter: int) -> bool:
+        key = user_id.bytes
+        oldest_live = self._oldest_live_counter()
+
+        with self.table.locked() as table:
+            target = None
+            oldest = None
+            for index in self.table.probe(key):
+                slot_key, last = self._SLOT.unpack_from(table, self.table.offset(index))
+                if slot_key == key:
+                    if last >= oldest_live and counter <= last:
+                        return False
+                    target = index
+                    break
+                if target is None and last < oldest_live:
+                    target = index
+                if oldest is None or last < oldest[0]:
+                    oldest = (last, index)
+
+            if target is None:
+                target = oldest[1]
+            self._SLOT.pack_into(table, self.table.offset(target), key, counter)
+        return True
+
+    def close(self) -> None:
+        self.table.close()
+
+
+def create_totp_replay_cache() -> TOTPReplayCache:
+    """
+    Crea la caché configurada en settings.totp_replay_backend
+
+    Returns:
+        Instancia de TOTPReplayCache
+
+    Raises:
+        ValueError: Si el backend no existe
+    """
+    backend = settings.totp_replay_backend
+    if backend == "memory":
+        return InMemoryTOTPReplayCache(settings.totp_interval, DEFAULT_WINDOW)
+    if backend == "shared_memory":
+        return SharedMemoryTOTPReplayCache(
+            settings.totp_interval,
+            DEFAULT_WINDOW,
+            path=settings.totp_replay_shm_path,
+            slots=settings.totp_replay_shm_slots
+        )
+    raise ValueError(f"Backend anti-replay TOTP desconocido: {backend}")
+
+
+# Instancia global de la caché anti-replay TOTP (Singleton pattern)
+totp_replay_cache = create_totp_replay_cache()
+
+metrics.gauge(
+    "totp_replays_rejected",
+    "Códigos TOTP rechazados por haberse usado ya",
+    lambda: totp_replay_cache.rejected
+)
@@ -2,6 +2,14 @@
 Servicio TOTP (Time-based One-Time Password)
 Implementación manual compatible con RFC 6238 y Microsoft Authenticator
 Principio: Single Responsibility - Solo maneja generación y validación TOTP
+
+Cada secret se decodifica una sola vez: se guarda un HMAC-SHA1 ya inicializado
+con la clave (caché LRU acotada) y cada contador trabaja sobre una copia, que
+solo procesa el bloque del contador en lugar de recalcular el padding de la clave.
+
+La API por lotes (generate_many / verify_many) es para pruebas de carga,
+importaciones y auditorías: decodifica cada clave una vez por lote y hace la
+truncación dinámica y el módulo con NumPy sobre todos los HMAC a la vez.
 """
 import base64
 import hashlib
@@ -9,11 +17,27 @@ import hmac
 import secrets
 import struct
 import time
-from typing import Tuple
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Dict, List, Optional, Sequence, Tuple, Union
 from urllib.parse import quote
 
 from app.config import settings
 
+if TYPE_CHECKING:
+    import numpy as np
+
+
+# Contador HOTP (8 bytes big-endian) y ventana de 4 bytes de la truncación dinámica
+_COUNTER = struct.Struct('>Q')
+_TRUNCATED = struct.Struct('>I')
+
+# Tamaño de un HMAC-SHA1 y alfabeto base32 (RFC 4648)
+_DIGEST_SIZE = 20
+_B32_ALPHABET = b'ABCDEFGHIJKLMNOPQRSTUVWXYZ234567'
+
+# Ventana de verificación por defecto: contador actual, anterior y siguiente
+DEFAULT_WINDOW = 1
+
 
 class TOTPService:
     """
@@ -25,6 +49,11 @@ class TOTPService:
         self.digits = settings.totp_digits
         self.interval = settings.totp_interval
         self.issuer = settings.totp_issuer
+        self.key_cache_size = settings.totp_key_cache_size
+        # Módulo de los N dígitos (constante para todo el servicio)
+        self._modulus = 10 ** self.digits
+        # secret base32 -> HMAC-SHA1 inicializado con la clave decodificada
+        self._keyed_hmacs: "OrderedDict[str, hmac.HMAC]" = OrderedDict()
     
     def generate_secret(self) -> str:
         """
@@ -39,42 +68,67 @@ class TOTPService:
         secret = base64.b32encode(random_bytes).decode('utf-8')
         return secret
     
-    def _get_hotp_token(self, secret: str, counter: int) -> str:
+    def _get_keyed_hmac(self, secret: str) -> hmac.HMAC:
         """
-        Genera un código HOTP (HMAC-based One-Time Password)
-        Implementación según RFC 4226
+        Obtiene el HMAC-SHA1 inicializado con la clave del secret (caché LRU)
         
         Args:
             secret: Secret en formato base32
-            counter: Contador (para TOTP es timestamp / interval)
             
         Returns:
-            Código de 6 dígitos
+            HMAC sin datos; debe copiarse antes de usarlo
         """
-        # Decodificar secret de base32
+        keyed = self._keyed_hmacs.get(secret)
+        if keyed is not None:
+            self._keyed_hmacs.move_to_end(secret)
+            return keyed
+        
+        # Decodificar secret de base32 (una vez por secret)
         key = base64.b32decode(secret, casefold=True)
+        keyed = hmac.new(key, digestmod=hashlib.sha1)
         
-        # Convertir counter a bytes (8 bytes, big-endian)
-        counter_bytes = struct.pack('>Q', counter)
+        self._keyed_hmacs[secret] = keyed
+        while len(self._keyed_hmacs) > self.key_cache_size:
+            self._keyed_hmacs.popitem(last=False)
+        return keyed
+    
+    def _hotp(self, keyed: hmac.HMAC, counter: int) -> str:
+        """
+        Calcula un código HOTP a partir del HMAC ya inicializado
+        Implementación según RFC 4226
         
-        # Calcular HMAC-SHA1
-        hmac_hash = hmac.new(key, counter_bytes, hashlib.sha1).digest()
+        Args:
+            keyed: HMAC inicializado con la clave (ver _get_keyed_hmac)
+            counter: Contador (para TOTP es timestamp / interval)
+            
+        Returns:
+            Código de N dígitos
+        """
+        # Calcular HMAC-SHA1 del contador sobre una copia del estado con la clave
+        mac = keyed.copy()
+        mac.update(_COUNTER.pack(counter))
+        hmac_hash = mac.digest()
         
-        # Dynamic truncation (RFC 4226 Section 5.3)
+        # Dynamic truncation (RFC 4226 Section 5.3): 4 bytes, máscara de 31 bits
         offset = hmac_hash[-1] & 0x0F
-        truncated_hash = hmac_hash[offset:offset + 4]
-        
-        # Convertir a entero de 4 bytes
-        code = struct.unpack('>I', truncated_hash)[0]
+        code = _TRUNCATED.unpack_from(hmac_hash, offset)[0] & 0x7FFFFFFF
         
-        # Aplicar máscara para obtener 31 bits
-        code = code & 0x7FFFFFFF
-        
-        # Obtener últimos N dígitos
-        code = code % (10 ** self.digits)
+        # Obtener últimos N dígitos, con ceros a la izquierda
+        return str(code % self._modulus).zfill(self.digits)
+    
+    def _get_hotp_token(self, secret: str, counter: int) -> str:
+        """
+        Genera un código HOTP (HMAC-based One-Time Password)
+        Implementación según RFC 4226
         
-        # Formatear con ceros a la izquierda
-        return str(code).zfill(self.digits)
+        Args:
+            secret: Secret en formato base32
+            counter: Contador (para TOTP es timestamp / interval)
+            
+        Returns:
+            Código de N dígitos
+        """
+        return self._hotp(self._get_keyed_hmac(secret), counter)
     
     def generate_totp(self, secret: str, timestamp: int = None) -> str:
         """
@@ -95,7 +149,36 @@ class TOTPService:
         
         return self._get_hotp_token(secret, counter)
     
-    def verify_totp(self, secret: str, token: str, window: int = 1) -> bool:
+    def match_totp_counter(self, secret: str, token: str, window: int = DEFAULT_WINDOW) -> Optional[int]:
+        """
+        Busca el contador TOTP al que corresponde un código
+        
+        Args:
+            secret: Secret en formato base32
+            token: Código a verificar
+            window: Ventana de tiempo (permite códigos +/- window intervalos)
+            
+        Returns:
+            Contador que coincide (el mayor si hay varios) o None si el código no es válido
+        """
+        if not token or len(token) != self.digits:
+            return None
+        
+        current_counter = int(time.time()) // self.interval
+        keyed = self._get_keyed_hmac(secret)
+        token_bytes = token.encode('utf-8')
+        
+        # Recorrer toda la ventana sin salir antes: el tiempo no revela
+        # qué contador coincidió ni cuántos dígitos eran correctos
+        matched = None
+        for counter in range(current_counter - window, current_counter + window + 1):
+            expected = self._hotp(keyed, counter).encode('ascii')
+            if hmac.compare_digest(expected, token_bytes):
+                matched = counter
+        
+        return matched
+    
+    def verify_totp(self, secret: str, token: str, window: int = DEFAULT_WINDOW) -> bool:
         """
         Verifica un código TOTP
         
@@ -108,21 +191,166 @@ class TOTPService:
         Returns:
             True si el código es válido
         """
-        if not token or len(token) != self.digits:
-            return False
+        return self.match_totp_counter(secret, token, window) is not None
+    
+    def _decode_keys(self, secrets_: Sequence[str]) -> List[bytes]:
+        """
+        Decodifica un lote de secrets base32 con NumPy (agrupados por longitud)
+        
+        No usa la caché LRU del servicio: un lote grande la vaciaría. Los grupos
+        con padding o caracteres inválidos se decodifican con base64.b32decode,
+        que produce el mismo error que la API individual.
+        
+        Args:
+            secrets_: Secrets en formato base32
+            
+        Returns:
+            Clave de cada secret, en orden
+        """
+        import numpy as np
+        
+        values = np.full(256, 0xFF, dtype=np.uint8)
+        for value, char in enumerate(_B32_ALPHABET):
+            values[char] = value
+            values[char | 0x20] = value  # minúsculas (casefold)
+        
+        keys: List[Optional[bytes]] = [None] * len(secrets_)
+        by_length: Dict[int, List[int]] = {}
+        for index, secret in enumerate(secrets_):
+            by_length.setdefault(len(secret), []).append(index)
+        
+        for length, indexes in by_length.items():
+            group = [secrets_[index] for index in indexes]
+            decoded = None
+            if length and length % 8 == 0 and all(secret.isascii() for secret in group):
+                chars = values[np.frombuffer(''.join(group).encode('ascii'), dtype=np.uint8)]
+                if not (chars == 0xFF).any():
+                    # 8 caracteres de 5 bits = 40 bits = últimos 5 bytes de un uint64 big-endian
+                    quanta = chars.reshape(-1, 8).astype(np.uint64)
+                    packed = np.zeros(len(quanta), dtype=np.uint64)
+                    for column in range(8):
+                        packed = (packed << np.uint64(5)) | quanta[:, column]
+                    data = packed.astype('>u8').view(np.uint8).reshape(-1, 8)[:, 3:].tobytes()
+                    size = length * 5 // 8
+                    decoded = [data[i * size:(i + 1) * size] for i in range(len(group))]
+            if decoded is None:
+                decoded = [base64.b32decode(secret, casefold=True) for secret in group]
+            for index, key in zip(indexes, decoded):
+                keys[index] = key
+        
+        return keys
+    
+    def _truncate_many(self, digests: bytes) -> "np.ndarray":
+        """
+        Truncación dinámica (RFC 4226 Section 5.3) y módulo sobre un lote de HMAC
+        
+        Args:
+            digests: HMAC-SHA1 concatenados (20 bytes cada uno)
+            
+        Returns:
+            Array uint32 con el código numérico de cada HMAC
+        """
+        # NumPy solo se usa en la API por lotes: se importa al usarla
+        import numpy as np
         
-        current_timestamp = int(time.time())
-        current_counter = current_timestamp // self.interval
+        data = np.frombuffer(digests, dtype=np.uint8)
+        # Posición de los 4 bytes de cada HMAC: inicio del HMAC + offset del último nibble
+        start = np.arange(0, len(data), _DIGEST_SIZE)
+        position = start + (data[start + _DIGEST_SIZE - 1] & 0x0F)
         
-        # Verificar código actual y ventana de tiempo
-        for i in range(-window, window + 1):
-            counter = current_counter + i
-            expected_token = self._get_hotp_token(secret, counter)
+        code = (
+            (data[position].astype(np.uint32) & 0x7F) << 24
+            | data[position + 1].astype(np.uint32) << 16
+            | data[position + 2].astype(np.uint32) << 8
+            | data[position + 3].astype(np.uint32)
+        )
+        return code % np.uint32(self._modulus)
+    
+    def generate_many(
+        self,
+        secrets_: Sequence[str],
+        timestamps: Union[None, int, Sequence[int]] = None
+    ) -> List[str]:
+        """
+        Genera códigos TOTP para muchos secrets a la vez
+        
+        Args:
+            secrets_: Secrets en formato base32
+            timestamps: Timestamp Unix de cada secret, uno común a todos,
+                        o None para usar el actual
+            
+        Returns:
+            Código de cada secret, en orden
+        """
+        if timestamps is None:
+            timestamps = int(time.time())
+        if isinstance(timestamps, int):
+            counters = [timestamps // self.interval] * len(secrets_)
+        else:
+            if len(timestamps) != len(secrets_):
+                raise ValueError("secrets y timestamps deben tener la misma longitud")
+            counters = [timestamp // self.interval for timestamp in timestamps]
+        
+        if not secrets_:
+            return []
+        
+        keys = self._decode_keys(secrets_)
+        digests = b''.join([
+            hmac.digest(key, _COUNTER.pack(counter), 'sha1')
+            for key, counter in zip(keys, counters)
+        ])
+        codes = self._truncate_many(digests)
+        return [str(code).zfill(self.digits) for code in codes.tolist()]
+    
+    def verify_many(
+        self,
+        pairs: Sequence[Tuple[str, str]],
+        window: int = DEFAULT_WINDOW,
+        timestamp: Optional[int] = None
+    ) -> List[bool]:
+        """
+        Verifica muchos pares (secret, código) a la vez
+        
+        A diferencia de verify_totp no es de tiempo constante por par: es para
+        auditorías y pruebas de carga, no para el login.
+        
+        Args:
+            pairs: Tuplas (secret base32, código)
+            window: Ventana de tiempo (permite códigos +/- window intervalos)
+            timestamp: Timestamp Unix de referencia (None para usar actual)
             
-            if token == expected_token:
-                return True
+        Returns:
+            Validez de cada par, en orden
+        """
+        import numpy as np
+        
+        if not pairs:
+            return []
+        
+        current_counter = (int(time.time()) if timestamp is None else timestamp) // self.interval
+        counter_bytes = [
+            _COUNTER.pack(current_counter + offset)
+            for offset in range(-window, window + 1)
+        ]
         
-        return False
+        # Todos los contadores de la ventana de cada par, en filas consecutivas
+        keys = self._decode_keys([secret for secret, _ in pairs])
+        digests = b''.join([
+            hmac.digest(key, message, 'sha1')
+            for key in keys
+            for message in counter_bytes
+        ])
+        codes = self._truncate_many(digests).reshape(len(pairs), len(counter_bytes))
+        
+        # Códigos con formato incorrecto: -1 nunca coincide
+        tokens = np.array(
+            [
+                int(token) if len(token) == self.digits and token.isascii() and token.isdigit() else -1
+                for _, token in pairs
+            ],
+            dtype=np.int64
+        )
+        return (codes == tokens[:, None]).any(axis=1).tolist()
     
     def get_provisioning_uri(self, email: str, secret: str) -> str:
         """
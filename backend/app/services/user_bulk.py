@@ -0,0 +1,177 @@
+"""
+Servicio de Acciones Masivas sobre Usuarios
+Principio: Single Responsibility - Solo ejecuta mutaciones administrativas por lotes
+Principio: Dependency Inversion - Depende de la abstracción del repositorio
+
+Cada bloque de usuarios se modifica con una única sentencia UPDATE/DELETE
+y se confirma por separado: las transacciones son cortas (no bloquean miles
+de filas a la vez) y el progreso se puede informar tras cada bloque.
+"""
+import json
+from typing import AsyncIterator, Iterator, List, Literal, Optional
+from uuid import UUID
+
+from app.database import AsyncSessionLocal
+from app.repositories.user_repository import AsyncUserRepository, get_async_user_repository
+from app.schemas.auth import UserBulkProgress, UserBulkRequest, UserBulkSummary
+
+
+BulkAction = Literal["unlock", "reset-2fa", "delete", "update"]
+
+# Columnas que escribe cada acción (update las toma de la petición)
+_ACTION_VALUES = {
+    "unlock": {"failed_login_attempts": 0, "locked_until": None},
+    "reset-2fa": {"totp_secret": None, "totp_verified": False},
+}
+
+
+class UserBulkService:
+    """
+    Ejecutor de acciones masivas por bloques de ids
+    """
+
+    def __init__(self, user_repository: AsyncUserRepository, chunk_size: int):
+        """
+        Constructor con inyección de dependencias
+
+        Args:
+            user_repository: Repositorio de usuarios
+            chunk_size: Usuarios por sentencia
+        """
+        self.user_repository = user_repository
+        self.chunk_size = chunk_size
+
+    @staticmethod
+    def action_values(action: BulkAction, request: UserBulkRequest) -> Optional[dict]:
+        """
+        Obtiene las columnas a escribir por la acción
+
+        Args:
+            action: Acción masiva
+            request: Petición
+
+        Returns:
+            Columnas a actualizar (None para delete)
+
+        Raises:
+            ValueError: Si la acción update no indica ningún campo
+        """
+        if action == "delete":
+            return None
+        if action == "update":
+            values = request.values.model_dump(exclude_none=True) if request.values else {}
+            if not values:
+                raise ValueError("La acción update requiere al menos un campo en values (name o phone_number)")
+            return values
+        return dict(_ACTION_VALUES[action])
+
+    def _id_chunks(self, user_ids: List[UUID]) -> Iterator[List[UUID]]:
+        """
+        Divide una lista de ids en bloques
+        """
+        for i in range(0, len(user_ids), self.chunk_size):
+            yield user_ids[i:i + self.chunk_size]
+
+    async def _filter_chunks(self, request: UserBulkRequest, exclude_id: Optional[UUID]) -> AsyncIterator[List[UUID]]:
+        """
+        Recorre por keyset (orden por id) los usuarios que cumplen el filtro
+        """
+        after = None
+        while True:
+            user_ids = await self.user_repository.list_ids(
+                self.chunk_size,
+                after=after,
+                role=request.filter.role,
+                totp_verified=request.filter.totp_verified,
+                locked=request.filter.locked,
+                exclude_id=exclude_id
+            )
+            if not user_ids:
+                return
+            after = user_ids[-1]
+            yield user_ids
+
+    async def run(
+        self,
+        action: BulkAction,
+        values: Optional[dict],
+        request: UserBulkRequest,
+        admin_id: UUID,
+        summary: UserBulkSummary
+    ) -> AsyncIterator[UserBulkProgress]:
+        """
+        Ejecuta la acción bloque a bloque
+
+        La acción delete nunca incluye al administrador que la ejecuta.
+
+        Args:
+            action: Acción masiva
+            values: Columnas a escribir (ver action_values)
+            request: Petición con ids o filtro
+            admin_id: UUID del administrador que ejecuta la acción
+            summary: Resumen que se actualiza con cada bloque
+
+        Yields:
+            Progreso tras cada bloque
+        """
+        exclude_id = admin_id if action == "delete" else None
+
+        if request.ids is not None:
+            user_ids = sorted(set(request.ids))
+            if exclude_id is not None and exclude_id in user_ids:
+                user_ids.remove(exclude_id)
+                summary.skipped_self = True
+
+            async def id_chunks() -> AsyncIterator[List[UUID]]:
+                for chunk in self._id_chunks(user_ids):
+                    yield chunk
+
+            chunks = id_chunks()
+        else:
+            chunks = self._filter_chunks(request, exclude_id)
+
+        chunk_number = 0
+        async for chunk in chunks:
+            if values is None:
+                affected = await self.user_repository.bulk_delete(chunk)
+            else:
+                affected = await self.user_repository.bulk_update(chunk, values)
+
+            chunk_number += 1
+            summary.affected += len(affected)
+            yield UserBulkProgress(chunk=chunk_number, affected=len(affected), total_affected=summary.affected)
+
+
+async def stream_user_bulk_action(
+    action: BulkAction,
+    values: Optional[dict],
+    request: UserBulkRequest,
+    admin_id: UUID,
+    chunk_size: int
+) -> AsyncIterator[bytes]:
+    """
+    Ejecuta una acción masiva y genera su progreso como NDJSON
+
+    Una línea por bloque procesado y {"summary": {...}} al final. Abre su
+    propia sesión: el generador se consume después de que el endpoint retorna.
+
+    Args:
+        action: Acción masiva
+        values: Columnas a escribir (ver UserBulkService.action_values)
+        request: Petición con ids o filtro
+        admin_id: UUID del administrador que ejecuta la acción
+        chunk_size: Usuarios por sentencia
+
+    Yields:
+        Líneas NDJSON de progreso
+    """
+    summary = UserBulkSummary(action=action)
+
+    async with AsyncSessionLocal() as db:
+        db.info["timeout_class"] = "admin"
+        service = UserBulkService(get_async_user_repository(db), chunk_size)
+
+        async for progress in service.run(action, values, request, admin_id, summary):
+            yield (progress.model_dump_json() + "\n").encode("utf-8")
+
+    yield (json.dumps({"summary": summary.model_dump()}) + "\n").encode("utf-8")
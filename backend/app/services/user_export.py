@@ -0,0 +1,136 @@
+"""
+Servicio de Exportación de Usuarios
+Principio: Single Responsibility - Solo serializa usuarios para exportación en streaming
+
+Las filas se leen con un cursor de servidor en lotes de tamaño fijo y cada
+lote se serializa (y opcionalmente comprime) antes de pedir el siguiente,
+por lo que la memoria del worker no depende del número de usuarios.
+"""
+import csv
+import io
+import json
+import zlib
+from typing import AsyncIterator, Iterable, Literal, Optional
+
+from sqlalchemy.engine import Row
+
+from app.database import AsyncSessionLocal
+from app.repositories.user_repository import get_async_user_repository
+
+
+ExportFormat = Literal["ndjson", "csv"]
+
+# Columnas exportadas (mismos campos que UserResponse, sin secretos)
+EXPORT_FIELDS = ("id", "email", "name", "phone_number", "role", "totp_verified", "created_at")
+
+MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv; charset=utf-8",
+}
+
+
+def _row_values(row: Row) -> dict:
+    """
+    Convierte una fila en valores serializables
+    """
+    return {
+        "id": str(row.id),
+        "email": row.email,
+        "name": row.name,
+        "phone_number": row.phone_number,
+        "role": row.role,
+        "totp_verified": row.totp_verified,
+        "created_at": row.created_at.isoformat() if row.created_at else None,
+    }
+
+
+def _serialize_ndjson(rows: Iterable[Row]) -> str:
+    """
+    Serializa un lote como JSON delimitado por saltos de línea
+    """
+    return "".join(json.dumps(_row_values(row), ensure_ascii=False) + "\n" for row in rows)
+
+
+def _serialize_csv(rows: Iterable[Row], header: bool) -> str:
+    """
+    Serializa un lote como CSV (con cabecera solo en el primer lote)
+    """
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=EXPORT_FIELDS, lineterminator="\n")
+    if header:
+        writer.writeheader()
+    writer.writerows(_row_values(row) for row in rows)
+    return buffer.getvalue()
+
+
+def export_filename(export_format: ExportFormat, compress: bool) -> str:
+    """
+    Nombre de archivo sugerido para la descarga
+
+    Args:
+        export_format: Formato de exportación
+        compress: Si la salida va comprimida con gzip
+
+    Returns:
+        Nombre de archivo
+    """
+    return f"users.{export_format}" + (".gz" if compress else "")
+
+
+async def stream_user_export(
+    export_format: ExportFormat,
+    compress: bool,
+    batch_size: int,
+    role: Optional[str] = None,
+    totp_verified: Optional[bool] = None,
+    locked: Optional[bool] = None
+) -> AsyncIterator[bytes]:
+    """
+    Genera la exportación de usuarios por fragmentos
+
+    Abre su propia sesión: el generador se consume después de que el endpoint
+    retorna, cuando la sesión de la petición ya no está disponible.
+
+    Args:
+        export_format: "ndjson" o "csv"
+        compress: Comprimir la salida con gzip
+        batch_size: Filas por lote del cursor de servidor
+        role: Filtrar por rol
+        totp_verified: Filtrar por 2FA verificado
+        locked: Filtrar por cuentas bloqueadas actualmente
+
+    Yields:
+        Fragmentos de la exportación (un fragmento por lote)
+    """
+    # wbits=31: formato gzip (cabecera + CRC32) en lugar de zlib
+    compressor = zlib.compressobj(wbits=31) if compress else None
+    header = True
+
+    async with AsyncSessionLocal() as db:
+        db.info["timeout_class"] = "admin"
+        user_repository = get_async_user_repository(db)
+
+        async for rows in user_repository.stream_users(
+            batch_size,
+            role=role,
+            totp_verified=totp_verified,
+            locked=locked
+        ):
+            if export_format == "csv":
+                chunk = _serialize_csv(rows, header).encode("utf-8")
+                header = False
+            else:
+                chunk = _serialize_ndjson(rows).encode("utf-8")
+
+            if compressor is not None:
+                chunk = compressor.compress(chunk)
+            if chunk:
+                yield chunk
+
+    if export_format == "csv" and header:
+        # Sin filas: el CSV conserva la cabecera
+        chunk = _serialize_csv((), True).encode("utf-8")
+        yield compressor.compress(chunk) if compressor is not None else chunk
+
+    if compressor is not None:
+        yield compressor.flush()
@@ -0,0 +1,247 @@
+"""
+Servicio de Importación Masiva de Usuarios
+Principio: Single Responsibility - Solo importa usuarios en lote
+Principio: Dependency Inversion - Depende de abstracciones (repositorio, ejecutor de hashing)
+
+Cada lote de filas se procesa con un número constante de viajes a la BD
+(una consulta de emails existentes y un INSERT multi-fila), y las
+contraseñas del lote se hashean en paralelo en todos los procesos del pool.
+"""
+import csv
+import io
+import json
+from typing import IO, AsyncIterator, Iterable, Iterator, List, Literal, Optional, Set, Tuple
+
+from pydantic import ValidationError
+
+from app.database import AsyncSessionLocal
+from app.repositories.user_repository import AsyncUserRepository, get_async_user_repository
+from app.schemas.auth import UserImportResult, UserImportRow, UserImportSummary
+from app.services.password_hasher import PasswordHasher, password_hasher
+
+
+ImportFormat = Literal["ndjson", "csv"]
+
+# (número de fila, registro o None, error de parseo o None)
+ImportRecord = Tuple[int, Optional[dict], Optional[str]]
+
+
+def iter_import_records(source: IO[bytes], import_format: ImportFormat) -> Iterator[ImportRecord]:
+    """
+    Lee los registros de un archivo de importación sin cargarlo completo en memoria
+
+    Args:
+        source: Archivo binario (NDJSON o CSV con cabecera, UTF-8)
+        import_format: "ndjson" o "csv"
+
+    Yields:
+        Tuplas (fila, registro, error)
+    """
+    text = io.TextIOWrapper(source, encoding="utf-8-sig", newline="")
+
+    if import_format == "csv":
+        reader = csv.DictReader(text)
+        for row, record in enumerate(reader, start=1):
+            if None in record:
+                yield row, None, "La fila tiene más columnas que la cabecera"
+                continue
+            # Celdas vacías = campo ausente (aplica valores por defecto)
+            yield row, {key: value for key, value in record.items() if value not in ("", None)}, None
+        return
+
+    row = 0
+    for line in text:
+        if not line.strip():
+            continue
+        row += 1
+        try:
+            record = json.loads(line)
+        except ValueError:
+            yield row, None, "JSON inválido"
+            continue
+        if not isinstance(record, dict):
+            yield row, None, "Cada línea debe ser un objeto JSON"
+            continue
+        yield row, record, None
+
+
+def _batches(records: Iterable[ImportRecord], batch_size: int) -> Iterator[List[ImportRecord]]:
+    """
+    Agrupa los registros en lotes de batch_size
+    """
+    batch: List[ImportRecord] = []
+    for record in records:
+        batch.append(record)
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def _validation_detail(error: ValidationError) -> str:
+    """
+    Resume el primer error de validación de una fila
+    """
+    first = error.errors()[0]
+    field = ".".join(str(part) for part in first["loc"])
+    return f"{field}: {first['msg']}" if field else first["msg"]
+
+
+class UserImportService:
+    """
+    Importación masiva de usuarios por lotes
+    """
+
+    def __init__(
+        self,
+        user_repository: AsyncUserRepository,
+        password_hasher: PasswordHasher,
+        batch_size: int
+    ):
+        """
+        Constructor con inyección de dependencias
+
+        Args:
+            user_repository: Repositorio de usuarios
+            password_hasher: Ejecutor de hashing de contraseñas
+            batch_size: Filas por lote (una consulta y un INSERT por lote)
+        """
+        self.user_repository = user_repository
+        self.password_hasher = password_hasher
+        self.batch_size = batch_size
+
+    async def import_batch(self, batch: List[ImportRecord], seen: Set[str]) -> List[UserImportResult]:
+        """
+        Importa un lote de registros
+
+        Args:
+            batch: Registros del lote
+            seen: Emails ya procesados en esta importación (se actualiza)
+
+        Returns:
+            Resultado de cada fila del lote, en orden
+        """
+        results: List[UserImportResult] = []
+        valid: List[Tuple[int, UserImportRow]] = []
+
+        for row, record, error in batch:
+            if error is not None:
+                results.append(UserImportResult(row=row, status="invalid", detail=error))
+                continue
+            try:
+                parsed = UserImportRow.model_validate(record)
+            except ValidationError as e:
+                email = record.get("email") if isinstance(record.get("email"), str) else None
+                results.append(UserImportResult(row=row, email=email, status="invalid", detail=_validation_detail(e)))
+                continue
+            if parsed.email in seen:
+                results.append(UserImportResult(row=row, email=parsed.email, status="duplicate", detail="Email repetido en el archivo"))
+                continue
+            seen.add(parsed.email)
+            valid.append((row, parsed))
+
+        # Deduplicación contra la BD: una sola consulta por lote
+        existing = await self.user_repository.get_existing_emails([parsed.email for _, parsed in valid])
+        pending = []
+        for row, parsed in valid:
+            if parsed.email in existing:
+                results.append(UserImportResult(row=row, email=parsed.email, status="duplicate", detail="Email ya registrado"))
+            else:
+                pending.append((row, parsed))
+
+        # Hashing en paralelo solo de las contraseñas en texto plano
+        hashed = iter(await self.password_hasher.hash_many(
+            [parsed.password for _, parsed in pending if parsed.hashed_password is None]
+        ))
+        values = [
+            {
+                "email": parsed.email,
+                "hashed_password": parsed.hashed_password or next(hashed),
+                "name": parsed.name,
+                "phone_number": parsed.phone_number,
+                "role": parsed.role,
+            }
+            for _, parsed in pending
+        ]
+
+        created = await self.user_repository.bulk_create(values)
+        for row, parsed in pending:
+            user_id = created.get(parsed.email)
+            if user_id is not None:
+                results.append(UserImportResult(row=row, email=parsed.email, status="created", id=user_id))
+            else:
+                # Registrado concurrentemente entre la consulta y el INSERT
+                results.append(UserImportResult(row=row, email=parsed.email, status="duplicate", detail="Email ya registrado"))
+
+        results.sort(key=lambda result: result.row)
+        return results
+
+    async def import_records(
+        self,
+        records: Iterable[ImportRecord],
+        summary: UserImportSummary
+    ) -> AsyncIterator[List[UserImportResult]]:
+        """
+        Importa todos los registros, lote a lote
+
+        Args:
+            records: Registros a importar (ver iter_import_records)
+            summary: Resumen que se actualiza con cada lote
+
+        Yields:
+            Resultados de cada lote
+        """
+        seen: Set[str] = set()
+        for batch in _batches(records, self.batch_size):
+            results = await self.import_batch(batch, seen)
+            for result in results:
+                setattr(summary, result.status, getattr(summary, result.status) + 1)
+            yield results
+
+
+def get_user_import_service(user_repository: AsyncUserRepository, batch_size: int) -> UserImportService:
+    """
+    Factory function para crear instancia de UserImportService
+
+    Args:
+        user_repository: Repositorio de usuarios
+        batch_size: Filas por lote
+
+    Returns:
+        Instancia de UserImportService
+    """
+    return UserImportService(user_repository, password_hasher, batch_size)
+
+
+async def stream_user_import(
+    source: IO[bytes],
+    import_format: ImportFormat,
+    batch_size: int
+) -> AsyncIterator[bytes]:
+    """
+    Ejecuta una importación y genera sus resultados como NDJSON
+
+    Cada línea es el resultado de una fila; la última línea es {"summary": {...}}.
+    Abre su propia sesión: el generador se consume después de que el endpoint retorna.
+
+    Args:
+        source: Archivo binario con los registros (se cierra al terminar)
+        import_format: "ndjson" o "csv"
+        batch_size: Filas por lote
+
+    Yields:
+        Resultados de cada lote serializados
+    """
+    summary = UserImportSummary()
+    try:
+        async with AsyncSessionLocal() as db:
+            db.info["timeout_class"] = "admin"
+            service = get_user_import_service(get_async_user_repository(db), batch_size)
+
+            async for results in service.import_records(iter_import_records(source, import_format), summary):
+                yield "".join(result.model_dump_json() + "\n" for result in results).encode("utf-8")
+    finally:
+        source.close()
+
+    yield (json.dumps({"summary": summary.model_dump()}) + "\n").encode("utf-8")
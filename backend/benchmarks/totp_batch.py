@@ -0,0 +1,74 @@
+"""
+Benchmark: API TOTP por lotes frente a llamadas individuales
+Principio: Single Responsibility - Solo mide generate_many / verify_many
+
+Compara generate_totp y verify_totp llamados en un bucle (con la caché de
+claves fría, como en una importación o auditoría de secrets distintos) con
+generate_many y verify_many sobre el mismo lote, y comprueba que los
+resultados coinciden.
+
+No necesita base de datos. Uso (desde backend/):
+    python -m benchmarks.totp_batch --secrets 100000
+"""
+import argparse
+import time
+
+from app.services.totp_service import TOTPService
+
+
+def _timed(function, *args):
+    """
+    Ejecuta una función y devuelve (resultado, segundos)
+    """
+    started = time.perf_counter()
+    result = function(*args)
+    return result, time.perf_counter() - started
+
+
+def main() -> None:
+    """
+    Punto de entrada del benchmark
+    """
+    parser = argparse.ArgumentParser(description="Benchmark de la API TOTP por lotes")
+    parser.add_argument("--secrets", type=int, default=100_000, help="Secrets del lote")
+    args = parser.parse_args()
+
+    service = TOTPService()
+    secrets_ = [service.generate_secret() for _ in range(args.secrets)]
+    timestamp = int(time.time())
+
+    def generate_loop():
+        service._keyed_hmacs.clear()
+        return [service.generate_totp(secret, timestamp) for secret in secrets_]
+
+    looped_codes, loop_generate = _timed(generate_loop)
+    batch_codes, batch_generate = _timed(service.generate_many, secrets_, timestamp)
+    assert batch_codes == looped_codes, "generate_many no coincide con generate_totp"
+
+    # Mitad de códigos correctos y mitad incorrectos
+    pairs = [
+        (secret, code if i % 2 == 0 else str((int(code) + 1) % 10 ** service.digits).zfill(service.digits))
+        for i, (secret, code) in enumerate(zip(secrets_, looped_codes))
+    ]
+
+    def verify_loop():
+        service._keyed_hmacs.clear()
+        return [service.verify_totp(secret, code) for secret, code in pairs]
+
+    looped_valid, loop_verify = _timed(verify_loop)
+    batch_valid, batch_verify = _timed(service.verify_many, pairs)
+    assert batch_valid == looped_valid, "verify_many no coincide con verify_totp"
+
+    print(f"{'operación':<10} {'bucle (s)':>10} {'lote (s)':>10} {'códigos/s (lote)':>18} {'aceleración':>12}")
+    for name, loop_seconds, batch_seconds in (
+        ("generar", loop_generate, batch_generate),
+        ("verificar", loop_verify, batch_verify),
+    ):
+        print(
+            f"{name:<10} {loop_seconds:>10.3f} {batch_seconds:>10.3f} "
+            f"{args.secrets / batch_seconds:>18.0f} {loop_seconds / batch_seconds:>11.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""
+Benchmark: verificación TOTP con y sin caché de claves
+Principio: Single Responsibility - Solo mide el coste de TOTPService.verify_totp
+
+Compara la implementación original (decodificar el secret base32 y crear un
+HMAC nuevo para cada contador de la ventana) con la actual (HMAC con la clave
+en caché, copiado por contador). Mide el caso habitual (secret ya en caché:
+el usuario repite login) y el peor caso (caché fría en cada verificación).
+
+No necesita base de datos. Uso (desde backend/):
+    python -m benchmarks.totp_verify --secrets 10000 --rounds 5
+"""
+import argparse
+import base64
+import hashlib
+import hmac
+import struct
+import time
+from typing import Callable, List
+
+from app.services.totp_service import TOTPService
+
+
+def _baseline_hotp(secret: str, counter: int, digits: int) -> str:
+    """
+    HOTP tal como se calculaba antes de la caché (referencia)
+    """
+    key = base64.b32decode(secret, casefold=True)
+    hmac_hash = hmac.new(key, struct.pack('>Q', counter), hashlib.sha1).digest()
+    offset = hmac_hash[-1] & 0x0F
+    code = struct.unpack('>I', hmac_hash[offset:offset + 4])[0] & 0x7FFFFFFF
+    return str(code % (10 ** digits)).zfill(digits)
+
+
+def baseline_verify(service: TOTPService, secret: str, token: str, window: int = 1) -> bool:
+    """
+    verify_totp original: un HOTP completo por contador y salida temprana
+    """
+    current_counter = int(time.time()) // service.interval
+    for counter in range(current_counter - window, current_counter + window + 1):
+        if token == _baseline_hotp(secret, counter, service.digits):
+            return True
+    return False
+
+
+def _measure(verify: Callable[[str, str], bool], secrets_: List[str], token: str, rounds: int) -> float:
+    """
+    Verificaciones por segundo sobre todos los secrets, rounds veces
+
+    Se usa un código incorrecto: recorre la ventana completa (peor caso del login).
+    """
+    started = time.perf_counter()
+    for _ in range(rounds):
+        for secret in secrets_:
+            verify(secret, token)
+    return len(secrets_) * rounds / (time.perf_counter() - started)
+
+
+def main() -> None:
+    """
+    Punto de entrada del benchmark
+    """
+    parser = argparse.ArgumentParser(description="Benchmark de verificación TOTP")
+    parser.add_argument("--secrets", type=int, default=10_000, help="Secrets distintos")
+    parser.add_argument("--rounds", type=int, default=5, help="Pasadas sobre todos los secrets")
+    args = parser.parse_args()
+
+    service = TOTPService()
+    secrets_ = [service.generate_secret() for _ in range(args.secrets)]
+    token = "0" * service.digits
+
+    def cold_verify(secret: str, code: str) -> bool:
+        service._keyed_hmacs.clear()
+        return service.verify_totp(secret, code)
+
+    results = {
+        "original": _measure(lambda secret, code: baseline_verify(service, secret, code), secrets_, token, args.rounds),
+        "caché fría": _measure(cold_verify, secrets_, token, args.rounds),
+        "caché caliente": _measure(service.verify_totp, secrets_, token, args.rounds),
+    }
+
+    baseline = results["original"]
+    print(f"{'variante':<16} {'verificaciones/s':>18} {'µs/verificación':>17} {'aceleración':>12}")
+    for name, per_second in results.items():
+        print(f"{name:<16} {per_second:>18.0f} {1e6 / per_second:>17.2f} {per_second / baseline:>11.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+"""
+Benchmark: claves primarias uuid4 vs UUIDv7
+Principio: Single Responsibility - Solo mide inserción y tamaño de índice por tipo de id
+
+Inserta el mismo volumen de filas en dos tablas idénticas (una con ids
+uuid4 y otra con UUIDv7) y compara el throughput de inserción, su
+degradación a medida que crece la tabla y el tamaño del índice de la clave
+primaria. Con uuid4 las inserciones caen en páginas aleatorias del B-tree
+(divisiones de página, fallos de caché); con UUIDv7 siempre al final.
+
+Uso (desde backend/, con DATABASE_URL apuntando a un PostgreSQL de pruebas):
+    python -m benchmarks.uuid_primary_keys --rows 2000000 --batch-size 10000
+"""
+import argparse
+import time
+import uuid
+from typing import Callable, Dict
+
+from sqlalchemy import Column, DateTime, MetaData, String, Table, func, text
+from sqlalchemy.dialects.postgresql import UUID
+
+from app.database import engine
+from app.models.ids import uuid7
+
+
+GENERATORS: Dict[str, Callable[[], uuid.UUID]] = {
+    "uuid4": uuid.uuid4,
+    "uuid7": uuid7,
+}
+
+
+def _bench_table(metadata: MetaData, name: str) -> Table:
+    """
+    Tabla de prueba con la misma forma de clave primaria que users
+    """
+    return Table(
+        f"bench_pk_{name}",
+        metadata,
+        Column("id", UUID(as_uuid=True), primary_key=True),
+        Column("email", String, nullable=False),
+        Column("created_at", DateTime, server_default=func.now()),
+    )
+
+
+def run(name: str, table: Table, rows: int, batch_size: int) -> dict:
+    """
+    Inserta rows filas en lotes y mide el resultado
+
+    Args:
+        name: Nombre del generador de ids
+        table: Tabla de prueba (vacía)
+        rows: Filas a insertar
+        batch_size: Filas por INSERT multi-fila (una transacción por lote)
+
+    Returns:
+        Métricas del generador
+    """
+    generate = GENERATORS[name]
+    batch_seconds = []
+
+    for start in range(0, rows, batch_size):
+        count = min(batch_size, rows - start)
+        values = [{"id": generate(), "email": f"user{start + i}@bench.local"} for i in range(count)]
+
+        started = time.perf_counter()
+        with engine.begin() as conn:
+            conn.execute(table.insert(), values)
+        batch_seconds.append((count, time.perf_counter() - started))
+
+    with engine.connect() as conn:
+        index_bytes = conn.execute(
+            text("SELECT pg_relation_size(:index)"),
+            {"index": f"{table.name}_pkey"}
+        ).scalar_one()
+        table_bytes = conn.execute(
+            text("SELECT pg_total_relation_size(:table)"),
+            {"table": table.name}
+        ).scalar_one()
+
+    total_rows = sum(count for count, _ in batch_seconds)
+    total_seconds = sum(seconds for _, seconds in batch_seconds)
+    # Último 10% de los lotes: throughput con la tabla ya grande
+    tail = batch_seconds[-max(1, len(batch_seconds) // 10):]
+
+    return {
+        "generator": name,
+        "rows_per_second": total_rows / total_seconds,
+        "tail_rows_per_second": sum(c for c, _ in tail) / sum(s for _, s in tail),
+        "pk_index_mb": index_bytes / 1024 / 1024,
+        "total_mb": table_bytes / 1024 / 1024,
+    }
+
+
+def main() -> None:
+    """
+    Punto de entrada del benchmark
+    """
+    parser = argparse.ArgumentParser(description="Benchmark de claves primarias uuid4 vs UUIDv7")
+    parser.add_argument("--rows", type=int, default=1_000_000, help="Filas por tabla")
+    parser.add_argument("--batch-size", type=int, default=10_000, help="Filas por INSERT")
+    parser.add_argument("--keep", action="store_true", help="No eliminar las tablas al terminar")
+    args = parser.parse_args()
+
+    metadata = MetaData()
+    tables = {name: _bench_table(metadata, name) for name in GENERATORS}
+    metadata.drop_all(engine)
+    metadata.create_all(engine)
+
+    try:
+        results = [run(name, table, args.rows, args.batch_size) for name, table in tables.items()]
+    finally:
+        if not args.keep:
+            metadata.drop_all(engine)
+
+    print(f"{'generador':<10} {'filas/s':>12} {'filas/s (último 10%)':>22} {'índice PK (MB)':>16} {'total (MB)':>12}")
+    for result in results:
+        print(
+            f"{result['generator']:<10} {result['rows_per_second']:>12.0f} "
+            f"{result['tail_rows_per_second']:>22.0f} {result['pk_index_mb']:>16.1f} {result['total_mb']:>12.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,201 @@
+"""
+Servidor RESP2 mínimo en proceso
+Principio: Single Responsibility - Solo sustituye a Redis en las pruebas del RedisAttemptTracker
+
+Implementa los comandos que usa RespConnection (AUTH, SELECT, MULTI/EXEC,
+INCR, EXPIRE, DEL) y algunos de inspección (GET, SET, TTL), con fallos
+inyectables: retardo de respuesta, EXEC nulo y desconexión de clientes.
+"""
+import asyncio
+import time
+from typing import Dict, List, Optional, Set, Tuple, Union
+
+
+class FakeError(Exception):
+    """
+    Respuesta de error (-ERR ...) a enviar al cliente
+    """
+
+
+Reply = Union[None, int, bytes, str, FakeError, List["Reply"]]
+
+# EXEC de una transacción abortada (array nulo)
+NULL_ARRAY = object()
+
+
+def encode_reply(reply) -> bytes:
+    """
+    Serializa una respuesta en RESP2
+    """
+    if reply is NULL_ARRAY:
+        return b"*-1\r\n"
+    if reply is None:
+        return b"$-1\r\n"
+    if isinstance(reply, FakeError):
+        return b"-%s\r\n" % str(reply).encode("utf-8")
+    if isinstance(reply, str):
+        return b"+%s\r\n" % reply.encode("utf-8")
+    if isinstance(reply, int):
+        return b":%d\r\n" % reply
+    if isinstance(reply, bytes):
+        return b"$%d\r\n%s\r\n" % (len(reply), reply)
+    return b"*%d\r\n" % len(reply) + b"".join(encode_reply(item) for item in reply)
+
+
+class FakeRespServer:
+    """
+    Servidor RESP en 127.0.0.1 (puerto libre) con almacén en memoria
+    """
+
+    def __init__(self, password: Optional[str] = None):
+        """
+        Constructor
+
+        Args:
+            password: Contraseña exigida con AUTH (None = sin autenticación)
+        """
+        self.password = password.encode("utf-8") if password else None
+        self.data: Dict[bytes, bytes] = {}
+        self.expires: Dict[bytes, float] = {}
+        # Comandos recibidos (todas las conexiones), en orden
+        self.commands: List[Tuple[bytes, ...]] = []
+        # Fallos inyectables
+        self.reply_delay = 0.0
+        self.abort_exec = False
+        self.connections = 0
+        self._writers: Set[asyncio.StreamWriter] = set()
+        self._server: Optional[asyncio.AbstractServer] = None
+
+    async def start(self) -> str:
+        """
+        Arranca el servidor
+
+        Returns:
+            URL redis:// del servidor
+        """
+        self._server = await asyncio.start_server(self._handle, "127.0.0.1", 0)
+        port = self._server.sockets[0].getsockname()[1]
+        return f"redis://127.0.0.1:{port}"
+
+    async def stop(self) -> None:
+        """
+        Cierra las conexiones y el servidor
+        """
+        self.drop_connections()
+        self._server.close()
+        await self._server.wait_closed()
+
+    def drop_connections(self) -> None:
+        """
+        Cierra todas las conexiones de clientes (simula un reinicio del servidor)
+        """
+        for writer in list(self._writers):
+            writer.transport.abort()
+        self._writers.clear()
+
+    async def _read_command(self, reader: asyncio.StreamReader) -> Tuple[bytes, ...]:
+        header = await reader.readuntil(b"\r\n")
+        count = int(header[1:-2])
+        args = []
+        for _ in range(count):
+            length = int((await reader.readuntil(b"\r\n"))[1:-2])
+            args.append((await reader.readexactly(length + 2))[:-2])
+        return tuple(args)
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        # Los comandos se ejecutan al llegar y las respuestas se envían aparte
+        # (con reply_delay): como en Redis, un pipeline ya recibido se ejecuta
+        # completo aunque el cliente no llegue a leer las respuestas
+        self.connections += 1
+        self._writers.add(writer)
+        replies: "asyncio.Queue[bytes]" = asyncio.Queue()
+        sender = asyncio.create_task(self._send(writer, replies))
+        state = {"authenticated": self.password is None, "queued": None}
+        try:
+            while True:
+                command = await self._read_command(reader)
+                self.commands.append(command)
+                replies.put_nowait(encode_reply(self._execute(state, command)))
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            self._writers.discard(writer)
+            sender.cancel()
+            writer.close()
+
+    async def _send(self, writer: asyncio.StreamWriter, replies: "asyncio.Queue[bytes]") -> None:
+        try:
+            while True:
+                reply = await replies.get()
+                if self.reply_delay:
+                    await asyncio.sleep(self.reply_delay)
+                writer.write(reply)
+                await writer.drain()
+        except ConnectionError:
+            pass
+
+    def _execute(self, state: dict, command: Tuple[bytes, ...]):
+        name = command[0].upper()
+        if name == b"AUTH":
+            if command[-1] != self.password:
+                return FakeError("WRONGPASS invalid username-password pair")
+            state["authenticated"] = True
+            return "OK"
+        if not state["authenticated"]:
+            return FakeError("NOAUTH Authentication required")
+
+        if name == b"MULTI":
+            state["queued"] = []
+            return "OK"
+        if name == b"EXEC":
+            queued, state["queued"] = state["queued"], None
+            if queued is None:
+                return FakeError("ERR EXEC without MULTI")
+            if self.abort_exec:
+                return NULL_ARRAY
+            return [self._apply(queued_command) for queued_command in queued]
+        if state["queued"] is not None:
+            state["queued"].append(command)
+            return "QUEUED"
+        return self._apply(command)
+
+    def _live(self, key: bytes) -> bool:
+        expires_at = self.expires.get(key)
+        if expires_at is not None and expires_at <= time.monotonic():
+            self.data.pop(key, None)
+            self.expires.pop(key, None)
+        return key in self.data
+
+    def _apply(self, command: Tuple[bytes, ...]) -> Reply:
+        name, args = command[0].upper(), command[1:]
+        if name == b"SELECT":
+            return "OK"
+        if name == b"GET":
+            return self.data[args[0]] if self._live(args[0]) else None
+        if name == b"SET":
+            self.data[args[0]] = args[1]
+            self.expires.pop(args[0], None)
+            return "OK"
+        if name == b"INCR":
+            current = self.data[args[0]] if self._live(args[0]) else b"0"
+            if not current.lstrip(b"-").isdigit():
+                return FakeError("ERR value is not an integer or out of range")
+            self.data[args[0]] = b"%d" % (int(current) + 1)
+            return int(current) + 1
+        if name == b"EXPIRE":
+            if not self._live(args[0]):
+                return 0
+            self.expires[args[0]] = time.monotonic() + int(args[1])
+            return 1
+        if name == b"TTL":
+            if not self._live(args[0]):
+                return -2
+            expires_at = self.expires.get(args[0])
+            return -1 if expires_at is None else round(expires_at - time.monotonic())
+        if name == b"DEL":
+            removed = sum(1 for key in args if self._live(key))
+            for key in args:
+                self.data.pop(key, None)
+                self.expires.pop(key, None)
+            return removed
+        return FakeError(f"ERR unknown command '{name.decode('utf-8', 'replace')}'")
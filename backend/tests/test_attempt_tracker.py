@@ -0,0 +1,284 @@
+"""
+Pruebas de los almacenes de intentos fallidos (RedisAttemptTracker y SharedMemoryAttemptTracker)
+
+Ejecutar desde backend/:
+    python -m unittest discover -s tests -t .
+"""
+import asyncio
+import os
+import tempfile
+import time
+import unittest
+import uuid
+from types import SimpleNamespace
+
+from app.services.attempt_tracker import (
+    RedisAttemptTracker,
+    RedisProtocolError,
+    RespConnection,
+    SharedMemoryAttemptTracker,
+)
+from tests.fake_resp_server import FakeRespServer
+
+
+class FakeUserRepository:
+    """
+    Registra las escrituras que el tracker delega en el repositorio
+    """
+
+    def __init__(self):
+        self.locked = []
+        self.reset = []
+
+    async def lock_account(self, user_id, minutes):
+        self.locked.append((user_id, minutes))
+
+    async def reset_failed_attempts(self, user_id):
+        self.reset.append(user_id)
+
+
+def login_user(user_id, failed_login_attempts=0, locked_until=None):
+    """
+    Fila de usuario tal como la lee el login
+    """
+    return SimpleNamespace(id=user_id, failed_login_attempts=failed_login_attempts, locked_until=locked_until)
+
+
+class RedisAttemptTrackerTest(unittest.IsolatedAsyncioTestCase):
+    """
+    RedisAttemptTracker contra un servidor RESP en proceso
+    """
+
+    async def asyncSetUp(self):
+        self.server = FakeRespServer()
+        self.url = await self.server.start()
+        self.tracker = RedisAttemptTracker(max_attempts=3, lock_minutes=15, url=self.url)
+        self.user_id = uuid.uuid4()
+        self.key = f"login_failures:{self.user_id}".encode("utf-8")
+
+    async def asyncTearDown(self):
+        await self.tracker.close()
+        await self.server.stop()
+
+    async def test_increment_is_one_multi_exec_transaction(self):
+        self.assertEqual(await self.tracker._increment(self.user_id, 900), 1)
+        self.assertEqual(await self.tracker._increment(self.user_id, 900), 2)
+
+        self.assertEqual(
+            [command[0] for command in self.server.commands[:4]],
+            [b"MULTI", b"INCR", b"EXPIRE", b"EXEC"]
+        )
+        self.assertEqual(self.server.commands[2], (b"EXPIRE", self.key, b"900"))
+        self.assertEqual(await self.tracker.connection.pipeline(("TTL", self.key)), [900])
+        self.assertEqual(self.server.connections, 1)
+
+    async def test_failures_lock_account_at_threshold(self):
+        repository = FakeUserRepository()
+
+        self.assertFalse(await self.tracker.register_failure(repository, self.user_id))
+        self.assertFalse(await self.tracker.register_failure(repository, self.user_id))
+        self.assertEqual(repository.locked, [])
+
+        self.assertTrue(await self.tracker.register_failure(repository, self.user_id))
+        self.assertEqual(repository.locked, [(self.user_id, 15)])
+        # El contador se elimina al bloquear: el siguiente ciclo empieza de cero
+        self.assertNotIn(self.key, self.server.data)
+
+    async def test_success_clears_counter(self):
+        repository = FakeUserRepository()
+        await self.tracker.register_failure(repository, self.user_id)
+
+        await self.tracker.register_success(repository, login_user(self.user_id))
+
+        self.assertNotIn(self.key, self.server.data)
+        self.assertEqual(repository.reset, [])
+
+    async def test_success_resets_state_left_in_database(self):
+        repository = FakeUserRepository()
+
+        await self.tracker.register_success(repository, login_user(self.user_id, failed_login_attempts=2))
+
+        self.assertEqual(repository.reset, [self.user_id])
+
+    async def test_error_reply_does_not_desynchronize_pipeline(self):
+        connection = self.tracker.connection
+
+        with self.assertRaises(RedisProtocolError):
+            await connection.pipeline(("BOGUS",), ("INCR", "k"), ("INCR", "k"))
+
+        # Las respuestas que seguían al error se leyeron: nada queda pendiente
+        self.assertEqual(await connection.pipeline(("GET", "k")), [b"2"])
+        self.assertEqual(await connection.pipeline(("DEL", "k")), [1])
+        self.assertEqual(self.server.connections, 1)
+
+    async def test_error_inside_exec_is_raised_and_connection_stays_usable(self):
+        await self.tracker.connection.pipeline(("SET", self.key, "not-a-number"))
+
+        with self.assertRaises(RedisProtocolError):
+            await self.tracker._increment(self.user_id, 900)
+
+        await self.tracker._clear(self.user_id)
+        self.assertEqual(await self.tracker._increment(self.user_id, 900), 1)
+
+    async def test_aborted_exec_raises_protocol_error(self):
+        self.server.abort_exec = True
+
+        with self.assertRaises(RedisProtocolError):
+            await self.tracker._increment(self.user_id, 900)
+
+        self.server.abort_exec = False
+        self.assertEqual(await self.tracker._increment(self.user_id, 900), 1)
+
+    async def test_timeout_discards_connection_and_late_reply(self):
+        self.tracker.connection.timeout = 0.05
+        await self.tracker._increment(self.user_id, 900)
+
+        self.server.reply_delay = 0.2
+        with self.assertRaises(asyncio.TimeoutError):
+            await self.tracker._increment(self.user_id, 900)
+
+        # La respuesta tardía llega a la conexión descartada, no a la siguiente petición
+        self.server.reply_delay = 0
+        await asyncio.sleep(0.3)
+        self.assertEqual(await self.tracker.connection.pipeline(("GET", self.key)), [b"2"])
+        self.assertEqual(self.server.connections, 2)
+
+    async def test_reconnects_after_server_drops_connection(self):
+        await self.tracker._increment(self.user_id, 900)
+
+        self.server.drop_connections()
+        await asyncio.sleep(0)
+        with self.assertRaises((OSError, asyncio.IncompleteReadError)):
+            await self.tracker._increment(self.user_id, 900)
+
+        # El pipeline enviado a la conexión cerrada no llegó a ejecutarse
+        self.assertEqual(await self.tracker._increment(self.user_id, 900), 2)
+
+    async def test_cancelled_request_discards_connection(self):
+        self.server.reply_delay = 0.2
+        task = asyncio.create_task(self.tracker._increment(self.user_id, 900))
+        await asyncio.sleep(0.05)
+        task.cancel()
+        with self.assertRaises(asyncio.CancelledError):
+            await task
+
+        self.server.reply_delay = 0
+        await asyncio.sleep(0.3)
+        self.assertEqual(await self.tracker.connection.pipeline(("GET", self.key)), [b"1"])
+
+
+class RespConnectionSetupTest(unittest.IsolatedAsyncioTestCase):
+    """
+    AUTH y SELECT al abrir la conexión
+    """
+
+    async def asyncSetUp(self):
+        self.server = FakeRespServer(password="s3cret")
+        self.url = await self.server.start()
+
+    async def asyncTearDown(self):
+        await self.server.stop()
+
+    async def test_authenticates_and_selects_database(self):
+        connection = RespConnection(self.url.replace("redis://", "redis://:s3cret@") + "/2")
+
+        self.assertEqual(await connection.pipeline(("INCR", "k")), [1])
+        self.assertEqual(self.server.commands[:2], [(b"AUTH", b"s3cret"), (b"SELECT", b"2")])
+        await connection.close()
+
+    async def test_wrong_password_is_reported_and_retried_on_next_use(self):
+        connection = RespConnection(self.url.replace("redis://", "redis://:wrong@"))
+
+        with self.assertRaises(RedisProtocolError):
+            await connection.pipeline(("INCR", "k"))
+        with self.assertRaises(RedisProtocolError):
+            await connection.pipeline(("INCR", "k"))
+
+        self.assertEqual(self.server.connections, 2)
+        self.assertNotIn(b"k", self.server.data)
+        await connection.close()
+
+
+class SharedMemoryAttemptTrackerTest(unittest.IsolatedAsyncioTestCase):
+    """
+    SharedMemoryAttemptTracker sobre una tabla pequeña (la ventana de sondeo cubre todas las ranuras)
+    """
+
+    SLOTS = 4
+
+    async def asyncSetUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "attempts")
+        self.tracker = SharedMemoryAttemptTracker(max_attempts=3, lock_minutes=15, path=self.path, slots=self.SLOTS)
+
+    async def asyncTearDown(self):
+        await self.tracker.close()
+        self.directory.cleanup()
+
+    def count(self, user_id) -> int:
+        with self.tracker.table.locked() as table:
+            return self.tracker._find_slot(table, user_id.bytes, time.time())[1]
+
+    async def test_counts_per_user_and_locks_at_threshold(self):
+        repository = FakeUserRepository()
+        first, second = uuid.uuid4(), uuid.uuid4()
+
+        self.assertFalse(await self.tracker.register_failure(repository, first))
+        self.assertFalse(await self.tracker.register_failure(repository, second))
+        self.assertFalse(await self.tracker.register_failure(repository, first))
+        self.assertTrue(await self.tracker.register_failure(repository, first))
+
+        self.assertEqual(repository.locked, [(first, 15)])
+        self.assertEqual(self.count(first), 0)
+        self.assertEqual(self.count(second), 1)
+
+    async def test_counter_expires_after_window(self):
+        user_id = uuid.uuid4()
+        await self.tracker._increment(user_id, -1)
+
+        self.assertEqual(self.count(user_id), 0)
+        self.assertEqual(await self.tracker._increment(user_id, 900), 1)
+
+    async def test_clear_keeps_other_keys_reachable(self):
+        users = [uuid.uuid4() for _ in range(self.SLOTS)]
+        for user_id in users:
+            await self.tracker._increment(user_id, 900)
+
+        await self.tracker._clear(users[0])
+
+        self.assertEqual([self.count(user_id) for user_id in users], [0, 1, 1, 1])
+
+    async def test_expired_slot_is_reused_before_live_ones(self):
+        users = [uuid.uuid4() for _ in range(self.SLOTS)]
+        await self.tracker._increment(users[0], -1)
+        for user_id in users[1:]:
+            await self.tracker._increment(user_id, 900)
+
+        newcomer = uuid.uuid4()
+        self.assertEqual(await self.tracker._increment(newcomer, 900), 1)
+
+        self.assertEqual([self.count(user_id) for user_id in users[1:]], [1, 1, 1])
+
+    async def test_full_probe_window_evicts_soonest_expiring(self):
+        users = [uuid.uuid4() for _ in range(self.SLOTS)]
+        for position, user_id in enumerate(users):
+            await self.tracker._increment(user_id, 100 * (position + 1))
+
+        newcomer = uuid.uuid4()
+        self.assertEqual(await self.tracker._increment(newcomer, 900), 1)
+
+        self.assertEqual(self.count(users[0]), 0)
+        self.assertEqual([self.count(user_id) for user_id in users[1:]], [1, 1, 1])
+        self.assertEqual(self.count(newcomer), 1)
+
+    async def test_table_is_shared_between_instances(self):
+        other = SharedMemoryAttemptTracker(max_attempts=3, lock_minutes=15, path=self.path, slots=self.SLOTS)
+        user_id = uuid.uuid4()
+
+        await self.tracker._increment(user_id, 900)
+        self.assertEqual(await other._increment(user_id, 900), 2)
+        await other.close()
+
+
+if __name__ == "__main__":
+    unittest.main()